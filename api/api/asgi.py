@@ -10,10 +10,12 @@ https://docs.djangoproject.com/en/3.1/howto/deployment/asgi/
 import os
 from channels.routing import ProtocolTypeRouter, URLRouter
 from channels.security.websocket import AllowedHostsOriginValidator
+from django.conf import settings
 from django.core.asgi import get_asgi_application
 from django.urls import re_path
 from gur.consumers.courier import CourierConsumer
 from gur.consumers.user import UserConsumer
+from gur.services.dispatch import InProcessDispatchMiddleware
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api.settings')
 
@@ -26,3 +28,6 @@ application = ProtocolTypeRouter({
         ])
     ),
 })
+
+if settings.DISPATCH_IN_PROCESS:
+    application = InProcessDispatchMiddleware(application)
@@ -36,6 +36,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'gur.perf.middleware.PerformanceMiddleware',
+    'gur.routers.ReplicaRoutingMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -79,10 +81,41 @@ DATABASES = {
     }
 }
 
+# read replicas of 'default' for the views with replica_reads, see
+# gur.routers; GUR_REPLICA_NAME adds one, e.g. a second local database
+if os.environ.get('GUR_REPLICA_NAME'):
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'NAME': os.environ['GUR_REPLICA_NAME'],
+        'HOST': os.environ.get('GUR_REPLICA_HOST', DATABASES['default']['HOST']),
+        'PORT': os.environ.get('GUR_REPLICA_PORT', DATABASES['default']['PORT']),
+    }
+DATABASE_ROUTERS = ['gur.routers.ReplicaRouter']
+# reads go to the replicas only with GUR_REPLICA_READS, so test runs with a
+# replica configured keep reading from the database their test case writes to
+REPLICA_DATABASES = [
+    alias for alias in DATABASES if alias != 'default'
+] if os.environ.get('GUR_REPLICA_READS') else []
+# users read from the primary for this long after they wrote, see
+# gur.routers.pin_to_primary
+REPLICA_PIN_SECONDS = 10
+
+# orjson renderer and parser, False falls back to DRF's stdlib json ones
+FAST_JSON = True
+
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
+        'gur.authentication.ClaimsJWTAuthentication',
         'rest_framework.authentication.SessionAuthentication',
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+    ],
+    'DEFAULT_RENDERER_CLASSES': [
+        'gur.renderers.ORJSONRenderer' if FAST_JSON else 'rest_framework.renderers.JSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'gur.parsers.ORJSONParser' if FAST_JSON else 'rest_framework.parsers.JSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
     ],
 }
 
@@ -114,25 +147,119 @@ STATIC_URL = '/static/'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# content-addressed photo files, see gur.services.photos
+PHOTO_ROOT = os.path.join(MEDIA_ROOT, 'photos')
+PHOTO_URL = MEDIA_URL + 'photos/'
+PHOTO_MAX_SIZE = 5 * 1024 * 1024
+# longest side in pixels of each derived variant, generated in these formats
+PHOTO_VARIANTS = {
+    'thumb': 160,
+    'small': 480,
+    'large': 1080,
+}
+PHOTO_VARIANT_FORMATS = ('webp', 'jpg')
+PHOTO_VARIANT_QUALITY = 80
+PHOTO_VARIANT_WORKERS = 2
+
 CORS_ORIGIN_ALLOW_ALL = True
 CORS_ALLOW_HEADERS = default_headers + (
     'Access-Control-Allow-Origin',
+    'X-Profile-Token',
 )
+CORS_EXPOSE_HEADERS = ('X-Profile-Id',)
 
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(days=1),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=7)
 }
+# fall back to the user row for tokens issued before the user's roles changed;
+# other workers notice a change within CLAIMS_EPOCH_CACHE_TIMEOUT seconds
+JWT_CLAIMS_REVOCATION_CHECK = True
+CLAIMS_EPOCH_CACHE_TIMEOUT = 30
 
 POSSIBLE_COURIER_DISTANCE = 2000
 POSSIBLE_USER_DISTANCE = 3500
 
+# metric CRS of the projected order delivery location (UTM zone 36N, covers Kyiv);
+# changing it requires a migration that rebuilds the column and its trigger
+LOCAL_METRIC_SRID = 32636
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "OPTIONS": {
+            "MAX_ENTRIES": 100000,
+        },
+    }
+}
+# a cache shared by all processes; needs redis, and is required with
+# REPLICA_DATABASES, whose pins every worker must see
+if os.environ.get('GUR_CACHE_REDIS_URL'):
+    CACHES['default'] = {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": os.environ['GUR_CACHE_REDIS_URL'],
+    }
+COURIER_ORDER_CACHE_TIMEOUT = 60 * 60
+PRINCIPAL_CACHE_TIMEOUT = 60 * 15
+PROFILE_CACHE_TIMEOUT = 60 * 15
+MENU_CACHE_TIMEOUT = 60 * 60 * 24
+
+# in-process board of orders waiting for a courier
+FREE_ORDER_BOARD_CELL_SIZE = 500
+FREE_ORDER_BOARD_REFRESH = 60
+
+# batch courier dispatch (manage.py dispatch_orders)
+DISPATCH_INTERVAL = 5
+DISPATCH_COURIER_SPEED = 4.2
+DISPATCH_LOCATION_MAX_AGE = 300
+DISPATCH_OFFER_TTL = 30
+
+# per view costs recorded by gur.perf, served on /metrics to these clients
+# (None serves every client)
+PERF_METRICS = True
+# the Server-Timing header shows SQL costs, so outside DEBUG only profiled
+# requests (with a valid X-Profile-Token) get it
+PERF_SERVER_TIMING = DEBUG
+METRICS_ALLOWED_IPS = ('127.0.0.1', '::1')
+# report ('warn' or 'raise') SQL repeated more than NPLUSONE_THRESHOLD times
+# within one request; needs PERF_METRICS
+NPLUSONE_ACTION = 'warn' if DEBUG else None
+NPLUSONE_THRESHOLD = 5
+# statistical profiles with the SQL log of requests sent with a valid
+# X-Profile-Token header (sockets: ?profile=<token>, see manage.py
+# profile_token) and of PROFILE_SAMPLE_RATE of all requests; needs PERF_METRICS
+PROFILE_DIR = os.path.join(BASE_DIR, 'profiles')
+PROFILE_KEEP = 200
+PROFILE_SAMPLE_RATE = 0
+PROFILE_INTERVAL = 0.005
+PROFILE_TOKEN_MAX_AGE = 60 * 60 * 24
+
 # django channels
 ASGI_APPLICATION = "api.asgi.application"
 CHANNEL_LAYERS = {
     "default": {
-        "BACKEND": "channels.layers.InMemoryChannelLayer"
+        "BACKEND": "gur.layers.PolicyInMemoryChannelLayer",
+        "CONFIG": {
+            "capacity": 100,
+            "policies": {
+                "event.location": "latest",
+            },
+        },
     }
 }
+# a layer shared by all processes; needs channels_redis, and has no
+# latest-wins policies
+if os.environ.get('GUR_CHANNEL_REDIS_URL'):
+    CHANNEL_LAYERS['default'] = {
+        "BACKEND": "channels_redis.core.RedisChannelLayer",
+        "CONFIG": {
+            "hosts": [os.environ['GUR_CHANNEL_REDIS_URL']],
+            "capacity": 100,
+        },
+    }
+# the in-memory layer only reaches sockets of its own process, so the ASGI
+# server dispatches orders itself; with a shared layer run one
+# `manage.py dispatch_orders` instead
+DISPATCH_IN_PROCESS = 'GUR_CHANNEL_REDIS_URL' not in os.environ
 DJANGO_ALLOW_ASYNC_UNSAFE = True
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
@@ -1,7 +1,12 @@
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, include, re_path
+
+from gur.perf.views import metrics_view
+from gur.views.photos import photo_view
 
 urlpatterns = [
     path('admin/', admin.site.urls),
-    path('api/', include('gur.urls'))
+    path('api/', include('gur.urls')),
+    path('metrics', metrics_view, name='metrics'),
+    re_path(r'^media/photos/(?P<name>[0-9a-f]{64}(-[a-z0-9]+)?\.[a-z]+)$', photo_view, name='photo'),
 ]
@@ -1,5 +1,19 @@
 from django.apps import AppConfig
+from django.conf import settings
+from django.core import checks
+from django.db.backends.signals import connection_created
 
 
 class GurConfig(AppConfig):
     name = 'gur'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        from .routers import check_shared_cache
+
+        checks.register(check_shared_cache, checks.Tags.caches)
+
+        if settings.PERF_METRICS:
+            from .perf.stats import install_query_recorder, instrument_serializers
+            connection_created.connect(install_query_recorder)
+            instrument_serializers()
@@ -0,0 +1,74 @@
+from django.conf import settings
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+
+from .services.principal import Principal, get_principal, get_claims_epoch, to_claims_epoch
+
+CLAIMS_KEY = "gur"
+CLAIMS_VERSION = 2
+
+
+def add_principal_claims(token, user):
+    principal = get_principal(user)
+    token["is_superuser"] = principal.is_superuser
+    token[CLAIMS_KEY] = {
+        "v": CLAIMS_VERSION,
+        "e": to_claims_epoch(user.claims_changed_at),
+        "ua": principal.user_account_id,
+        "ca": principal.courier_account_id,
+        "ra": sorted(principal.admin_restaurant_ids),
+        "p": sorted(principal.permissions),
+    }
+    return token
+
+
+def claims_are_current(token):
+    claims = token.get(CLAIMS_KEY)
+    if not isinstance(claims, dict) or claims.get("v") != CLAIMS_VERSION:
+        return False
+    if settings.JWT_CLAIMS_REVOCATION_CHECK:
+        epoch = get_claims_epoch(token[api_settings.USER_ID_CLAIM])
+        return epoch is not None and claims.get("e") == epoch
+    return True
+
+
+class ClaimsUser(TokenUser):
+    """
+    Request user built from signed token claims, no database row behind it.
+    """
+
+    def __init__(self, token):
+        super().__init__(token)
+        claims = token[CLAIMS_KEY]
+        self._principal = Principal(
+            user_id=self.id,
+            is_superuser=self.is_superuser,
+            user_account_id=claims["ua"],
+            courier_account_id=claims["ca"],
+            admin_restaurant_ids=claims["ra"],
+            permissions=claims["p"],
+        )
+
+    def get_all_permissions(self, obj=None):
+        return set(self._principal.permissions)
+
+    def has_perm(self, perm, obj=None):
+        return self._principal.has_perms([perm])
+
+    def has_perms(self, perm_list, obj=None):
+        return self._principal.has_perms(perm_list)
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """
+    Authenticates with the principal embedded at token issuance instead of
+    selecting the user row. Tokens without claims, or issued before the
+    user's roles or account changed, fall back to the database lookup,
+    which also rejects deactivated users.
+    """
+
+    def get_user(self, validated_token):
+        if not claims_are_current(validated_token):
+            return super().get_user(validated_token)
+        return ClaimsUser(validated_token)
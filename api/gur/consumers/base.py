@@ -1,17 +1,90 @@
+import sys
+from urllib.parse import parse_qs
+
+from asgiref.sync import sync_to_async
+from channels.consumer import get_handler_name
+from channels.db import database_sync_to_async as channels_database_sync_to_async
 from channels.generic.websocket import AsyncJsonWebsocketConsumer
 import jwt
 from django.conf import settings
+from django.utils.functional import cached_property
 from rest_framework_simplejwt.tokens import UntypedToken
 
+from ..perf.metrics import observe
+from ..perf.profiling import current_profiler, sampled_in_thread, save_profile, start_profiler
+from ..perf.queries import check_repeated_queries
+from ..perf.stats import collect, record_response_size
+from .wire import MSGPACK_SUBPROTOCOL, encode_compact, decode_compact
+
+
+def database_sync_to_async(func):
+    """
+    channels' database_sync_to_async, with the thread sampled by the
+    profiler of the message being handled.
+    """
+    return channels_database_sync_to_async(sampled_in_thread(func))
+
 
 class BaseConsumer(AsyncJsonWebsocketConsumer):
+    compact = False
 
     async def connect(self):
-        await self.accept()
+        # clients opt in to msgpack frames by offering the subprotocol
+        if MSGPACK_SUBPROTOCOL in self.scope.get("subprotocols", []):
+            self.compact = True
+            await self.accept(MSGPACK_SUBPROTOCOL)
+        else:
+            await self.accept()
+
+    @cached_property
+    def profile_token(self):
+        # browsers cannot set headers on sockets, so it comes in the query string
+        values = parse_qs(self.scope.get("query_string", b"").decode()).get("profile")
+        return values[0] if values else None
+
+    async def dispatch(self, message):
+        if not settings.PERF_METRICS:
+            return await super().dispatch(message)
+        # every message type is measured like a view of its own
+        view = f"{type(self).__name__}.{get_handler_name(message)}"
+        profiler = start_profiler(self.profile_token, marker=sys._getframe())
+        profiler_token = current_profiler.set(profiler)
+        with collect(sql_log=profiler is not None) as stats:
+            try:
+                await super().dispatch(message)
+            finally:
+                current_profiler.reset(profiler_token)
+                observe(view, stats, stats.duration)
+                if profiler is not None:
+                    profiler.stop()
+                    # keep file writes off the event loop
+                    await sync_to_async(save_profile, thread_sensitive=False)(view, profiler, stats)
+        check_repeated_queries(view, stats)
+
+    async def send(self, text_data=None, bytes_data=None, close=False):
+        record_response_size(len(text_data or bytes_data or ""))
+        await super().send(text_data=text_data, bytes_data=bytes_data, close=close)
 
     async def disconnect(self, code):
         await self.close(code)
 
+    async def receive(self, text_data=None, bytes_data=None, **kwargs):
+        if self.compact and bytes_data is not None:
+            await self.receive_json(decode_compact(bytes_data), **kwargs)
+        else:
+            await super().receive(text_data=text_data, bytes_data=bytes_data, **kwargs)
+
+    async def send_event(self, event_type, content):
+        if self.compact:
+            await self.send(bytes_data=encode_compact(event_type, content))
+        else:
+            await self.send_json(
+                {
+                    'type': event_type,
+                    'content': content
+                }
+            )
+
     async def get_user_id(self, token):
         token = UntypedToken(token)
         user_id = jwt.decode(
@@ -1,42 +1,36 @@
-from channels.db import database_sync_to_async
+from ..models import CourierAccount
 
-from ..models.models import CourierAccount
-
-from .base import BaseConsumer
+from .base import BaseConsumer, database_sync_to_async
 
 
 class CourierConsumer(BaseConsumer):
 
     @database_sync_to_async
-    def should_accept_connection(self, user_id):
-        return CourierAccount.objects.filter(id=user_id).exists()
+    def get_courier_id(self, user_id):
+        return CourierAccount.objects.filter(
+            user_id=user_id
+        ).values_list("id", flat=True).first()
 
     async def receive_json(self, content, **kwargs):
         command = content.get("command")
         if command == "connect_to_order_queue":
             user_id = await self.get_user_id(content.get("token"))
-            should_accept = await self.should_accept_connection(user_id)
-            if should_accept:
-                await self.channel_layer.group_add(
-                    f"courier_queue",
-                    self.channel_name
-                )
-                self.groups.append(f"courier_queue")
+            courier_id = await self.get_courier_id(user_id)
+            if courier_id is not None:
+                for group in ["courier_queue", f"courier_{courier_id}"]:
+                    await self.channel_layer.group_add(
+                        group,
+                        self.channel_name
+                    )
+                    self.groups.append(group)
             else:
                 await self.close()
 
     async def event_neworder(self, event):
-        await self.send_json(
-            {
-                'type': 'event.neworder',
-                'content': event['content']
-            }
-        )
+        await self.send_event('event.neworder', event['content'])
 
     async def event_ordertaken(self, event):
-        await self.send_json(
-            {
-                'type': 'event.ordertaken',
-                'content': event['content']
-            }
-        )
\ No newline at end of file
+        await self.send_event('event.ordertaken', event['content'])
+
+    async def event_orderoffer(self, event):
+        await self.send_event('event.orderoffer', event['content'])
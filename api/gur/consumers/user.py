@@ -1,6 +1,5 @@
-from channels.db import database_sync_to_async
-from ..models.models import Order
-from .base import BaseConsumer
+from ..models import Order
+from .base import BaseConsumer, database_sync_to_async
 
 
 class UserConsumer(BaseConsumer):
@@ -25,20 +24,10 @@ class UserConsumer(BaseConsumer):
                 await self.close()
 
     async def event_location(self, event):
-        await self.send_json(
-            {
-                'type': 'event.location',
-                'content': event['content']
-            }
-        )
+        await self.send_event('event.location', event['content'])
 
     async def event_orderstatus(self, event):
-        await self.send_json(
-            {
-                'type': 'event.orderstatus',
-                'content': event['content']
-            }
-        )
+        await self.send_event('event.orderstatus', event['content'])
 
     @database_sync_to_async
     def user_has_permission_to_order(self, user_id, order_id):
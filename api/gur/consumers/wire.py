@@ -0,0 +1,81 @@
+import msgpack
+
+# websocket subprotocol a client asks for to receive compact frames
+MSGPACK_SUBPROTOCOL = "gur.msgpack.v1"
+
+# coordinates are sent as integers in 1e-6 degree units (~0.1 m)
+COORDINATE_SCALE = 10 ** 6
+
+EVENT_CODES = {
+    "event.location": "l",
+    "event.neworder": "n",
+    "event.ordertaken": "t",
+    "event.orderstatus": "s",
+    "event.orderoffer": "o",
+}
+
+
+def to_fixed(value):
+    return int(round(float(value) * COORDINATE_SCALE))
+
+
+def compact_point(point):
+    if point is None:
+        return None
+    return [to_fixed(point["latitude"]), to_fixed(point["longitude"])]
+
+
+def compact_location(content):
+    return compact_point(content)
+
+
+def compact_new_order(content):
+    user = content.get("user") or {}
+    restaurant = content.get("restaurant") or {}
+    return {
+        "i": content["id"],
+        "u": [user.get("first_name"), user.get("tel_num")],
+        "c": content.get("created_at"),
+        "s": content.get("summary"),
+        "d": content.get("order_details"),
+        "a": content.get("delivery_address"),
+        "l": compact_point(content.get("delivery_location")),
+        "r": [
+            restaurant.get("name"),
+            restaurant.get("rest_address"),
+            compact_point(restaurant.get("location")),
+        ],
+        "x": [
+            [dish["id"], dish["quantity"], dish["name"], dish["price"], dish["gramme"]]
+            for dish in content.get("dishes", [])
+        ],
+    }
+
+
+def compact_order_offer(content):
+    return {
+        "o": compact_new_order(content["order"]),
+        "e": content["eta"],
+    }
+
+
+COMPACTORS = {
+    "event.location": compact_location,
+    "event.neworder": compact_new_order,
+    "event.orderoffer": compact_order_offer,
+}
+
+
+def encode_compact(event_type, content):
+    compactor = COMPACTORS.get(event_type)
+    return msgpack.packb(
+        {
+            "t": EVENT_CODES.get(event_type, event_type),
+            "c": compactor(content) if compactor else content,
+        },
+        use_bin_type=True
+    )
+
+
+def decode_compact(bytes_data):
+    return msgpack.unpackb(bytes_data, raw=False)
@@ -0,0 +1,124 @@
+import asyncio
+import time
+from collections import OrderedDict, deque
+from copy import deepcopy
+
+from channels.exceptions import ChannelFull
+from channels.layers import InMemoryChannelLayer
+
+RELIABLE = "reliable"
+LATEST = "latest"
+
+DEFAULT_MESSAGE_POLICIES = {
+    "event.location": LATEST,
+}
+
+
+class ChannelMailbox:
+    """
+    Per-channel buffer with two lanes: reliable messages are kept in order
+    up to the channel capacity, latest-wins messages keep only the newest
+    message of every type.
+    """
+
+    def __init__(self):
+        self.reliable = deque()
+        self.latest = OrderedDict()
+        self.ready = asyncio.Event()
+
+    def empty(self):
+        return not self.reliable and not self.latest
+
+    def put(self, policy, expires, message, capacity):
+        if policy == LATEST:
+            self.latest.pop(message["type"], None)
+            self.latest[message["type"]] = (expires, message)
+        else:
+            if len(self.reliable) >= capacity:
+                raise ChannelFull()
+            self.reliable.append((expires, message))
+        self.ready.set()
+
+    def pop(self):
+        # status transitions always go out before ephemeral updates
+        if self.reliable:
+            _, message = self.reliable.popleft()
+        else:
+            _, (_, message) = self.latest.popitem(last=False)
+        if self.empty():
+            self.ready.clear()
+        return message
+
+    def drop_expired(self, now):
+        dropped = False
+        while self.reliable and self.reliable[0][0] < now:
+            self.reliable.popleft()
+            dropped = True
+        for message_type, (expires, _) in list(self.latest.items()):
+            if expires < now:
+                del self.latest[message_type]
+                dropped = True
+        if self.empty():
+            self.ready.clear()
+        return dropped
+
+
+class PolicyInMemoryChannelLayer(InMemoryChannelLayer):
+    """
+    In-memory layer that applies a delivery policy per message type.
+    Reliable messages are queued in order and bounded by the channel
+    capacity, latest-wins messages replace the pending message of the same
+    type, so location bursts never push status transitions out of the queue.
+    """
+
+    def __init__(self, policies=None, **kwargs):
+        super().__init__(**kwargs)
+        self.policies = {**DEFAULT_MESSAGE_POLICIES, **(policies or {})}
+        self.mailboxes = {}
+
+    def get_policy(self, message):
+        return self.policies.get(message.get("type"), RELIABLE)
+
+    async def send(self, channel, message):
+        assert isinstance(message, dict), "message is not a dict"
+        assert self.valid_channel_name(channel), "Channel name not valid"
+        assert "__asgi_channel__" not in message
+
+        mailbox = self.mailboxes.setdefault(channel, ChannelMailbox())
+        try:
+            mailbox.put(
+                self.get_policy(message),
+                time.time() + self.expiry,
+                deepcopy(message),
+                self.get_capacity(channel)
+            )
+        except ChannelFull:
+            raise ChannelFull(channel)
+
+    async def receive(self, channel):
+        assert self.valid_channel_name(channel)
+        self._clean_expired()
+
+        mailbox = self.mailboxes.setdefault(channel, ChannelMailbox())
+        try:
+            while mailbox.empty():
+                await mailbox.ready.wait()
+            message = mailbox.pop()
+        finally:
+            if mailbox.empty() and self.mailboxes.get(channel) is mailbox:
+                del self.mailboxes[channel]
+
+        return message
+
+    def _clean_expired(self):
+        now = time.time()
+        for channel, mailbox in list(self.mailboxes.items()):
+            if mailbox.drop_expired(now):
+                self._remove_from_groups(channel)
+                if mailbox.empty():
+                    del self.mailboxes[channel]
+        super()._clean_expired()
+
+    async def flush(self):
+        self.mailboxes = {}
+        await super().flush()
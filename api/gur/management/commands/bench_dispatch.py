@@ -0,0 +1,52 @@
+import statistics
+import time
+
+import numpy as np
+from django.core.management.base import BaseCommand, CommandError
+
+from ...services.dispatch import match
+
+CITY_CENTER = (50.4501, 30.5234)
+CITY_RADIUS_DEGREES = 0.15
+
+
+def parse_shape(value):
+    try:
+        couriers, orders = (int(part) for part in value.split("x"))
+    except ValueError:
+        raise CommandError(f"Invalid shape {value}, expected <couriers>x<orders>")
+    return couriers, orders
+
+
+class Command(BaseCommand):
+    help = "Times the courier/order matching of a dispatch tick on random points of a city"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--shapes', type=parse_shape, nargs='+',
+            default=[(1000, 100), (2000, 200), (5000, 500), (1000, 1000), (2000, 2000)],
+            help="<couriers>x<orders>"
+        )
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('--seed', type=int, default=1)
+
+    def random_points(self, rng, count):
+        return np.asarray(CITY_CENTER) + rng.uniform(
+            -CITY_RADIUS_DEGREES, CITY_RADIUS_DEGREES, size=(count, 2)
+        )
+
+    def handle(self, *args, **options):
+        rng = np.random.default_rng(options['seed'])
+        self.stdout.write(f"{'couriers x orders':>18} {'matched':>8} {'median ms':>10} {'max ms':>8}")
+        for couriers, orders in options['shapes']:
+            courier_points = self.random_points(rng, couriers)
+            order_points = self.random_points(rng, orders)
+            timings = []
+            for _ in range(options['repeat']):
+                started = time.perf_counter()
+                matched = match(courier_points, order_points)
+                timings.append((time.perf_counter() - started) * 1000)
+            self.stdout.write(
+                f"{f'{couriers} x {orders}':>18} {len(matched):>8} "
+                f"{statistics.median(timings):>10.1f} {max(timings):>8.1f}"
+            )
@@ -0,0 +1,94 @@
+import json
+import subprocess
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from ...models import Restaurant, Order
+from ...perf.lifecycle import LifecycleBenchmark, BenchmarkError, compare
+
+
+def get_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=settings.BASE_DIR,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Command(BaseCommand):
+    help = "Times whole orders from discovery to delivery, step by step, against the current database"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=50)
+        parser.add_argument('--warmup', type=int, default=5)
+        parser.add_argument('--dishes', type=int, default=3, help="dishes added to every cart")
+        parser.add_argument('--locations', type=int, default=5, help="locations sent per delivery")
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument('--output', help="write the results as JSON to this file")
+        parser.add_argument('--compare', help="results of an earlier run to check for regressions")
+        parser.add_argument(
+            '--threshold', type=float, default=0.2,
+            help="slowdown of p50 or p90 reported as a regression, 0.2 is 20%%"
+        )
+
+    def handle(self, *args, **options):
+        if options['iterations'] < 1:
+            raise CommandError("Run at least one iteration")
+        previous = None
+        if options['compare']:
+            with open(options['compare']) as file:
+                previous = json.load(file)
+
+        benchmark = LifecycleBenchmark(
+            iterations=options['iterations'],
+            warmup=options['warmup'],
+            dishes=options['dishes'],
+            locations=options['locations'],
+            seed=options['seed'],
+            log=self.stdout.write,
+        )
+        try:
+            steps = benchmark.run()
+        except BenchmarkError as e:
+            raise CommandError(str(e))
+
+        results = {
+            'commit': get_commit(),
+            'created_at': datetime.now(timezone.utc).isoformat(),
+            'options': {
+                name: options[name]
+                for name in ('iterations', 'warmup', 'dishes', 'locations', 'seed')
+            },
+            'database': {
+                'restaurants': Restaurant.objects.count(),
+                'orders': Order.objects.count(),
+            },
+            'steps': steps,
+        }
+
+        self.stdout.write(
+            f"{'step':<16} {'count':>6} {'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9} {'queries':>8}"
+        )
+        for step, summary in steps.items():
+            queries = "" if summary['queries'] is None else f"{summary['queries']:.1f}"
+            self.stdout.write(
+                f"{step:<16} {summary['count']:>6} {summary['p50']:>9.2f} "
+                f"{summary['p90']:>9.2f} {summary['p99']:>9.2f} {queries:>8}"
+            )
+
+        if options['output']:
+            with open(options['output'], 'w') as file:
+                json.dump(results, file, indent=2)
+
+        if previous is not None:
+            regressions = compare(previous, results, options['threshold'])
+            for step, metric, before, after in regressions:
+                self.stdout.write(f"{step} {metric}: {before} -> {after}")
+            if regressions:
+                raise CommandError(
+                    f"{len(regressions)} regressions against {previous.get('commit') or options['compare']}"
+                )
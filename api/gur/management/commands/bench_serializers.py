@@ -0,0 +1,104 @@
+import random
+import statistics
+import time
+from datetime import time as dt_time, timedelta
+
+from django.contrib.gis.geos import Point
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from ...models import Dish, Order, OrderStatus, Restaurant
+from ...serializers.dishes import DishSerializer
+from ...serializers.fast import (
+    DishValuesSerializer, RestaurantValuesSerializer, OrderHistoryValuesSerializer
+)
+from ...serializers.order import OrderWithFirstStatusSerializer
+from ...serializers.restaurant import RestaurantSerializer
+
+PHOTO = "3f" * 32 + ".jpg"
+
+
+class Command(BaseCommand):
+    help = "Compares DRF serializers with the values() read path on in-memory rows"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1000)
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument('--seed', type=int, default=1)
+
+    def dishes(self, rng, rows):
+        values = [
+            {
+                'id': i,
+                'restaurant_id': 1,
+                'name': f"Dish {i}",
+                'description': "Bench dish",
+                'price': rng.randint(100, 10000),
+                'gramme': rng.randint(50, 900),
+                'dish_photo': PHOTO if i % 2 else None,
+            }
+            for i in range(1, rows + 1)
+        ]
+        return [Dish(**row) for row in values], values
+
+    def restaurants(self, rng, rows):
+        values = [
+            {
+                'id': i,
+                'name': f"Restaurant {i}",
+                'open_from': dt_time(rng.randint(0, 23)),
+                'open_to': dt_time(rng.randint(0, 23)),
+                'rest_photo': PHOTO,
+                'rest_address': "Bench address",
+                'location': Point(30.5 + rng.random() / 10, 50.4 + rng.random() / 10, srid=4326),
+            }
+            for i in range(1, rows + 1)
+        ]
+        return [Restaurant(**row) for row in values], values
+
+    def orders(self, rng, rows):
+        now = timezone.now()
+        instances, values = [], []
+        for i in range(1, rows + 1):
+            row = {
+                'id': i,
+                'summary': rng.randint(100, 10000),
+                'order_details': None,
+                'delivery_address': "Bench address",
+                'created_at': now - timedelta(minutes=i),
+            }
+            status = {'order_id': i, 'status': OrderStatus.DELIVERED, 'created_at': now}
+            order = Order(**row)
+            order.last_status = [OrderStatus(**status)]
+            instances.append(order)
+            values.append(dict(row, _last_status=status))
+        return instances, values
+
+    def measure(self, function, repeat):
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            function()
+            timings.append((time.perf_counter() - started) * 1000)
+        return statistics.median(timings)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        cases = (
+            ("menu", self.dishes, DishSerializer, DishValuesSerializer),
+            ("discovery", self.restaurants, RestaurantSerializer, RestaurantValuesSerializer),
+            ("order history", self.orders, OrderWithFirstStatusSerializer, OrderHistoryValuesSerializer),
+        )
+        for name, build, drf_serializer, values_serializer in cases:
+            instances, values = build(rng, options['rows'])
+            if [dict(row) for row in drf_serializer(instances, many=True).data] != \
+                    values_serializer().serialize(values):
+                self.stderr.write(f"{name}: outputs differ")
+                continue
+
+            drf = self.measure(lambda: drf_serializer(instances, many=True).data, options['repeat'])
+            fast = self.measure(lambda: values_serializer().serialize(values), options['repeat'])
+            self.stdout.write(
+                f"{name:<14} {options['rows']} rows   drf {drf:8.3f} ms   "
+                f"values {fast:8.3f} ms   x{drf / fast:5.1f}"
+            )
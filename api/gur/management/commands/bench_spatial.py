@@ -0,0 +1,74 @@
+import random
+import statistics
+import time
+
+from django.conf import settings
+from django.contrib.gis.geos import Point
+from django.contrib.gis.measure import D
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from ...models import CustomUser, UserAccount, Order
+from ...services.geo import project_point
+
+CITY_CENTER = (30.5234, 50.4501)
+CITY_RADIUS_DEGREES = 0.15
+
+
+class Command(BaseCommand):
+    help = "Compares the geography and projected-geometry courier distance checks on a synthetic city"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--orders', type=int, default=50000)
+        parser.add_argument('--queries', type=int, default=200)
+        parser.add_argument('--seed', type=int, default=1)
+
+    def random_point(self, rng):
+        return Point(
+            CITY_CENTER[0] + rng.uniform(-CITY_RADIUS_DEGREES, CITY_RADIUS_DEGREES),
+            CITY_CENTER[1] + rng.uniform(-CITY_RADIUS_DEGREES, CITY_RADIUS_DEGREES),
+            srid=4326
+        )
+
+    def populate(self, rng, orders):
+        user = CustomUser.objects.create_user(
+            email=f"bench-{rng.random()}@example.com", password=None
+        )
+        account = UserAccount.objects.create(user=user)
+        Order.objects.bulk_create([
+            Order(user=account, delivery_location=self.random_point(rng))
+            for _ in range(orders)
+        ], batch_size=5000)
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE gur_order")
+
+    def measure(self, points, build_queryset):
+        timings = []
+        for point in points:
+            started = time.perf_counter()
+            list(build_queryset(point).values_list('id', flat=True))
+            timings.append((time.perf_counter() - started) * 1000)
+        timings.sort()
+        return statistics.mean(timings), timings[int(len(timings) * 0.95) - 1]
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        variants = {
+            "orders geography": lambda point: Order.objects.filter(
+                delivery_location__dwithin=(point, D(m=settings.POSSIBLE_COURIER_DISTANCE))
+            ),
+            "orders projected": lambda point: Order.objects.filter(
+                delivery_location_projected__dwithin=(
+                    project_point(point), D(m=settings.POSSIBLE_COURIER_DISTANCE)
+                )
+            ),
+        }
+
+        # everything is rolled back, the benchmark leaves no data behind
+        with transaction.atomic():
+            self.populate(rng, options['orders'])
+            points = [self.random_point(rng) for _ in range(options['queries'])]
+            for name, build_queryset in variants.items():
+                mean, p95 = self.measure(points, build_queryset)
+                self.stdout.write(f"{name:<24} mean {mean:8.3f} ms   p95 {p95:8.3f} ms")
+            transaction.set_rollback(True)
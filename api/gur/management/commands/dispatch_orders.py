@@ -0,0 +1,36 @@
+import time
+
+from channels.layers import InMemoryChannelLayer, get_channel_layer
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from ...services.dispatch import Dispatcher
+
+
+class Command(BaseCommand):
+    help = "Periodically matches free orders with idle couriers and sends them offers"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interval', type=float, default=settings.DISPATCH_INTERVAL)
+        parser.add_argument('--once', action='store_true')
+
+    def handle(self, *args, **options):
+        if isinstance(get_channel_layer(), InMemoryChannelLayer):
+            # its offers would never leave this process
+            raise CommandError(
+                "The in-memory channel layer does not reach the sockets of the "
+                "ASGI server, which dispatches in process (DISPATCH_IN_PROCESS). "
+                "Set GUR_CHANNEL_REDIS_URL to run the dispatcher on its own."
+            )
+        dispatcher = Dispatcher()
+        while True:
+            started = time.monotonic()
+            stats = dispatcher.tick()
+            self.stdout.write(
+                f"{stats['couriers']} couriers, {stats['orders']} orders: "
+                f"{stats['assigned']} assigned, {stats['offered']} offered "
+                f"in {stats['duration'] * 1000:.1f} ms"
+            )
+            if options['once']:
+                return
+            time.sleep(max(options['interval'] - (time.monotonic() - started), 0))
@@ -0,0 +1,65 @@
+import difflib
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ...perf.plans import (
+    HOT_QUERIES, SNAPSHOT_DIR, PlanError, Sample, check_plan, execution_time, explain, render_plan
+)
+
+
+class Command(BaseCommand):
+    help = "Checks the plans of the hot queries and compares them with the committed snapshots"
+
+    def add_arguments(self, parser):
+        parser.add_argument('names', nargs='*', help="hot queries to explain, all by default")
+        parser.add_argument('--update', action='store_true', help="rewrite the snapshots")
+        parser.add_argument(
+            '--no-seqscan', action='store_true',
+            help="plan with enable_seqscan off, for datasets too small to need indexes"
+        )
+        parser.add_argument('--snapshots', type=Path, default=SNAPSHOT_DIR)
+        parser.add_argument(
+            '--timings', action='store_true',
+            help="also run every query with EXPLAIN ANALYZE and print its median execution time"
+        )
+
+    def handle(self, *args, **options):
+        names = options['names'] or list(HOT_QUERIES)
+        unknown = set(names) - set(HOT_QUERIES)
+        if unknown:
+            raise CommandError(f"Unknown hot queries: {', '.join(sorted(unknown))}")
+        try:
+            sample = Sample()
+        except PlanError as e:
+            raise CommandError(str(e))
+
+        failures = 0
+        for name in names:
+            build, spatial = HOT_QUERIES[name]
+            plan = explain(build(sample), seqscan=not options['no_seqscan'])
+            lines = render_plan(plan)
+            path = options['snapshots'] / f"{name}.txt"
+            problems = check_plan(plan, spatial)
+            if options['update']:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                path.write_text("\n".join(lines) + "\n")
+            elif not path.exists():
+                problems.append("no snapshot, run with --update to take it")
+            else:
+                diff = list(difflib.unified_diff(
+                    path.read_text().splitlines(), lines, "snapshot", "current", lineterm=""
+                ))
+                if diff:
+                    problems.append("plan changed:\n" + "\n".join(diff))
+
+            timing = ""
+            if options['timings']:
+                timing = f" {execution_time(build(sample)):.2f} ms"
+            self.stdout.write(f"{name}: {'ok' if not problems else 'FAILED'}{timing}")
+            for problem in problems:
+                self.stdout.write(f"  {problem}")
+            failures += bool(problems)
+
+        if failures:
+            raise CommandError(f"{failures} hot queries failed")
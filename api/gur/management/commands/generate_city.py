@@ -0,0 +1,56 @@
+from datetime import datetime, time as dt_time, timezone
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ...services.city import CityGenerator
+
+
+def parse_date(value):
+    try:
+        return datetime.combine(datetime.strptime(value, "%Y-%m-%d").date(), dt_time(), timezone.utc)
+    except ValueError:
+        raise CommandError(f"Invalid date {value}, expected YYYY-MM-DD")
+
+
+class Command(BaseCommand):
+    help = "Generates a synthetic city with years of order history for load and scale testing"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument('--restaurants', type=int, default=200)
+        parser.add_argument('--districts', type=int, default=12)
+        parser.add_argument('--users', type=int, default=20000)
+        parser.add_argument('--couriers', type=int, default=300)
+        parser.add_argument('--days', type=int, default=730)
+        parser.add_argument('--orders-per-day', type=int, default=500)
+        parser.add_argument('--track-points', type=int, default=4)
+        parser.add_argument('--radius', type=int, default=15000, help="city radius in meters")
+        parser.add_argument(
+            '--until', type=parse_date, default=None,
+            help="end of the order history, YYYY-MM-DD (today by default); "
+                 "fix it to get the same city on another day"
+        )
+        parser.add_argument('--domain', default=None, help="email domain of the generated users")
+        parser.add_argument('--batch-size', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        if options['restaurants'] < 1 or options['users'] < 1 or options['couriers'] < 1:
+            raise CommandError("A city needs restaurants, users and couriers")
+        generator = CityGenerator(
+            seed=options['seed'],
+            restaurants=options['restaurants'],
+            districts=options['districts'],
+            users=options['users'],
+            couriers=options['couriers'],
+            days=options['days'],
+            orders_per_day=options['orders_per_day'],
+            track_points=options['track_points'],
+            radius=options['radius'],
+            until=options['until'],
+            domain=options['domain'],
+            batch_size=options['batch_size'],
+            log=self.stdout.write,
+        )
+        counts = generator.generate()
+        for model, count in counts.items():
+            self.stdout.write(f"{model:<16} {count:>12}")
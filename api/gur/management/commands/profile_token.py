@@ -0,0 +1,16 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from ...perf.profiling import PROFILE_HEADER, make_profile_token
+
+
+class Command(BaseCommand):
+    help = "Prints a token that profiles the requests sending it"
+
+    def handle(self, *args, **options):
+        token = make_profile_token()
+        self.stdout.write(token)
+        self.stderr.write(
+            f"Send it as the {PROFILE_HEADER} header, or as ?profile= of a socket URL. "
+            f"It is valid for {settings.PROFILE_TOKEN_MAX_AGE} seconds."
+        )
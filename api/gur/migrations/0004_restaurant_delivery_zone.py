@@ -0,0 +1,27 @@
+from django.conf import settings
+import django.contrib.gis.db.models.fields
+from django.db import migrations
+
+
+def fill_delivery_zones(apps, schema_editor):
+    schema_editor.execute(
+        "UPDATE gur_restaurant SET delivery_zone = ST_Buffer(location, %s)::geometry "
+        "WHERE delivery_zone IS NULL",
+        [float(settings.POSSIBLE_USER_DISTANCE)]
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gur', '0003_order_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='restaurant',
+            name='delivery_zone',
+            field=django.contrib.gis.db.models.fields.PolygonField(blank=True, null=True, srid=4326, verbose_name='Delivery zone'),
+        ),
+        migrations.RunPython(fill_delivery_zones, migrations.RunPython.noop),
+    ]
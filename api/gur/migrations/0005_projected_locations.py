@@ -0,0 +1,65 @@
+import django.contrib.gis.db.models.fields
+from django.db import migrations
+
+LOCAL_METRIC_SRID = 32636
+
+PROJECTED_COLUMNS = [
+    ('gur_restaurant', 'location', 'location_projected'),
+    ('gur_order', 'delivery_location', 'delivery_location_projected'),
+    ('gur_courierlocation', 'location', 'location_projected'),
+]
+
+
+def create_trigger_sql(table, source, target):
+    return f"""
+        CREATE OR REPLACE FUNCTION {table}_{target}() RETURNS trigger AS $$
+        BEGIN
+            NEW.{target} := ST_Transform(NEW.{source}::geometry, {LOCAL_METRIC_SRID});
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql;
+
+        CREATE TRIGGER {table}_{target}
+            BEFORE INSERT OR UPDATE ON {table}
+            FOR EACH ROW EXECUTE FUNCTION {table}_{target}();
+
+        UPDATE {table} SET {target} = ST_Transform({source}::geometry, {LOCAL_METRIC_SRID});
+    """
+
+
+def drop_trigger_sql(table, source, target):
+    return f"""
+        DROP TRIGGER IF EXISTS {table}_{target} ON {table};
+        DROP FUNCTION IF EXISTS {table}_{target}();
+    """
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gur', '0004_restaurant_delivery_zone'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='restaurant',
+            name='location_projected',
+            field=django.contrib.gis.db.models.fields.PointField(blank=True, editable=False, null=True, srid=LOCAL_METRIC_SRID, verbose_name='Restaurant location (projected)'),
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='delivery_location_projected',
+            field=django.contrib.gis.db.models.fields.PointField(blank=True, editable=False, null=True, srid=LOCAL_METRIC_SRID, verbose_name='Delivery location (projected)'),
+        ),
+        migrations.AddField(
+            model_name='courierlocation',
+            name='location_projected',
+            field=django.contrib.gis.db.models.fields.PointField(blank=True, editable=False, null=True, srid=LOCAL_METRIC_SRID, verbose_name='Location (projected)'),
+        ),
+    ] + [
+        migrations.RunSQL(
+            create_trigger_sql(*columns),
+            drop_trigger_sql(*columns),
+        )
+        for columns in PROJECTED_COLUMNS
+    ]
@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gur', '0005_projected_locations'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='restaurant',
+            name='menu_version',
+            field=models.PositiveIntegerField(default=0, verbose_name='Menu version'),
+        ),
+    ]
@@ -0,0 +1,48 @@
+from django.db import migrations, models
+
+PHOTO_COLUMNS = (
+    ('Restaurant', 'rest_photo'),
+    ('Dish', 'dish_photo'),
+)
+
+
+def move_inline_photos(apps, schema_editor):
+    from gur.services.photos import PhotoError, is_external_url, photo_store
+
+    for model_name, field in PHOTO_COLUMNS:
+        model = apps.get_model('gur', model_name)
+        rows = model.objects.exclude(
+            **{f'{field}__isnull': True}
+        ).exclude(
+            **{field: ''}
+        ).values_list('id', field)
+        for row_id, value in rows.iterator():
+            if is_external_url(value) or photo_store.exists(value):
+                continue
+            try:
+                name = photo_store.save_encoded(value)
+            except PhotoError:
+                # neither a URL nor an image, it does not fit the new column
+                name = None
+            model.objects.filter(id=row_id).update(**{field: name})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gur', '0006_restaurant_menu_version'),
+    ]
+
+    operations = [
+        migrations.RunPython(move_inline_photos, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='restaurant',
+            name='rest_photo',
+            field=models.CharField(blank=True, max_length=500, null=True, verbose_name='Restaurant photo'),
+        ),
+        migrations.AlterField(
+            model_name='dish',
+            name='dish_photo',
+            field=models.CharField(blank=True, max_length=500, null=True, verbose_name='Dish photo'),
+        ),
+    ]
@@ -0,0 +1,40 @@
+from django.contrib.postgres.indexes import BrinIndex
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY cannot run in a transaction, but it does not
+    # lock the tables against writes while the indexes are built
+    atomic = False
+
+    dependencies = [
+        ('gur', '0007_photo_store'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='order',
+            index=models.Index(fields=['user', '-created_at'], name='gur_order_user_created_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='order',
+            index=models.Index(fields=['courier', '-created_at'], name='gur_order_courier_created_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='order',
+            index=models.Index(
+                condition=models.Q(('courier__isnull', True), ('delivery_location__isnull', False)),
+                fields=['id'],
+                name='gur_order_awaiting_courier_idx'
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name='courierlocation',
+            index=models.Index(fields=['courier', '-created_at'], name='gur_location_courier_time_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='courierlocation',
+            index=BrinIndex(fields=['created_at'], name='gur_location_created_brin'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gur', '0008_access_pattern_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customuser',
+            name='claims_changed_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, verbose_name='Claims changed at'),
+        ),
+    ]
@@ -0,0 +1,72 @@
+from django.db import migrations
+
+LOCAL_METRIC_SRID = 32636
+
+# columns of 0005 no hot query reads
+UNUSED_PROJECTED_COLUMNS = [
+    ('gur_restaurant', 'location', 'location_projected'),
+    ('gur_courierlocation', 'location', 'location_projected'),
+]
+
+
+def create_trigger_sql(table, source, target):
+    return f"""
+        CREATE OR REPLACE FUNCTION {table}_{target}() RETURNS trigger AS $$
+        BEGIN
+            NEW.{target} := ST_Transform(NEW.{source}::geometry, {LOCAL_METRIC_SRID});
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql;
+
+        CREATE TRIGGER {table}_{target}
+            BEFORE INSERT OR UPDATE ON {table}
+            FOR EACH ROW EXECUTE FUNCTION {table}_{target}();
+
+        UPDATE {table} SET {target} = ST_Transform({source}::geometry, {LOCAL_METRIC_SRID});
+    """
+
+
+def drop_trigger_sql(table, source, target):
+    return f"""
+        DROP TRIGGER IF EXISTS {table}_{target} ON {table};
+        DROP FUNCTION IF EXISTS {table}_{target}();
+    """
+
+
+def retrigger_order_sql(columns):
+    # rows are current already, only the trigger changes
+    return (
+        f"DROP TRIGGER IF EXISTS gur_order_delivery_location_projected ON gur_order;\n"
+        f"CREATE TRIGGER gur_order_delivery_location_projected\n"
+        f"    BEFORE INSERT OR UPDATE{columns} ON gur_order\n"
+        f"    FOR EACH ROW EXECUTE FUNCTION gur_order_delivery_location_projected();"
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gur', '0009_customuser_claims_changed_at'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            drop_trigger_sql(*columns),
+            create_trigger_sql(*columns),
+        )
+        for columns in UNUSED_PROJECTED_COLUMNS
+    ] + [
+        migrations.RemoveField(
+            model_name='restaurant',
+            name='location_projected',
+        ),
+        migrations.RemoveField(
+            model_name='courierlocation',
+            name='location_projected',
+        ),
+        # version bumps and status changes no longer re-project the location
+        migrations.RunSQL(
+            retrigger_order_sql(" OF delivery_location"),
+            retrigger_order_sql(""),
+        ),
+    ]
@@ -1,6 +1,7 @@
 from datetime import datetime
 
 from django.contrib.auth import get_user_model
+from django.contrib.postgres.indexes import BrinIndex
 from django.contrib.gis.geos import GEOSGeometry
 from django.utils import timezone
 from django.contrib.auth.base_user import BaseUserManager
@@ -13,6 +14,16 @@ from django.utils.translation import gettext_lazy as _
 import django.contrib.gis.db.models as gis_models
 
 
+def is_open_between(open_from, open_to):
+    if open_from is not None and open_to is not None:
+        now = datetime.now().time()
+        if open_from > open_to:
+            return not (open_from > now > open_to)
+        else:
+            return open_from < now < open_to
+    return True
+
+
 class CustomUserManager(BaseUserManager):
     def create_user(self, email, password, **extra_fields):
         if not email:
@@ -46,6 +57,12 @@ class CustomUser(AbstractUser):
             'blank': _("Необхідно вказати емейл."),
             'invalid': _("Будь ласка, вкажіть валідний емейл.")
         }, )
+    # set on every change of the user's roles, accounts or permissions;
+    # tokens carry the value they were issued at, see services.principal
+    claims_changed_at = models.DateTimeField(
+        verbose_name=_('Claims changed at'),
+        default=timezone.now
+    )
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = []
 
@@ -112,6 +129,12 @@ class UserAccount(AccountInfo):
         return f"{self.id} - {self.first_name}(+{self.tel_num})"
 
 
+class GeographyBuffer(models.Func):
+    function = 'ST_Buffer'
+    template = '%(function)s(%(expressions)s)::geometry'
+    output_field = gis_models.PolygonField(srid=4326)
+
+
 class RestaurantManager(models.Manager):
     def get_restaurants_to_position(self, longitude, latitude):
         user_location = GEOSGeometry(
@@ -119,9 +142,17 @@ class RestaurantManager(models.Manager):
             srid=4326
         )
         return self.get_queryset().filter(
-            location__distance_lte=(
-                user_location,
-                settings.POSSIBLE_USER_DISTANCE
+            delivery_zone__contains=user_location
+        )
+
+    def fill_default_delivery_zones(self, **filters):
+        return self.get_queryset().filter(
+            delivery_zone__isnull=True,
+            **filters
+        ).update(
+            delivery_zone=GeographyBuffer(
+                models.F('location'),
+                models.Value(float(settings.POSSIBLE_USER_DISTANCE))
             )
         )
 
@@ -131,10 +162,11 @@ class Restaurant(models.Model):
         verbose_name = "Restaurant"
         verbose_name_plural = "Restaurants"
 
-    rest_photo = models.TextField(
+    # stored photo name or external URL, see services.photos
+    rest_photo = models.CharField(
         verbose_name=_('Restaurant photo'),
         null=True, blank=True,
-        max_length=16383
+        max_length=500
     )
     rest_address = models.CharField(
         verbose_name=_('Restaurant address'),
@@ -156,6 +188,17 @@ class Restaurant(models.Model):
         verbose_name=_('Restaurant location'),
         geography=True
     )
+    # defaults to a POSSIBLE_USER_DISTANCE buffer around the location
+    delivery_zone = gis_models.PolygonField(
+        verbose_name=_('Delivery zone'),
+        srid=4326,
+        null=True, blank=True
+    )
+    # bumped on every dish change, keys the cached menu
+    menu_version = models.PositiveIntegerField(
+        verbose_name=_('Menu version'),
+        default=0
+    )
 
     objects = RestaurantManager()
 
@@ -164,13 +207,7 @@ class Restaurant(models.Model):
 
     @cached_property
     def is_open(self):
-        if self.open_from is not None and self.open_to is not None:
-            now = datetime.now().time()
-            if self.open_from > self.open_to:
-                return not (self.open_from > now > self.open_to)
-            else:
-                return self.open_from < now < self.open_to
-        return True
+        return is_open_between(self.open_from, self.open_to)
 
 
 class RestaurantAdminManager(models.Manager):
@@ -208,10 +245,11 @@ class Dish(models.Model):
         verbose_name = "Dish"
         verbose_name_plural = "Dishes"
 
-    dish_photo = models.TextField(
+    # stored photo name or external URL, see services.photos
+    dish_photo = models.CharField(
         verbose_name=_('Dish photo'),
         null=True, blank=True,
-        max_length=16383
+        max_length=500
     )
     restaurant = models.ForeignKey(
         Restaurant,
@@ -245,6 +283,18 @@ class Order(models.Model):
     class Meta:
         verbose_name = "Order"
         verbose_name_plural = "Orders"
+        # built concurrently by migration 0008
+        indexes = [
+            # order histories, newest first
+            models.Index(fields=['user', '-created_at'], name='gur_order_user_created_idx'),
+            models.Index(fields=['courier', '-created_at'], name='gur_order_courier_created_idx'),
+            # checked out orders without a courier, a small part of the table
+            models.Index(
+                fields=['id'],
+                condition=models.Q(courier__isnull=True, delivery_location__isnull=False),
+                name='gur_order_awaiting_courier_idx'
+            ),
+        ]
 
     user = models.ForeignKey(
         UserAccount,
@@ -274,6 +324,13 @@ class Order(models.Model):
         geography=True,
         null=True, blank=True
     )
+    # maintained by a database trigger, see migrations 0005 and 0010
+    delivery_location_projected = gis_models.PointField(
+        verbose_name=_('Delivery location (projected)'),
+        srid=settings.LOCAL_METRIC_SRID,
+        null=True, blank=True,
+        editable=False
+    )
     created_at = models.DateTimeField(
         verbose_name=_('Created at'),
         default=timezone.now
@@ -283,6 +340,10 @@ class Order(models.Model):
         null=True, blank=True,
         max_length=250,
     )
+    version = models.PositiveIntegerField(
+        verbose_name=_('Version'),
+        default=0
+    )
 
     def __str__(self):
         return f"{self.id} - {self.user.tel_num}"
@@ -362,6 +423,13 @@ class CourierLocation(models.Model):
     class Meta:
         verbose_name = "Courier location"
         verbose_name_plural = "Courier locations"
+        # built concurrently by migration 0008
+        indexes = [
+            # latest location of a courier
+            models.Index(fields=['courier', '-created_at'], name='gur_location_courier_time_idx'),
+            # recent locations of all couriers, rows are appended in time order
+            BrinIndex(fields=['created_at'], name='gur_location_created_brin'),
+        ]
 
     courier = models.ForeignKey(
         CourierAccount,
@@ -0,0 +1,39 @@
+import codecs
+import io
+import re
+
+import orjson
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+
+from .renderers import ORJSONRenderer
+
+# integer literals outside 64 bits, which orjson turns into floats
+HUGE_INTEGER_RE = re.compile(rb"(?<![\d.eE+])(-\d{19,}|\d{20,})")
+
+
+class ORJSONParser(JSONParser):
+    """
+    JSONParser on orjson, which rejects NaN and Infinity like strict mode.
+    Bodies with integers outside 64 bits are parsed by JSONParser, so they
+    stay exact.
+    """
+    renderer_class = ORJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        if not self.strict:
+            return super().parse(stream, media_type, parser_context)
+
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+
+        try:
+            data = stream.read()
+            if HUGE_INTEGER_RE.search(data):
+                return super().parse(io.BytesIO(data), media_type, parser_context)
+            if codecs.lookup(encoding).name != 'utf-8':
+                data = data.decode(encoding)
+            return orjson.loads(data)
+        except ValueError as exc:
+            raise ParseError('JSON parse error - %s' % str(exc))
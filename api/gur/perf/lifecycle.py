@@ -0,0 +1,280 @@
+import asyncio
+import math
+import random
+import time
+import uuid
+
+import numpy as np
+from asgiref.sync import async_to_sync, sync_to_async
+from channels.testing import WebsocketCommunicator
+from django.conf import settings
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from ..consumers.courier import CourierConsumer
+from ..consumers.user import UserConsumer
+from ..models import CustomUser, UserAccount, CourierAccount, Restaurant, Order, OrderStatus
+from ..services.geo import offset_point
+
+# steps in the order they happen, *_push steps are the time from the request
+# that caused a socket event until the client received it
+STEPS = (
+    "discovery", "menu", "cart", "cart_add", "checkout", "neworder_push",
+    "free_orders", "claim", "claim_push", "location", "location_push",
+    "delivered", "delivered_push",
+)
+PERCENTILES = (50, 90, 99)
+
+
+class BenchmarkError(Exception):
+    pass
+
+
+def summarize(samples):
+    """
+    Latency percentiles in milliseconds and queries per call of one step.
+    """
+    durations = np.array([duration for duration, _ in samples]) * 1000
+    queries = [count for _, count in samples if count is not None]
+    summary = {"count": len(samples)}
+    for percentile, value in zip(PERCENTILES, np.percentile(durations, PERCENTILES)):
+        summary[f"p{percentile}"] = round(float(value), 3)
+    summary["mean"] = round(float(durations.mean()), 3)
+    summary["max"] = round(float(durations.max()), 3)
+    summary["queries"] = round(sum(queries) / len(queries), 2) if queries else None
+    summary["max_queries"] = max(queries) if queries else None
+    return summary
+
+
+def compare(previous, current, threshold=0.2):
+    """
+    Steps of `current` that got slower than `previous` by more than the
+    threshold at p50 or p90, or run more queries, as
+    (step, metric, before, after) tuples.
+    """
+    regressions = []
+    for step, summary in current["steps"].items():
+        before = previous["steps"].get(step)
+        if before is None:
+            continue
+        for metric in ("p50", "p90"):
+            if summary[metric] > before[metric] * (1 + threshold):
+                regressions.append((step, metric, before[metric], summary[metric]))
+        if summary["queries"] is not None and before["queries"] is not None \
+                and summary["queries"] > before["queries"]:
+            regressions.append((step, "queries", before["queries"], summary["queries"]))
+    return regressions
+
+
+class LifecycleBenchmark:
+    """
+    Drives whole orders through the API in-process, the way the apps do:
+    a user finds a restaurant, opens its menu, fills the cart and checks out,
+    a courier listening on its socket claims the order, streams its location
+    to the user's socket and delivers it. Every request is timed and its
+    queries counted per step.
+
+    Requests go through the DRF test client and sockets through channels
+    communicators on one event loop, so all database work happens in the
+    calling thread. The restaurants are the all-day ones already in the
+    database (see generate_city); the user and courier are created for the
+    run and deleted afterwards with their orders.
+    """
+
+    def __init__(self, iterations=50, warmup=5, dishes=3, locations=5, seed=1,
+                 timeout=5, log=None):
+        self.iterations = iterations
+        self.warmup = warmup
+        self.dishes = dishes
+        self.locations = locations
+        self.rng = random.Random(seed)
+        self.timeout = timeout
+        self.log = log or (lambda message: None)
+        self.samples = {}
+        self.measuring = False
+        # deliveries stay within reach of both the restaurant and the courier
+        self.reach = min(settings.POSSIBLE_USER_DISTANCE, settings.POSSIBLE_COURIER_DISTANCE) / 2
+
+    def load_restaurants(self):
+        restaurants = [
+            (restaurant_id, location.coords)
+            for restaurant_id, location in Restaurant.objects.filter(
+                open_from__isnull=True,
+                open_to__isnull=True,
+                delivery_zone__isnull=False,
+                dishes__isnull=False,
+            ).distinct().order_by("id").values_list("id", "location")
+        ]
+        if not restaurants:
+            raise BenchmarkError(
+                "There are no all-day restaurants with dishes, generate a city first"
+            )
+        return restaurants
+
+    def create_actors(self):
+        domain = f"{uuid.uuid4().hex[:12]}.bench.test"
+        user = CustomUser.objects.create_user(email=f"user@{domain}", password="bench")
+        courier = CustomUser.objects.create_user(email=f"courier@{domain}", password="bench")
+        self.user_account = UserAccount.objects.create(user=user, first_name="Bench", tel_num="380000000000")
+        self.courier_account = CourierAccount.objects.create(
+            user=courier, first_name="Bench", tel_num="380000000001"
+        )
+        self.user_token = str(AccessToken.for_user(user))
+        self.courier_token = str(AccessToken.for_user(courier))
+        self.user_client = APIClient()
+        self.user_client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.user_token}")
+        self.courier_client = APIClient()
+        self.courier_client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.courier_token}")
+        self.users = [user.id, courier.id]
+
+    def delete_actors(self):
+        # orders protect their users
+        Order.objects.filter(user=self.user_account).delete()
+        CustomUser.objects.filter(id__in=self.users).delete()
+
+    def record(self, step, duration, queries=None):
+        if self.measuring:
+            self.samples.setdefault(step, []).append((duration, queries))
+
+    def request(self, step, client, method, url, data=None, expected=200):
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            response = getattr(client, method)(url, data, format="json")
+            duration = time.perf_counter() - started
+        if response.status_code != expected:
+            raise BenchmarkError(
+                f"{step}: {method.upper()} {url} returned {response.status_code}: "
+                f"{response.content[:500]!r}"
+            )
+        self.record(step, duration, len(queries))
+        return response
+
+    async def connect(self, consumer, path, message):
+        communicator = WebsocketCommunicator(consumer.as_asgi(), path)
+        connected, _ = await communicator.connect(timeout=self.timeout)
+        if not connected:
+            raise BenchmarkError(f"Could not connect to {path}")
+        await communicator.send_json_to(message)
+        # the consumer joins its groups while handling the message, give it
+        # the loop before anything is sent to them
+        await communicator.receive_nothing(timeout=0.1)
+        return communicator
+
+    async def push(self, step, communicator, event_type, started):
+        while True:
+            try:
+                message = await communicator.receive_json_from(timeout=self.timeout)
+            except asyncio.TimeoutError:
+                raise BenchmarkError(f"{step}: no {event_type} event")
+            # couriers also hear about orders being taken
+            if message["type"] == event_type:
+                break
+        self.record(step, time.perf_counter() - started)
+        return message
+
+    async def deliver_order(self, courier_socket):
+        request = sync_to_async(self.request)
+        restaurant_id, (longitude, latitude) = self.rng.choice(self.restaurants)
+        distance = self.reach * math.sqrt(self.rng.random())
+        angle = self.rng.uniform(0, 2 * math.pi)
+        home = offset_point(longitude, latitude, distance * math.cos(angle), distance * math.sin(angle))
+        position = {"longitude": home[0], "latitude": home[1]}
+
+        await request("discovery", self.user_client, "get", reverse("restaurants"), position)
+        menu = await request(
+            "menu", self.user_client, "get",
+            reverse("restaurant-dishes", kwargs={"pk": restaurant_id})
+        )
+        dishes = [dish["id"] for dish in menu.data]
+        order = await request("cart", self.user_client, "get", reverse("orders-retrieve"))
+        order_id = order.data["id"]
+        for dish_id in self.rng.sample(dishes, min(self.dishes, len(dishes))):
+            await request(
+                "cart_add", self.user_client, "post", reverse("order-dish-create"),
+                {"order": order_id, "dish": dish_id, "quantity": self.rng.randint(1, 3)},
+                expected=201
+            )
+
+        started = time.perf_counter()
+        await request(
+            "checkout", self.user_client, "put", reverse("orders-create", kwargs={"pk": order_id}),
+            {"delivery_address": "Bench street 1", "delivery_location": position}
+        )
+        neworder = await self.push("neworder_push", courier_socket, "event.neworder", started)
+        if neworder["content"]["id"] != order_id:
+            raise BenchmarkError(f"neworder_push: got order {neworder['content']['id']}")
+
+        user_socket = await self.connect(UserConsumer, "/socket/user", {
+            "command": "connect_to_order_client",
+            "token": self.user_token,
+            "order_id": order_id,
+        })
+        try:
+            courier_position = {"longitude": longitude, "latitude": latitude}
+            await request(
+                "free_orders", self.courier_client, "get", reverse("courier-free-orders"),
+                courier_position
+            )
+            started = time.perf_counter()
+            await request(
+                "claim", self.courier_client, "put",
+                reverse("courier-free-order-update", kwargs={"pk": order_id}),
+                {"courier_location": courier_position}
+            )
+            await self.push("claim_push", user_socket, "event.orderstatus", started)
+
+            for step in range(self.locations):
+                share = (step + 1) / (self.locations + 1)
+                location = {
+                    "longitude": longitude + (home[0] - longitude) * share,
+                    "latitude": latitude + (home[1] - latitude) * share,
+                }
+                started = time.perf_counter()
+                await request(
+                    "location", self.courier_client, "post",
+                    reverse("courier-location", kwargs={"order_id": order_id}),
+                    {"location": location}, expected=201
+                )
+                await self.push("location_push", user_socket, "event.location", started)
+
+            started = time.perf_counter()
+            await request(
+                "delivered", self.courier_client, "post",
+                reverse("order-statuses", kwargs={"order_id": order_id}),
+                {"status": OrderStatus.DELIVERED}, expected=201
+            )
+            await self.push("delivered_push", user_socket, "event.orderstatus", started)
+        finally:
+            await user_socket.disconnect()
+
+    async def run_orders(self):
+        courier_socket = await self.connect(CourierConsumer, "/socket/courier", {
+            "command": "connect_to_order_queue",
+            "token": self.courier_token,
+        })
+        try:
+            for i in range(self.warmup + self.iterations):
+                self.measuring = i >= self.warmup
+                await self.deliver_order(courier_socket)
+                if (i + 1) % 10 == 0:
+                    self.log(f"  {i + 1} orders")
+        finally:
+            await courier_socket.disconnect()
+
+    def run(self):
+        """
+        Runs the benchmark and returns the summary of every step.
+        """
+        self.restaurants = self.load_restaurants()
+        self.create_actors()
+        try:
+            async_to_sync(self.run_orders)()
+        finally:
+            self.delete_actors()
+        return {
+            step: summarize(self.samples[step])
+            for step in STEPS if step in self.samples
+        }
@@ -0,0 +1,101 @@
+import bisect
+import threading
+
+TIME_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+
+def escape_label(value):
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Histogram:
+    """
+    Prometheus histogram keyed by view name. Kept in-process, so each worker
+    exposes its own series.
+    """
+
+    def __init__(self, name, documentation, buckets):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(buckets)
+        self.series = {}
+        self.lock = threading.Lock()
+
+    def observe(self, view, value):
+        index = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            series = self.series.get(view)
+            if series is None:
+                # per bucket counts, the last one past every bound, then the sum
+                series = self.series[view] = [0] * (len(self.buckets) + 1) + [0]
+            series[index] += 1
+            series[-1] += value
+
+    def render(self):
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} histogram",
+        ]
+        with self.lock:
+            series = {view: list(values) for view, values in self.series.items()}
+        for view, values in sorted(series.items()):
+            label = f'view="{escape_label(view)}"'
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), values):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{{label},le="{format_value(bound)}"}} {cumulative}')
+            lines.append(f"{self.name}_sum{{{label}}} {format_value(values[-1])}")
+            lines.append(f"{self.name}_count{{{label}}} {cumulative}")
+        return "\n".join(lines)
+
+
+REQUEST_DURATION = Histogram(
+    "gur_request_duration_seconds", "Time spent handling the request.", TIME_BUCKETS
+)
+SQL_QUERIES = Histogram(
+    "gur_sql_queries", "SQL queries executed per request.", COUNT_BUCKETS
+)
+SQL_DURATION = Histogram(
+    "gur_sql_duration_seconds", "Time spent in SQL queries per request.", TIME_BUCKETS
+)
+SERIALIZER_DURATION = Histogram(
+    "gur_serializer_duration_seconds", "Time spent in serializers per request.", TIME_BUCKETS
+)
+CHANNEL_SENDS = Histogram(
+    "gur_channel_sends", "Channel layer sends per request.", COUNT_BUCKETS
+)
+CHANNEL_DURATION = Histogram(
+    "gur_channel_send_duration_seconds", "Time spent sending to the channel layer per request.",
+    TIME_BUCKETS
+)
+RESPONSE_SIZE = Histogram(
+    "gur_response_size_bytes", "Size of the response body, or of the frames a consumer sent.",
+    SIZE_BUCKETS
+)
+
+HISTOGRAMS = (
+    REQUEST_DURATION, SQL_QUERIES, SQL_DURATION, SERIALIZER_DURATION,
+    CHANNEL_SENDS, CHANNEL_DURATION, RESPONSE_SIZE,
+)
+
+
+def observe(view, stats, duration):
+    REQUEST_DURATION.observe(view, duration)
+    SQL_QUERIES.observe(view, stats.queries)
+    SQL_DURATION.observe(view, stats.query_time)
+    SERIALIZER_DURATION.observe(view, stats.serializer_time)
+    CHANNEL_SENDS.observe(view, stats.channel_sends)
+    CHANNEL_DURATION.observe(view, stats.channel_time)
+    RESPONSE_SIZE.observe(view, stats.response_size)
+
+
+def render():
+    return "\n".join(histogram.render() for histogram in HISTOGRAMS) + "\n"
@@ -0,0 +1,62 @@
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from .metrics import observe
+from .profiling import PROFILE_HEADER, PROFILE_ID_HEADER, save_profile, start_profiler
+from .queries import check_repeated_queries
+from .stats import collect
+
+UNRESOLVED_VIEW = "<unresolved>"
+
+
+def get_view_name(request):
+    match = getattr(request, "resolver_match", None)
+    return match.view_name if match is not None else UNRESOLVED_VIEW
+
+
+def get_response_size(response):
+    if response.streaming:
+        return int(response.get("Content-Length", 0))
+    return len(response.content)
+
+
+def server_timing(stats, duration):
+    return ", ".join((
+        f'db;dur={stats.query_time * 1000:.2f};desc="{stats.queries} queries"',
+        f"serialize;dur={stats.serializer_time * 1000:.2f}",
+        f'channels;dur={stats.channel_time * 1000:.2f};desc="{stats.channel_sends} sends"',
+        f"total;dur={duration * 1000:.2f}",
+    ))
+
+
+class PerformanceMiddleware:
+    """
+    Records SQL, serializer and channel layer costs of every request per view,
+    for the /metrics endpoint and the Server-Timing header, reports N+1
+    queries and profiles requests that ask for it. Goes first in MIDDLEWARE
+    so the total covers the other middleware too.
+    """
+
+    def __init__(self, get_response):
+        if not settings.PERF_METRICS:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        profiler = start_profiler(request.headers.get(PROFILE_HEADER))
+        with collect(sql_log=profiler is not None) as stats:
+            try:
+                response = self.get_response(request)
+            finally:
+                if profiler is not None:
+                    profiler.stop()
+            stats.response_size = get_response_size(response)
+            duration = stats.duration
+            view = get_view_name(request)
+            observe(view, stats, duration)
+            if settings.PERF_SERVER_TIMING or profiler is not None:
+                response["Server-Timing"] = server_timing(stats, duration)
+        if profiler is not None:
+            response[PROFILE_ID_HEADER] = save_profile(view, profiler, stats)
+        check_repeated_queries(view, stats)
+        return response
@@ -0,0 +1,221 @@
+import json
+import statistics
+from datetime import datetime, timezone
+from pathlib import Path
+
+from django.db import connection, transaction
+from rest_framework.parsers import JSONParser
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from ..models import CustomUser, Order, OrderStatus, CourierLocation, Restaurant
+from ..services.board import free_order_board
+from ..services.dispatch import get_idle_couriers
+from ..services.order import get_open_orders
+from ..views.courier import (
+    CourierFreeOrderListApiView, CourierUpdateFreeOrderApiView, CourierOrderListApiView
+)
+from ..views.order import UserOrderListApiView, UserOrderApiView
+
+# tables that grow with the order history and must never be read whole
+NO_SEQ_SCAN_TABLES = ("gur_orderstatus", "gur_courierlocation")
+INDEX_SCANS = ("Index Scan", "Index Only Scan", "Bitmap Heap Scan")
+SNAPSHOT_DIR = Path(__file__).resolve().parent.parent / "tests" / "plans"
+# the city the snapshots are taken on, with enable_seqscan off; small enough
+# for the tests to generate it and compare their plans with the snapshots
+SNAPSHOT_CITY = dict(
+    restaurants=20, districts=3, users=200, couriers=10, days=30,
+    orders_per_day=40, until=datetime(2021, 6, 1, tzinfo=timezone.utc)
+)
+
+HOT_QUERIES = {}
+
+
+class PlanError(Exception):
+    pass
+
+
+def hot_query(name, spatial=None):
+    """
+    Registers a function building the queryset of a hot query from a Sample.
+    `spatial` is the table whose spatial filter must be served by an index.
+    """
+    def register(build):
+        HOT_QUERIES[name] = (build, spatial)
+        return build
+    return register
+
+
+class Sample:
+    """
+    Ids and a location to explain the hot queries with, taken from the
+    first delivered order in the database so the same data gives the same
+    parameters.
+    """
+
+    def __init__(self):
+        order = Order.objects.filter(
+            courier__isnull=False,
+            delivery_location__isnull=False
+        ).select_related("user", "courier").order_by("id").first()
+        if order is None:
+            raise PlanError("There are no delivered orders, generate a city first")
+        self.order_id = order.id
+        self.user_id = order.user.user_id
+        self.courier_user_id = order.courier.user_id
+        self.location = order.delivery_location
+
+    def view(self, view_class, user_id, data=None, method="get", **kwargs):
+        """
+        View handling a request of the user, so the registry follows the views.
+        """
+        factory = APIRequestFactory()
+        if method == "get":
+            request = factory.get("/", data)
+        else:
+            request = getattr(factory, method)("/", data, format="json")
+        request = Request(request, parsers=[JSONParser()])
+        request.user = CustomUser.objects.get(id=user_id)
+        return view_class(request=request, kwargs=kwargs, format_kwarg=None)
+
+    def view_queryset(self, view_class, user_id, data=None, method="get", **kwargs):
+        return self.view(view_class, user_id, data, method, **kwargs).get_queryset()
+
+
+@hot_query("restaurants_to_position", spatial="gur_restaurant")
+def restaurants_to_position(sample):
+    return Restaurant.objects.get_restaurants_to_position(
+        longitude=sample.location.x, latitude=sample.location.y
+    )
+
+
+@hot_query("free_orders")
+def free_orders(sample):
+    return sample.view_queryset(
+        CourierFreeOrderListApiView, sample.courier_user_id
+    ).only("id", "version")
+
+
+@hot_query("free_order_board")
+def free_order_board_rows(sample):
+    return free_order_board.get_rows()
+
+
+@hot_query("free_order_claim")
+def free_order_claim(sample):
+    # the WHERE of the claim's UPDATE
+    view = sample.view(CourierUpdateFreeOrderApiView, sample.courier_user_id, pk=sample.order_id)
+    return view.get_claim_queryset(sample.location)
+
+
+@hot_query("open_order")
+def open_order(sample):
+    return get_open_orders(sample.user_id)
+
+
+@hot_query("user_order_history")
+def user_order_history(sample):
+    return sample.view_queryset(UserOrderListApiView, sample.user_id)
+
+
+@hot_query("user_order")
+def user_order(sample):
+    return sample.view_queryset(
+        UserOrderApiView, sample.user_id, pk=sample.order_id
+    ).filter(pk=sample.order_id)
+
+
+@hot_query("courier_order_history")
+def courier_order_history(sample):
+    return sample.view_queryset(CourierOrderListApiView, sample.courier_user_id)
+
+
+@hot_query("order_history_statuses")
+def order_history_statuses(sample):
+    # the statuses prefetched for a page of history
+    order_ids = Order.objects.filter(
+        user__user_id=sample.user_id
+    ).order_by("-created_at").values_list("id", flat=True)[:100]
+    return OrderStatus.objects.filter(order_id__in=list(order_ids)).order_by("-created_at")
+
+
+@hot_query("order_courier_location")
+def order_courier_location(sample):
+    # as OrderWithStatusSerializer.get_location
+    return CourierLocation.objects.filter(
+        courier__orders=sample.order_id
+    ).order_by("-created_at")[:1]
+
+
+@hot_query("idle_couriers")
+def idle_couriers(sample):
+    return get_idle_couriers()
+
+
+def explain(queryset, seqscan=True):
+    """
+    Root node of the JSON plan of the queryset. With seqscan off the planner
+    only falls back to sequential scans where no index can serve the query,
+    which keeps plans of a small dataset meaningful.
+    """
+    with transaction.atomic(), connection.cursor() as cursor:
+        if not seqscan:
+            cursor.execute("SET LOCAL enable_seqscan = off")
+        try:
+            return json.loads(queryset.explain(format="json"))[0]["Plan"]
+        finally:
+            if not seqscan:
+                cursor.execute("RESET enable_seqscan")
+
+
+def execution_time(queryset, repeat=5):
+    """
+    Median execution time of the queryset in milliseconds, measured by
+    EXPLAIN ANALYZE on the server.
+    """
+    return statistics.median(
+        json.loads(queryset.explain(analyze=True, format="json"))[0]["Execution Time"]
+        for _ in range(repeat)
+    )
+
+
+def walk(node):
+    yield node
+    for child in node.get("Plans", ()):
+        yield from walk(child)
+
+
+def check_plan(plan, spatial=None):
+    """
+    Problems of a plan: sequential scans of the history tables and spatial
+    filters that are not served by an index.
+    """
+    problems = [
+        f"Seq Scan on {node['Relation Name']}"
+        for node in walk(plan)
+        if node["Node Type"] == "Seq Scan" and node.get("Relation Name") in NO_SEQ_SCAN_TABLES
+    ]
+    if spatial is not None and not any(
+            node["Node Type"] in INDEX_SCANS and node.get("Relation Name") == spatial
+            for node in walk(plan)
+    ):
+        problems.append(f"No index used for the spatial filter on {spatial}")
+    return problems
+
+
+def render_plan(node, depth=0):
+    """
+    Lines of the plan with the node types, tables and indexes but without costs
+    and row estimates, which change with every ANALYZE.
+    """
+    line = node["Node Type"]
+    if "Join Type" in node:
+        line = f"{node['Join Type']} {line}"
+    if "Index Name" in node:
+        line += f" using {node['Index Name']}"
+    if "Relation Name" in node:
+        line += f" on {node['Relation Name']}"
+    lines = ["  " * depth + line]
+    for child in node.get("Plans", ()):
+        lines.extend(render_plan(child, depth + 1))
+    return lines
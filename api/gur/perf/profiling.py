@@ -0,0 +1,171 @@
+import functools
+import json
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from pathlib import Path
+
+from django.conf import settings
+from django.core.signing import BadSignature, TimestampSigner
+
+PROFILE_HEADER = "X-Profile-Token"
+PROFILE_ID_HEADER = "X-Profile-Id"
+# samples taken while a consumer was awaiting rather than running
+WAITING = "(waiting)"
+
+_signer = TimestampSigner(salt="gur.perf.profiling")
+
+# the profiler of the consumer message being handled, carried into the
+# threads running its sync code
+current_profiler = ContextVar("current_profiler", default=None)
+
+
+def make_profile_token():
+    return _signer.sign("profile")
+
+
+def is_profile_token_valid(token):
+    try:
+        return _signer.unsign(token, max_age=settings.PROFILE_TOKEN_MAX_AGE) == "profile"
+    except BadSignature:
+        return False
+
+
+def should_profile(token=None):
+    """
+    Whether to profile a request: it carries a valid profile token or is one
+    of the PROFILE_SAMPLE_RATE sampled requests.
+    """
+    if token and is_profile_token_valid(token):
+        return True
+    return random.random() < settings.PROFILE_SAMPLE_RATE
+
+
+class Profiler:
+    """
+    Statistical profiler of one thread. A background thread looks at the
+    thread's stack every `interval` seconds and counts the stacks in folded
+    form. Time spent in C, like waiting for the database, shows up under
+    the Python frame that called it.
+
+    Consumers share the event loop thread with every other socket, so they
+    pass the frame of their handler as `marker`: samples without it on the
+    stack are taken from the threads running the handler's sync code (see
+    sampled_in_thread), and counted as waiting when there are none.
+    """
+
+    def __init__(self, thread_id=None, marker=None, interval=None):
+        self.thread_id = thread_id or threading.get_ident()
+        self.marker = marker
+        self.interval = interval or settings.PROFILE_INTERVAL
+        self.stacks = Counter()
+        self.sync_thread_ids = set()
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.run, name="gur-profiler", daemon=True)
+
+    def start(self):
+        self.started_at = datetime.now(timezone.utc)
+        self.started = time.perf_counter()
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.stopped.set()
+        self.thread.join()
+        self.duration = time.perf_counter() - self.started
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            frames = sys._current_frames()
+            frame = frames.get(self.thread_id)
+            if frame is None:
+                continue
+            stack = self.fold(frame, self.marker)
+            if stack == WAITING:
+                for thread_id in list(self.sync_thread_ids):
+                    if thread_id in frames:
+                        stack = self.fold(frames[thread_id])
+                        break
+            self.stacks[stack] += 1
+
+    def fold(self, frame, marker=None):
+        names = []
+        seen_marker = marker is None
+        while frame is not None:
+            names.append(f"{frame.f_globals.get('__name__', '?')}.{frame.f_code.co_name}")
+            seen_marker = seen_marker or frame is marker
+            frame = frame.f_back
+        if not seen_marker:
+            return WAITING
+        return ";".join(reversed(names))
+
+
+def sampled_in_thread(func):
+    """
+    Makes the profiler of the calling context sample the thread `func` runs
+    in, for sync code run off the event loop with sync_to_async.
+    """
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        profiler = current_profiler.get()
+        if profiler is None:
+            return func(*args, **kwargs)
+        thread_id = threading.get_ident()
+        profiler.sync_thread_ids.add(thread_id)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            profiler.sync_thread_ids.discard(thread_id)
+    return wrapper
+
+
+def start_profiler(token=None, marker=None):
+    """
+    A started Profiler of the current thread if the request should be
+    profiled, otherwise None.
+    """
+    if not should_profile(token):
+        return None
+    return Profiler(marker=marker).start()
+
+
+def rotate(directory, keep):
+    profiles = sorted({path.stem for path in directory.glob("*.json")})
+    for stem in profiles[:max(0, len(profiles) - keep)]:
+        for suffix in (".json", ".folded"):
+            (directory / f"{stem}{suffix}").unlink(missing_ok=True)
+
+
+def save_profile(view, profiler, stats):
+    """
+    Writes the stacks of a profiled request to PROFILE_DIR as <id>.folded,
+    the input of flamegraph.pl and speedscope, and its SQL log and timings
+    as <id>.json. Only the newest PROFILE_KEEP profiles are kept.
+    Returns the profile id.
+    """
+    directory = Path(settings.PROFILE_DIR)
+    directory.mkdir(parents=True, exist_ok=True)
+    slug = re.sub(r"[^A-Za-z0-9_.-]+", "-", view).strip("-")
+    profile_id = f"{profiler.started_at:%Y%m%dT%H%M%S%f}-{slug}-{uuid.uuid4().hex[:8]}"
+
+    (directory / f"{profile_id}.folded").write_text("".join(
+        f"{stack} {count}\n" for stack, count in profiler.stacks.most_common()
+    ))
+    (directory / f"{profile_id}.json").write_text(json.dumps({
+        "view": view,
+        "started_at": profiler.started_at.isoformat(),
+        "duration": profiler.duration,
+        "interval": profiler.interval,
+        "samples": sum(profiler.stacks.values()),
+        "queries": [
+            {"sql": sql, "duration": duration} for sql, duration in stats.sql_log or ()
+        ],
+    }, indent=2))
+    rotate(directory, settings.PROFILE_KEEP)
+    return profile_id
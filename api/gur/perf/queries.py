@@ -0,0 +1,56 @@
+import functools
+import logging
+import re
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+PLACEHOLDER_RE = re.compile(r"%s")
+STRING_RE = re.compile(r"'(?:[^']|'')*'")
+NUMBER_RE = re.compile(r"\b\d+(?:\.\d+)?\b")
+IN_LIST_RE = re.compile(r"\bIN \(\s*\?(?:\s*,\s*\?)*\s*\)")
+
+# issued by atomic blocks, not by the code being looked at
+TRANSACTION_STATEMENTS = ("SAVEPOINT", "RELEASE SAVEPOINT", "ROLLBACK TO SAVEPOINT")
+
+
+class NPlusOneError(Exception):
+    pass
+
+
+@functools.lru_cache(maxsize=2048)
+def sql_shape(sql):
+    """
+    The statement with its values left out, so the same query for another
+    row, or for another number of ids, has the same shape.
+    """
+    shape = PLACEHOLDER_RE.sub("?", sql)
+    shape = STRING_RE.sub("?", shape)
+    shape = NUMBER_RE.sub("?", shape)
+    return IN_LIST_RE.sub("IN (...)", shape)
+
+
+def find_repeated(shapes, threshold):
+    return [
+        (shape, count) for shape, count in shapes.most_common()
+        if count > threshold and not shape.startswith(TRANSACTION_STATEMENTS)
+    ]
+
+
+def check_repeated_queries(view, stats):
+    """
+    Reports SQL shapes executed more than NPLUSONE_THRESHOLD times while
+    handling one request, as NPLUSONE_ACTION says.
+    """
+    if stats.shapes is None:
+        return
+    repeated = find_repeated(stats.shapes, settings.NPLUSONE_THRESHOLD)
+    if not repeated:
+        return
+    message = "\n".join(
+        f"{view}: query executed {count} times: {shape}" for shape, count in repeated
+    )
+    if settings.NPLUSONE_ACTION == "raise":
+        raise NPlusOneError(message)
+    logger.warning(message)
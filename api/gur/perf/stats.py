@@ -0,0 +1,132 @@
+import functools
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from rest_framework import serializers
+
+from .queries import sql_shape
+
+
+class RequestStats:
+    """
+    Costs of one HTTP request or consumer message, filled in by the
+    instrumentation hooks while it is being handled.
+    """
+    __slots__ = (
+        "started", "queries", "query_time", "serializer_time", "serializing",
+        "channel_sends", "channel_time", "response_size", "shapes", "sql_log",
+    )
+
+    def __init__(self, shapes=False, sql_log=False):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.query_time = 0.0
+        self.serializer_time = 0.0
+        self.serializing = False
+        self.channel_sends = 0
+        self.channel_time = 0.0
+        self.response_size = 0
+        # executions per SQL shape, only kept while looking for N+1 queries
+        self.shapes = Counter() if shapes else None
+        # (sql, seconds) of every query, only kept for profiled requests
+        self.sql_log = [] if sql_log else None
+
+    @property
+    def duration(self):
+        return time.perf_counter() - self.started
+
+
+_current_stats = ContextVar("gur_request_stats", default=None)
+
+
+def current_stats():
+    return _current_stats.get()
+
+
+@contextmanager
+def collect(sql_log=False):
+    stats = RequestStats(shapes=settings.NPLUSONE_ACTION is not None, sql_log=sql_log)
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+
+
+def record_query(execute, sql, params, many, context):
+    """
+    Database execute wrapper, installed on every connection.
+    """
+    stats = _current_stats.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        duration = time.perf_counter() - started
+        stats.queries += 1
+        stats.query_time += duration
+        if stats.shapes is not None:
+            stats.shapes[sql_shape(sql)] += 1
+        if stats.sql_log is not None:
+            stats.sql_log.append((sql, duration))
+
+
+def install_query_recorder(sender, connection, **kwargs):
+    # connection_created fires again for every reconnect of the same wrapper
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+@contextmanager
+def serialization():
+    stats = _current_stats.get()
+    # nested serializers are part of the outermost one's time
+    if stats is None or stats.serializing:
+        yield
+        return
+    stats.serializing = True
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        stats.serializer_time += time.perf_counter() - started
+        stats.serializing = False
+
+
+def record_channel_send(duration):
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.channel_sends += 1
+        stats.channel_time += duration
+
+
+def record_response_size(size):
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.response_size += size
+
+
+def timed(function):
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        with serialization():
+            return function(*args, **kwargs)
+    wrapper.timed = True
+    return wrapper
+
+
+def instrument_serializers():
+    """
+    Times DRF serialization for every serializer, including those of third
+    party views, by wrapping the entry points views call.
+    """
+    for cls in (serializers.BaseSerializer, serializers.Serializer, serializers.ListSerializer):
+        if "data" in vars(cls) and not getattr(cls.data.fget, "timed", False):
+            cls.data = property(timed(cls.data.fget))
+        if "is_valid" in vars(cls) and not getattr(cls.is_valid, "timed", False):
+            cls.is_valid = timed(cls.is_valid)
@@ -0,0 +1,67 @@
+from importlib import import_module
+
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+
+class QueryBudgetMixin:
+    """
+    Test case mixin checking every URL of `budget_urlconf` against the most
+    queries it may run, with the data grown to each of `sizes`. A URL
+    named "restaurant-dishes" is requested by `request_restaurant_dishes`,
+    and the data is grown by `grow_to`. The query count must not grow with
+    the data and no statement may repeat more than NPLUSONE_THRESHOLD times.
+    """
+    budget_urlconf = 'gur.urls'
+    budgets = {}
+    sizes = (1, 10, 100)
+    nplusone_threshold = 5
+
+    def grow_to(self, size):
+        raise NotImplementedError
+
+    def get_url_names(self):
+        return {
+            pattern.name for pattern in import_module(self.budget_urlconf).urlpatterns
+        }
+
+    def get_budget_request(self, name):
+        return getattr(self, f"request_{name.replace('-', '_')}", None)
+
+    def run_budget_request(self, name):
+        # cold caches, and every request sees the same data
+        cache.clear()
+        with transaction.atomic():
+            with CaptureQueriesContext(connection) as queries:
+                response = self.get_budget_request(name)()
+            transaction.set_rollback(True)
+        self.assertLess(response.status_code, 400, f"{name}: {response.content}")
+        return [query['sql'] for query in queries.captured_queries]
+
+    def test_every_url_has_a_budget(self):
+        for name in self.get_url_names():
+            with self.subTest(url=name):
+                self.assertIn(name, self.budgets)
+                self.assertIsNotNone(self.get_budget_request(name))
+
+    def test_query_budgets(self):
+        counts = {name: [] for name in self.budgets}
+        with self.settings(NPLUSONE_ACTION='raise', NPLUSONE_THRESHOLD=self.nplusone_threshold):
+            for size in self.sizes:
+                self.grow_to(size)
+                for name, budget in self.budgets.items():
+                    with self.subTest(url=name, size=size):
+                        queries = self.run_budget_request(name)
+                        self.assertLessEqual(len(queries), budget, "\n".join(queries))
+                        counts[name].append(len(queries))
+
+        for name, url_counts in counts.items():
+            if len(url_counts) != len(self.sizes):
+                # already reported above
+                continue
+            with self.subTest(url=name):
+                self.assertLessEqual(
+                    max(url_counts), url_counts[0],
+                    f"{name}: queries grow with the data {dict(zip(self.sizes, url_counts))}"
+                )
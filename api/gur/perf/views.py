@@ -0,0 +1,15 @@
+from django.conf import settings
+from django.http import HttpResponse, Http404
+from django.views.decorators.http import require_safe
+
+from .metrics import render
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+@require_safe
+def metrics_view(request):
+    allowed = settings.METRICS_ALLOWED_IPS
+    if allowed is not None and request.META.get("REMOTE_ADDR") not in allowed:
+        raise Http404
+    return HttpResponse(render(), content_type=PROMETHEUS_CONTENT_TYPE)
@@ -1,6 +1,6 @@
 from rest_framework.permissions import BasePermission
 
-from .models import RestaurantAdmin, CourierAccount
+from .services.principal import get_principal
 
 
 class IsAdmin(BasePermission):
@@ -16,10 +16,7 @@ class IsRestaurantAdmin(BasePermission):
     def has_object_permission(self, request, view, obj):
         if not request.user or not request.user.is_authenticated:
             return False
-        return RestaurantAdmin.objects.filter(
-            user_account__user=request.user,
-            rest=obj
-        ).exists() or request.user.is_superuser
+        return get_principal(request.user).is_restaurant_admin(obj.id)
 
 
 class IsCourier(BasePermission):
@@ -27,7 +24,7 @@ class IsCourier(BasePermission):
     def has_permission(self, request, view):
         if not request.user or not request.user.is_authenticated:
             return False
-        return CourierAccount.objects.filter(user=request.user).exists()
+        return get_principal(request.user).is_courier
 
 
 class PermissionsRequired(BasePermission):
@@ -40,4 +37,4 @@ class PermissionsRequired(BasePermission):
         required_permissions = required_permissions + getattr(
             view, 'permissions_' + str(request.method.lower()), []
         )
-        return request.user.has_perms(required_permissions)
+        return get_principal(request.user).has_perms(required_permissions)
@@ -0,0 +1,64 @@
+import math
+
+import orjson
+from django.contrib.gis.geos import Point
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+# datetimes go through DRF's encoder so their format stays the same
+ORJSON_OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+
+LINE_SEPARATOR = "\u2028".encode()
+PARAGRAPH_SEPARATOR = "\u2029".encode()
+
+_encoder = JSONEncoder()
+
+
+def default(obj):
+    if isinstance(obj, Point):
+        return {"latitude": obj.y, "longitude": obj.x}
+    return _encoder.default(obj)
+
+
+def has_non_finite_float(data):
+    if isinstance(data, float):
+        return not math.isfinite(data)
+    if isinstance(data, dict):
+        data = data.values()
+    elif not isinstance(data, (list, tuple)):
+        return False
+    return any(has_non_finite_float(item) for item in data)
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer producing the same bytes with orjson. Indented output and
+    ASCII-only, non-compact or non-strict settings are left to the stdlib
+    renderer.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+
+        renderer_context = renderer_context or {}
+        if self.ensure_ascii or not self.compact or not self.strict or \
+                self.get_indent(accepted_media_type, renderer_context) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(data, default=default, option=ORJSON_OPTIONS)
+        except orjson.JSONEncodeError:
+            # integers beyond 64 bits, or a type the encoder rejects,
+            # which then fails the same way as before
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # orjson writes NaN and Infinity as null where the strict renderer
+        # raises, the data is only walked when a null was written
+        if b'null' in ret and has_non_finite_float(data):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # as JSONRenderer, keep the output a strict javascript subset
+        if LINE_SEPARATOR in ret or PARAGRAPH_SEPARATOR in ret:
+            ret = ret.replace(LINE_SEPARATOR, b'\\u2028').replace(PARAGRAPH_SEPARATOR, b'\\u2029')
+        return ret
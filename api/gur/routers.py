@@ -0,0 +1,148 @@
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core import checks
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+# caches each worker keeps to itself, so it would miss the pins of the others
+PROCESS_LOCAL_CACHES = (
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+)
+
+
+class RoutingState:
+    """
+    Database routing of the request being handled: whether its reads may go
+    to a replica, the replica it reads from and whether it wrote anything.
+    """
+    __slots__ = ("use_replica", "replica", "wrote")
+
+    def __init__(self):
+        self.use_replica = False
+        self.replica = None
+        self.wrote = False
+
+
+_current_state = ContextVar("gur_routing_state", default=None)
+
+
+@contextmanager
+def use_primary():
+    """
+    Sends the reads inside to the primary. For reads that fill shared caches,
+    which would otherwise keep what a lagging replica returned.
+    """
+    state = _current_state.get()
+    if state is None or not state.use_replica:
+        yield
+        return
+    state.use_replica = False
+    try:
+        yield
+    finally:
+        state.use_replica = not state.wrote
+
+
+def pin_cache_key(user_id):
+    return f"db-pin:{user_id}"
+
+
+def is_pinned(user_id):
+    return user_id is not None and cache.get(pin_cache_key(user_id)) is not None
+
+
+def pin_to_primary(user_id):
+    cache.set(pin_cache_key(user_id), True, settings.REPLICA_PIN_SECONDS)
+
+
+def get_token_user_id(request):
+    # runs before the view authenticates, so it verifies the token itself
+    authentication = JWTAuthentication()
+    header = authentication.get_header(request)
+    raw_token = None if header is None else authentication.get_raw_token(header)
+    if raw_token is None:
+        return None
+    try:
+        return authentication.get_validated_token(raw_token).get(api_settings.USER_ID_CLAIM)
+    except InvalidToken:
+        return None
+
+
+def check_shared_cache(app_configs, **kwargs):
+    if settings.REPLICA_DATABASES and settings.CACHES["default"]["BACKEND"] in PROCESS_LOCAL_CACHES:
+        return [checks.Error(
+            "REPLICA_DATABASES needs a cache shared by all workers to pin users to the primary.",
+            hint="Set GUR_CACHE_REDIS_URL.",
+            id="gur.E001",
+        )]
+    return []
+
+
+class ReplicaRouter:
+    """
+    Sends the reads of views with `replica_reads = True` to one of
+    REPLICA_DATABASES when the request is safe and its user has not written
+    in the last REPLICA_PIN_SECONDS. Everything else, and every read after a
+    write in the same request, goes to the primary.
+    """
+
+    def db_for_read(self, model, **hints):
+        state = _current_state.get()
+        if state is None or not state.use_replica or not settings.REPLICA_DATABASES:
+            return None
+        # one replica per request, so its reads see a single snapshot in time
+        if state.replica is None:
+            state.replica = random.choice(settings.REPLICA_DATABASES)
+        return state.replica
+
+    def db_for_write(self, model, **hints):
+        state = _current_state.get()
+        if state is not None:
+            state.wrote = True
+            state.use_replica = False
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # replicas hold the same rows as the primary
+        return True
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Sets up the routing state of every request for ReplicaRouter and pins
+    users who wrote to the primary, so they read their own writes.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        state = RoutingState()
+        token = _current_state.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current_state.reset(token)
+        if state.wrote and settings.REPLICA_DATABASES:
+            # authenticated by the view
+            user = getattr(request, "user", None)
+            if user is not None and user.is_authenticated:
+                pin_to_primary(user.id)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        state = _current_state.get()
+        view_class = getattr(view_func, "cls", view_func)
+        state.use_replica = (
+            request.method in SAFE_METHODS
+            and getattr(view_class, "replica_reads", False)
+            and not is_pinned(get_token_user_id(request))
+        )
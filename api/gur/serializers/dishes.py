@@ -1,23 +1,30 @@
 from rest_framework import serializers
 from ..models import Dish, OrderDish
+from .fieldsets import SparseFieldsetSerializerMixin
+from .photo import PhotoField, PhotoSerializerMixin, PhotoVariantsField
 
 
-class DishSerializer(serializers.ModelSerializer):
+class DishSerializer(PhotoSerializerMixin, SparseFieldsetSerializerMixin, serializers.ModelSerializer):
+    dish_photo = PhotoField()
+    dish_photo_variants = PhotoVariantsField(source='dish_photo')
+
     class Meta:
         model = Dish
         fields = ['id', 'restaurant',
                   'name', 'description', 'price',
-                  'gramme', 'dish_photo']
+                  'gramme', 'dish_photo', 'dish_photo_variants']
 
 
 class DishInOrderSerializer(serializers.ModelSerializer):
     quantity = serializers.IntegerField()
+    dish_photo = PhotoField(read_only=True)
+    dish_photo_variants = PhotoVariantsField(source='dish_photo')
 
     class Meta:
         model = Dish
         fields = ['id', 'restaurant', 'name',
                   'description', 'price', 'gramme',
-                  'dish_photo', 'quantity']
+                  'dish_photo', 'dish_photo_variants', 'quantity']
 
 
 class OrderedDishSerializer(serializers.ModelSerializer):
@@ -0,0 +1,227 @@
+import operator
+
+from rest_framework.fields import DateTimeField, TimeField
+
+from ..models import OrderStatus, OrderDish, Restaurant, is_open_between
+from ..perf.stats import serialization
+from ..services.photos import photo_url, photo_variant_urls
+
+TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# DRF fields whose formatting the read path has to reproduce exactly
+_datetime_field = DateTimeField()
+_time_field = TimeField()
+
+
+def point(value):
+    return {"latitude": value.y, "longitude": value.x}
+
+
+def timestamp(value):
+    return value.strftime(TIMESTAMP_FORMAT)
+
+
+def status_representation(status):
+    # OrderStatusSerializer
+    return {
+        "status": status["status"],
+        "created_at": _datetime_field.to_representation(status["created_at"]),
+        "timestamp": timestamp(status["created_at"]),
+    }
+
+
+def compile_getter(columns, function):
+    if len(columns) == 1:
+        column = columns[0]
+        if function is None:
+            return operator.itemgetter(column)
+
+        def getter(row):
+            value = row[column]
+            # DRF renders None without calling the field
+            return None if value is None else function(value)
+        return getter
+
+    def getter(row):
+        return function(*[row[column] for column in columns])
+    return getter
+
+
+def prefixed(fields, prefix):
+    return tuple(
+        (name, tuple(prefix + column for column in columns), function)
+        for name, columns, function in fields
+    )
+
+
+class ValuesSerializer:
+    """
+    Read-only counterpart of a DRF serializer for hot list endpoints. Builds
+    plain dicts from `.values()` rows through a field mapping compiled once
+    per instance, and must render exactly what the mirrored serializer does.
+    """
+    # (output name, columns it reads, function of their values or None)
+    fields = ()
+
+    def __init__(self, fields=None):
+        self.selected = [spec for spec in self.fields if fields is None or spec[0] in fields]
+        self.mapping = [
+            (name, compile_getter(columns, function))
+            for name, columns, function in self.selected
+        ]
+
+    @property
+    def columns(self):
+        return list(dict.fromkeys(
+            column for _, columns, _ in self.selected for column in columns
+            if not column.startswith('_')
+        ))
+
+    def serialize(self, rows):
+        mapping = self.mapping
+        with serialization():
+            return [{name: get(row) for name, get in mapping} for row in rows]
+
+    def prepare(self, rows):
+        """
+        Attaches related data to the rows, keyed by names starting with '_'.
+        """
+
+    def serialize_queryset(self, queryset):
+        rows = list(queryset.prefetch_related(None).values(*self.columns))
+        self.prepare(rows)
+        return self.serialize(rows)
+
+
+class DishValuesSerializer(ValuesSerializer):
+    """
+    Mirrors DishSerializer.
+    """
+    fields = (
+        ('id', ('id',), None),
+        ('restaurant', ('restaurant_id',), None),
+        ('name', ('name',), None),
+        ('description', ('description',), None),
+        ('price', ('price',), None),
+        ('gramme', ('gramme',), None),
+        ('dish_photo', ('dish_photo',), photo_url),
+        ('dish_photo_variants', ('dish_photo',), photo_variant_urls),
+    )
+
+
+class OrderedDishValuesSerializer(ValuesSerializer):
+    """
+    Mirrors OrderedDishSerializer over OrderDish rows.
+    """
+    fields = (('quantity', ('quantity',), None),) + prefixed(DishValuesSerializer.fields, 'dish__')
+
+
+class RestaurantValuesSerializer(ValuesSerializer):
+    """
+    Mirrors RestaurantSerializer.
+    """
+    fields = (
+        ('id', ('id',), None),
+        ('name', ('name',), None),
+        ('open_from', ('open_from',), _time_field.to_representation),
+        ('open_to', ('open_to',), _time_field.to_representation),
+        ('rest_photo', ('rest_photo',), photo_url),
+        ('rest_photo_variants', ('rest_photo',), photo_variant_urls),
+        ('is_open', ('open_from', 'open_to'), is_open_between),
+        ('rest_address', ('rest_address',), None),
+        ('location', ('location',), point),
+    )
+
+
+class OrderHistoryValuesSerializer(ValuesSerializer):
+    """
+    Mirrors OrderWithFirstStatusSerializer with the latest status prefetched.
+    """
+    fields = (
+        ('id', ('id',), None),
+        ('summary', ('summary',), None),
+        ('order_details', ('order_details',), None),
+        ('delivery_address', ('delivery_address',), None),
+        ('order_status', ('_last_status',), status_representation),
+        ('created_at', ('created_at',), timestamp),
+    )
+
+    def prepare(self, rows):
+        if not any(name == 'order_status' for name, _ in self.mapping):
+            return
+        statuses = {
+            status["order_id"]: status
+            for status in OrderStatus.objects.filter(
+                order_id__in=[row['id'] for row in rows]
+            ).order_by(
+                'order_id', '-created_at'
+            ).distinct(
+                'order_id'
+            ).values('order_id', 'status', 'created_at')
+        }
+        for row in rows:
+            row['_last_status'] = statuses.get(row['id'])
+
+    @property
+    def columns(self):
+        # rows are matched with their statuses by id
+        return list(dict.fromkeys(['id'] + super().columns))
+
+
+class CourierOrderValuesSerializer(ValuesSerializer):
+    """
+    Mirrors CourierOrderDetailSerializer.
+    """
+    fields = (
+        ('id', ('id',), None),
+        ('user', ('user__first_name', 'user__tel_num'), lambda first_name, tel_num: {
+            "first_name": first_name,
+            "tel_num": tel_num,
+        }),
+        ('created_at', ('created_at',), timestamp),
+        ('summary', ('summary',), None),
+        ('order_details', ('order_details',), None),
+        ('delivery_address', ('delivery_address',), None),
+        ('delivery_location', ('delivery_location',), point),
+        ('restaurant', ('_restaurant',), None),
+        ('dishes', ('_dishes',), None),
+    )
+
+    # restaurant the serializer renders for orders without dishes
+    empty_restaurant = {"name": "", "rest_address": "", "location": None}
+
+    def prepare(self, rows):
+        dishes_serializer = OrderedDishValuesSerializer()
+        dish_rows = list(
+            OrderDish.objects.filter(
+                order_id__in=[row['id'] for row in rows]
+            ).order_by(
+                'order_id', 'id'
+            ).values(*dict.fromkeys(
+                ['order_id', 'dish__restaurant_id'] + dishes_serializer.columns
+            ))
+        )
+        dishes = {}
+        restaurant_ids = {}
+        for dish_row, representation in zip(dish_rows, dishes_serializer.serialize(dish_rows)):
+            order_id = dish_row['order_id']
+            dishes.setdefault(order_id, []).append(representation)
+            restaurant_id = dish_row['dish__restaurant_id']
+            # the serializer takes the first restaurant by id
+            if restaurant_ids.get(order_id, restaurant_id) >= restaurant_id:
+                restaurant_ids[order_id] = restaurant_id
+
+        restaurants = {
+            restaurant['id']: {
+                "name": restaurant['name'],
+                "rest_address": restaurant['rest_address'],
+                "location": point(restaurant['location']),
+            }
+            for restaurant in Restaurant.objects.filter(
+                id__in=set(restaurant_ids.values())
+            ).values('id', 'name', 'rest_address', 'location')
+        }
+        for row in rows:
+            row['_dishes'] = dishes.get(row['id'], [])
+            restaurant = restaurants.get(restaurant_ids.get(row['id']))
+            row['_restaurant'] = dict(restaurant or self.empty_restaurant)
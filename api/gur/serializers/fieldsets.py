@@ -0,0 +1,11 @@
+class SparseFieldsetSerializerMixin:
+    """
+    Takes an optional `fields` argument and drops every other field.
+    """
+
+    def __init__(self, *args, **kwargs):
+        fields = kwargs.pop('fields', None)
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
@@ -1,4 +1,3 @@
-from django.conf import settings
 from django.contrib.gis.geos import GEOSGeometry
 from django.db.models import F
 from django.db.transaction import atomic
@@ -8,6 +7,7 @@ from datetime import datetime
 from rest_framework.exceptions import ValidationError, PermissionDenied
 
 from .dishes import DishInOrderSerializer, OrderedDishSerializer
+from .fieldsets import SparseFieldsetSerializerMixin
 from .user import UserForCourierAccountSerializer
 from ..models import Order, OrderStatus, OrderDish, Restaurant, CourierLocation, Dish
 from .restaurant import RestaurantSerializerForOrder, RestaurantSerializerForCourier
@@ -64,7 +64,7 @@ class OrderSerializer(serializers.ModelSerializer):
         first_dish = instance.order_dishes.first()
         restaurant = Restaurant.objects.filter(
             dishes__order_dishes=first_dish,
-            location__dwithin=(order_location, settings.POSSIBLE_USER_DISTANCE)
+            delivery_zone__contains=order_location
         ).first()
 
         if not restaurant:
@@ -75,12 +75,13 @@ class OrderSerializer(serializers.ModelSerializer):
 
         OrderStatus.objects.create(status="P", order=instance)
         instance.summary = get_order_summary(instance.id)
-        instance.save(update_fields=["summary"])
+        instance.version += 1
+        instance.save(update_fields=["summary", "version"])
 
         return instance
 
 
-class OrderWithFirstStatusSerializer(serializers.ModelSerializer):
+class OrderWithFirstStatusSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     order_status = serializers.SerializerMethodField()
 
     class Meta:
@@ -98,7 +99,8 @@ class OrderWithFirstStatusSerializer(serializers.ModelSerializer):
 
     def to_representation(self, instance):
         rep = super().to_representation(instance)
-        rep['created_at'] = instance.created_at.strftime('%Y-%m-%d %H:%M:%S')
+        if 'created_at' in rep:
+            rep['created_at'] = instance.created_at.strftime('%Y-%m-%d %H:%M:%S')
         return rep
 
 
@@ -140,9 +142,11 @@ class OrderWithStatusSerializer(serializers.ModelSerializer):
 
     def get_location(self, obj):
         try:
-            if not obj.statuses.filter(
-                    status__in=OrderStatus.FINISHED_STATUSES
-            ).exists():
+            # statuses are prefetched with the order
+            if not any(
+                    order_status.status in OrderStatus.FINISHED_STATUSES
+                    for order_status in obj.statuses.all()
+            ):
                 location = CourierLocation.objects.filter(
                     courier__orders=obj
                 ).latest('created_at')
@@ -171,7 +175,7 @@ class OrderStatusSerializer(serializers.ModelSerializer):
 
     def validate(self, attrs):
         order = self.context.get("order")
-        if order.courier and order.courier.user == self.context["request"].user:
+        if order.courier and order.courier.user_id == self.context["request"].user.id:
             if attrs['status'] == OrderStatus.CANCELLED:
                 if order.statuses.filter(
                         status=OrderStatus.DELIVERED
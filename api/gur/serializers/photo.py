@@ -0,0 +1,79 @@
+from rest_framework import serializers
+
+from ..services.photos import (
+    PHOTO_FIELD_LENGTH, PhotoError, decode_photo, is_external_url,
+    photo_store, photo_url, photo_variant_urls
+)
+
+
+class PendingPhoto:
+    """
+    Image bytes a PhotoField validated, written to the store on save.
+    """
+
+    def __init__(self, data):
+        self.data = data
+
+    def store(self):
+        name = photo_store.save(self.data)
+        photo_store.schedule_variants(name)
+        return name
+
+
+class PhotoField(serializers.CharField):
+    """
+    Accepts an image URL or a base64 encoded image. Encoded images are moved
+    to the photo store by PhotoSerializerMixin.save, and only their
+    content-addressed name is kept.
+    """
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault('required', False)
+        kwargs.setdefault('allow_null', True)
+        kwargs.setdefault('allow_blank', True)
+        kwargs.setdefault('trim_whitespace', True)
+        super().__init__(**kwargs)
+
+    def to_internal_value(self, data):
+        value = super().to_internal_value(data)
+        if not value or photo_store.exists(value):
+            return value
+        if is_external_url(value):
+            if len(value) > PHOTO_FIELD_LENGTH:
+                raise serializers.ValidationError("Photo URL is too long")
+            return value
+        name = photo_store.name_from_url(value)
+        if name is not None:
+            return name
+        try:
+            data = decode_photo(value)
+            photo_store.check(data)
+        except PhotoError as error:
+            raise serializers.ValidationError(str(error))
+        return PendingPhoto(data)
+
+    def to_representation(self, value):
+        return photo_url(value)
+
+
+class PhotoSerializerMixin:
+    """
+    Stores the photos of its PhotoFields on save, which views call after
+    their permission checks, so rejected requests leave no files behind.
+    """
+
+    def save(self, **kwargs):
+        for field, value in self.validated_data.items():
+            if isinstance(value, PendingPhoto):
+                self.validated_data[field] = value.store()
+        return super().save(**kwargs)
+
+
+class PhotoVariantsField(serializers.ReadOnlyField):
+    """
+    URLs of the resized variants of a stored photo, by variant and format.
+    External photos have no variants.
+    """
+
+    def to_representation(self, value):
+        return photo_variant_urls(value)
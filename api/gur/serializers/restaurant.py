@@ -1,16 +1,60 @@
+import json
+
+from django.contrib.gis.geos import GEOSGeometry, Polygon
+from django.contrib.gis.geos.error import GEOSException
 from rest_framework import serializers
 from ..models import Restaurant
 from drf_extra_fields.geo_fields import PointField
+from .fieldsets import SparseFieldsetSerializerMixin
+from .photo import PhotoField, PhotoSerializerMixin, PhotoVariantsField
+
+
+class PolygonGeoJSONField(serializers.Field):
+    default_error_messages = {
+        'invalid': 'Enter a valid GeoJSON polygon.',
+    }
+
+    def to_internal_value(self, value):
+        try:
+            polygon = GEOSGeometry(
+                value if isinstance(value, str) else json.dumps(value)
+            )
+        except (GEOSException, ValueError, TypeError):
+            self.fail('invalid')
+        if not isinstance(polygon, Polygon) or not polygon.valid:
+            self.fail('invalid')
+        polygon.srid = 4326
+        return polygon
+
+    def to_representation(self, value):
+        return json.loads(value.geojson)
 
 
-class RestaurantSerializer(serializers.ModelSerializer):
+class RestaurantSerializer(PhotoSerializerMixin, SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     location = PointField(required=True)
+    rest_photo = PhotoField()
+    rest_photo_variants = PhotoVariantsField(source='rest_photo')
 
     class Meta:
         model = Restaurant
         fields = ['id', 'name', 'open_from',
-                  'open_to', 'rest_photo', 'is_open',
-                  'rest_address', 'location']
+                  'open_to', 'rest_photo', 'rest_photo_variants',
+                  'is_open', 'rest_address', 'location']
+
+
+class RestaurantAdminSerializer(RestaurantSerializer):
+    delivery_zone = PolygonGeoJSONField(required=False, allow_null=True)
+
+    class Meta(RestaurantSerializer.Meta):
+        fields = RestaurantSerializer.Meta.fields + ['delivery_zone']
+
+    def update(self, instance, validated_data):
+        # a moved restaurant gets the default zone around its new location
+        # unless a zone is sent along with it
+        if 'location' in validated_data and 'delivery_zone' not in validated_data \
+                and validated_data['location'] != instance.location:
+            validated_data['delivery_zone'] = None
+        return super().update(instance, validated_data)
 
 
 class RestaurantSerializerForOrder(serializers.ModelSerializer):
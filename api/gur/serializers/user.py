@@ -1,22 +1,23 @@
+from django.db import transaction
 from rest_framework import serializers
-from ..models import UserAccount, CourierAccount, RestaurantAdmin
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+from ..authentication import CLAIMS_KEY, add_principal_claims, claims_are_current
+from ..models import UserAccount, CourierAccount
 from django.contrib.auth import get_user_model
 
 
 class UserAccountSerializer(serializers.ModelSerializer):
-    admin = serializers.SerializerMethodField()
-    partial_admin = serializers.SerializerMethodField()
+    # annotated by get_user_account_queryset
+    admin = serializers.BooleanField(read_only=True)
+    partial_admin = serializers.BooleanField(read_only=True)
 
     class Meta:
         model = UserAccount
         fields = ['first_name', 'tel_num', 'admin', 'partial_admin']
 
-    def get_admin(self, instance):
-        return instance.user.is_superuser
-
-    def get_partial_admin(self, instance):
-        return instance.restaurant_admins.exists()
-
 
 class UserSerializer(serializers.ModelSerializer):
     class Meta:
@@ -36,8 +37,10 @@ class UserSerializer(serializers.ModelSerializer):
                 'invalid': 'Будь ласка, вкажіть валідний емейл.'}}
         }
 
+    @transaction.atomic
     def create(self, validated_data):
         user = get_user_model().objects.create_user(**validated_data)
+        UserAccount.objects.create(user=user)
         return user
 
     def update(self, instance, validated_data):
@@ -57,3 +60,25 @@ class UserForCourierAccountSerializer(serializers.ModelSerializer):
     class Meta:
         model = UserAccount
         fields = ['first_name', 'tel_num']
+
+
+class ClaimsTokenObtainPairSerializer(TokenObtainPairSerializer):
+    @classmethod
+    def get_token(cls, user):
+        return add_principal_claims(super().get_token(user), user)
+
+
+class ClaimsTokenRefreshSerializer(TokenRefreshSerializer):
+    def validate(self, attrs):
+        data = super().validate(attrs)
+        access = AccessToken(data["access"])
+        if CLAIMS_KEY in access and not claims_are_current(access):
+            # roles changed since the refresh token was issued
+            user = get_user_model().objects.filter(
+                id=access[api_settings.USER_ID_CLAIM],
+                is_active=True
+            ).first()
+            if user is None:
+                raise AuthenticationFailed("User not found or inactive")
+            data["access"] = str(add_principal_claims(access, user))
+        return data
@@ -0,0 +1,86 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Exists, F, OuterRef
+from django.http import Http404
+
+from ..models import UserAccount, CourierAccount, RestaurantAdmin
+from ..serializers.user import UserAccountSerializer, CourierAccountSerializer
+from .principal import get_principal
+
+USER_PROFILE = "user"
+COURIER_PROFILE = "courier"
+
+
+def profile_cache_key(kind, user_id):
+    return f"profile:{kind}:{user_id}"
+
+
+def get_user_account_queryset():
+    return UserAccount.objects.annotate(
+        admin=F("user__is_superuser"),
+        partial_admin=Exists(
+            RestaurantAdmin.objects.filter(user_account=OuterRef("pk"))
+        )
+    )
+
+
+def get_user_account(user):
+    """
+    The user's account in one SELECT. Users registered before accounts were
+    created at registration get theirs with a single insert on first access.
+    """
+    principal = get_principal(user)
+    account = None
+    if principal.user_account_id is not None:
+        account = get_user_account_queryset().filter(
+            id=principal.user_account_id, user_id=user.id
+        ).first()
+    if account is None:
+        account = UserAccount.objects.create(user_id=user.id)
+        account.admin = principal.is_superuser
+        account.partial_admin = False
+    return account
+
+
+def get_courier_account(user):
+    """
+    The user's courier account, None for users who aren't couriers.
+    """
+    principal = get_principal(user)
+    if principal.courier_account_id is None:
+        return None
+    return CourierAccount.objects.filter(
+        id=principal.courier_account_id, user_id=user.id
+    ).first()
+
+
+def get_or_create_courier_account(user):
+    account = get_courier_account(user)
+    if account is None:
+        account, _ = CourierAccount.objects.get_or_create(user_id=user.id)
+    return account
+
+
+PROFILES = {
+    USER_PROFILE: (get_user_account, UserAccountSerializer),
+    COURIER_PROFILE: (get_courier_account, CourierAccountSerializer),
+}
+
+
+def get_profile_payload(kind, user):
+    key = profile_cache_key(kind, user.id)
+    data = cache.get(key)
+    if data is None:
+        get_account, serializer_class = PROFILES[kind]
+        account = get_account(user)
+        if account is None:
+            raise Http404
+        data = serializer_class(account).data
+        cache.set(key, data, settings.PROFILE_CACHE_TIMEOUT)
+    return data
+
+
+def invalidate_profiles(user_ids):
+    cache.delete_many([
+        profile_cache_key(kind, user_id) for user_id in user_ids for kind in PROFILES
+    ])
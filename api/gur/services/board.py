@@ -0,0 +1,123 @@
+import threading
+import time
+from collections import defaultdict, namedtuple
+from math import cos, radians, floor
+
+from django.conf import settings
+
+from ..models import Order, OrderStatus
+from .geo import haversine_distance, METERS_PER_DEGREE
+
+BoardEntry = namedtuple("BoardEntry", ["id", "version", "latitude", "longitude", "distance"])
+
+
+class FreeOrderBoard:
+    """
+    Process-local board of orders waiting for a courier, bucketed into a
+    uniform lat/long grid. Kept current by order status events and rebuilt
+    from the database when it gets older than `refresh_interval` seconds.
+
+    Events only reach the board of the worker that handled them, so other
+    workers list new orders, and keep listing claimed ones, for up to
+    `refresh_interval` seconds. Claims are checked against the database,
+    a claim of an order taken elsewhere fails and drops it from the board.
+    """
+
+    def __init__(self, cell_size=500, refresh_interval=60):
+        self.cell_degrees = cell_size / METERS_PER_DEGREE
+        self.refresh_interval = refresh_interval
+        self.lock = threading.RLock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.orders = {}
+            self.cells = defaultdict(set)
+            self.loaded_at = None
+
+    def _cell(self, latitude, longitude):
+        return floor(latitude / self.cell_degrees), floor(longitude / self.cell_degrees)
+
+    def _add(self, order_id, version, latitude, longitude):
+        self._remove(order_id)
+        self.orders[order_id] = (version, latitude, longitude)
+        self.cells[self._cell(latitude, longitude)].add(order_id)
+
+    def _remove(self, order_id):
+        entry = self.orders.pop(order_id, None)
+        if entry is not None:
+            cell = self._cell(entry[1], entry[2])
+            self.cells[cell].discard(order_id)
+            if not self.cells[cell]:
+                del self.cells[cell]
+
+    def place(self, order_id, version, latitude, longitude):
+        with self.lock:
+            self._add(order_id, version, latitude, longitude)
+
+    def remove(self, order_id):
+        with self.lock:
+            self._remove(order_id)
+
+    def get_rows(self):
+        return Order.objects.filter(
+            courier__isnull=True,
+            delivery_location__isnull=False,
+            statuses__status=OrderStatus.PREPARING
+        ).exclude(
+            statuses__status__in=OrderStatus.COURIER_ORDER_STATUSES
+        ).values_list("id", "version", "delivery_location")
+
+    def rebuild(self):
+        rows = self.get_rows()
+        with self.lock:
+            self.orders = {}
+            self.cells = defaultdict(set)
+            for order_id, version, location in rows:
+                self._add(order_id, version, location.y, location.x)
+            self.loaded_at = time.monotonic()
+
+    def ensure_fresh(self):
+        if self.loaded_at is None or time.monotonic() - self.loaded_at > self.refresh_interval:
+            self.rebuild()
+
+    def nearest(self, latitude, longitude, distance, limit=None):
+        """
+        Free orders within `distance` meters of the point, nearest first.
+        """
+        self.ensure_fresh()
+        latitude_span = distance / METERS_PER_DEGREE
+        longitude_span = latitude_span / max(cos(radians(latitude)), 0.01)
+        min_cell = self._cell(latitude - latitude_span, longitude - longitude_span)
+        max_cell = self._cell(latitude + latitude_span, longitude + longitude_span)
+
+        found = []
+        with self.lock:
+            for cell_latitude in range(min_cell[0], max_cell[0] + 1):
+                for cell_longitude in range(min_cell[1], max_cell[1] + 1):
+                    for order_id in self.cells.get((cell_latitude, cell_longitude), ()):
+                        version, order_latitude, order_longitude = self.orders[order_id]
+                        order_distance = haversine_distance(
+                            latitude, longitude, order_latitude, order_longitude
+                        )
+                        if order_distance <= distance:
+                            found.append(BoardEntry(
+                                order_id, version, order_latitude,
+                                order_longitude, order_distance
+                            ))
+        found.sort(key=lambda entry: (entry.distance, entry.id))
+        return found[:limit] if limit else found
+
+    def all(self):
+        self.ensure_fresh()
+        with self.lock:
+            return [
+                BoardEntry(order_id, version, latitude, longitude, None)
+                for order_id, (version, latitude, longitude) in sorted(self.orders.items())
+            ]
+
+
+free_order_board = FreeOrderBoard(
+    cell_size=settings.FREE_ORDER_BOARD_CELL_SIZE,
+    refresh_interval=settings.FREE_ORDER_BOARD_REFRESH
+)
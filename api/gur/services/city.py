@@ -0,0 +1,316 @@
+import heapq
+import math
+import random
+import time
+from datetime import datetime, time as dt_time, timedelta, timezone
+
+import numpy as np
+from django.contrib.auth.hashers import make_password
+from django.contrib.gis.geos import Point
+from django.db import connection
+
+from ..models import (
+    CustomUser, UserAccount, CourierAccount, CourierLocation,
+    Restaurant, Dish, Order, OrderDish, OrderStatus
+)
+from .geo import offset_point
+
+# Kyiv
+CITY_CENTER = (30.5234, 50.4501)
+
+DISH_NAMES = (
+    "Borscht", "Varenyky", "Holubtsi", "Deruny", "Chicken Kyiv", "Banosh",
+    "Syrnyky", "Pampushky", "Salo", "Kruchenyky", "Pizza", "Burger", "Ramen",
+    "Pho", "Caesar salad", "Shawarma", "Sushi set", "Pad thai", "Falafel",
+    "Khachapuri", "Lemonade", "Uzvar", "Cheesecake", "Napoleon cake",
+)
+FIRST_NAMES = (
+    "Olena", "Andrii", "Iryna", "Oleksandr", "Natalia", "Dmytro", "Kateryna",
+    "Serhii", "Yulia", "Mykola", "Oksana", "Taras", "Sofiia", "Bohdan",
+)
+
+# (open_from, open_to) and how often restaurants keep them; None is all day
+OPENING_HOURS = (
+    ((dt_time(9), dt_time(22)), 0.45),
+    ((dt_time(10), dt_time(23)), 0.25),
+    ((dt_time(18), dt_time(3)), 0.1),
+    ((None, None), 0.2),
+)
+# relative order volume per hour of the day, lunch and dinner peaks
+HOURLY_DEMAND = (
+    1, 0.5, 0.3, 0.2, 0.1, 0.1, 0.3, 1, 2, 2.5, 3, 5,
+    9, 9, 6, 4, 4, 6, 10, 11, 9, 6, 4, 2,
+)
+# relative order volume per weekday, Monday first
+DAILY_DEMAND = (0.9, 0.9, 0.95, 1, 1.25, 1.35, 1.1)
+
+CANCEL_RATE = 0.04
+
+
+class CityGenerator:
+    """
+    Fills the database with a synthetic city: restaurants clustered around
+    districts, their menus, users, couriers and an order history with status
+    timelines and courier location tracks. The same seed and options always
+    produce the same city. Rows are written with bulk_create in batches, so
+    signals do not fire and caches are not touched.
+    """
+
+    def __init__(self, seed=1, restaurants=200, districts=12, users=20000, couriers=300,
+                 days=730, orders_per_day=500, track_points=4, radius=15000,
+                 until=None, domain=None, batch_size=5000, log=None):
+        self.rng = random.Random(seed)
+        self.np_rng = np.random.default_rng(seed)
+        self.restaurants = restaurants
+        self.districts = districts
+        self.users = users
+        self.couriers = couriers
+        self.days = days
+        self.orders_per_day = orders_per_day
+        self.track_points = track_points
+        self.radius = radius
+        self.until = until or datetime.combine(datetime.now().date(), dt_time(), timezone.utc)
+        self.domain = domain or f"seed{seed}.city.test"
+        self.batch_size = batch_size
+        self.log = log or (lambda message: None)
+        self.counts = {}
+
+    def offset(self, dx, dy, origin=CITY_CENTER):
+        return offset_point(*origin, dx, dy)
+
+    def random_location(self, spread, origin=CITY_CENTER):
+        return self.offset(self.rng.gauss(0, spread), self.rng.gauss(0, spread), origin)
+
+    def random_home(self):
+        # uniform over the city disk
+        distance = self.radius * math.sqrt(self.rng.random())
+        angle = self.rng.uniform(0, 2 * math.pi)
+        return self.offset(distance * math.cos(angle), distance * math.sin(angle))
+
+    def bulk_create(self, model, objects):
+        created = model.objects.bulk_create(objects, batch_size=self.batch_size)
+        self.counts[model.__name__] = self.counts.get(model.__name__, 0) + len(created)
+        return created
+
+    def create_restaurants(self):
+        districts = [self.random_home() for _ in range(self.districts)]
+        hours, weights = zip(*OPENING_HOURS)
+        restaurants = []
+        for i in range(self.restaurants):
+            open_from, open_to = self.rng.choices(hours, weights)[0]
+            location = self.random_location(600, self.rng.choice(districts))
+            restaurants.append(Restaurant(
+                name=f"Restaurant {i + 1}",
+                rest_address=f"{self.rng.randint(1, 120)} Synthetic street, Kyiv",
+                open_from=open_from,
+                open_to=open_to,
+                location=Point(*location, srid=4326),
+            ))
+        self.bulk_create(Restaurant, restaurants)
+        Restaurant.objects.fill_default_delivery_zones(id__in=[r.id for r in restaurants])
+        self.restaurant_ids = [restaurant.id for restaurant in restaurants]
+        self.restaurant_locations = [restaurant.location.coords for restaurant in restaurants]
+
+    def create_menus(self):
+        dishes = []
+        for restaurant_id in self.restaurant_ids:
+            for name in self.rng.sample(DISH_NAMES, self.rng.randint(8, len(DISH_NAMES))):
+                dishes.append(Dish(
+                    restaurant_id=restaurant_id,
+                    name=name,
+                    description="",
+                    price=self.rng.randint(40, 450) * 100,
+                    gramme=self.rng.randrange(100, 700, 50),
+                ))
+        self.bulk_create(Dish, dishes)
+        self.menus = {}
+        for dish in dishes:
+            self.menus.setdefault(dish.restaurant_id, []).append((dish.id, dish.price))
+
+    def create_people(self, prefix, count, account_model):
+        # hashing once keeps a million users in minutes
+        password = make_password("password")
+        users = self.bulk_create(CustomUser, [
+            CustomUser(email=f"{prefix}{i + 1}@{self.domain}", password=password)
+            for i in range(count)
+        ])
+        accounts = self.bulk_create(account_model, [
+            account_model(
+                user_id=user.id,
+                first_name=self.rng.choice(FIRST_NAMES),
+                tel_num=f"380{self.rng.randrange(10 ** 9):09d}",
+            )
+            for user in users
+        ])
+        return [account.id for account in accounts]
+
+    def create_people_and_homes(self):
+        self.user_account_ids = self.create_people("user", self.users, UserAccount)
+        self.courier_account_ids = self.create_people("courier", self.couriers, CourierAccount)
+        # (free from, courier id) of idle couriers, and a heap of busy ones
+        self.idle_couriers = [
+            (datetime.min.replace(tzinfo=timezone.utc), courier_id)
+            for courier_id in self.courier_account_ids
+        ]
+        self.busy_couriers = []
+        self.homes = [self.random_home() for _ in range(self.users)]
+
+        # users order from the restaurants closest to them
+        scale = np.array([math.cos(math.radians(CITY_CENTER[1])), 1.0])
+        restaurants = np.array(self.restaurant_locations) * scale
+        nearest = min(8, len(self.restaurant_ids))
+        chunk = max(1, 1000000 // len(self.restaurant_ids))
+        self.favourites = []
+        for start in range(0, self.users, chunk):
+            homes = np.array(self.homes[start:start + chunk]) * scale
+            distances = ((homes[:, None, :] - restaurants[None, :, :]) ** 2).sum(axis=2)
+            closest = np.argpartition(distances, nearest - 1, axis=1)[:, :nearest]
+            self.favourites.extend(closest.tolist())
+
+    def take_courier(self, at):
+        """
+        A random courier idle at `at`, or the first one to get free when all
+        are busy, and the time the courier is free from.
+        """
+        while self.busy_couriers and self.busy_couriers[0][0] <= at:
+            self.idle_couriers.append(heapq.heappop(self.busy_couriers))
+        if self.idle_couriers:
+            idle = self.idle_couriers
+            index = self.rng.randrange(len(idle))
+            idle[index], idle[-1] = idle[-1], idle[index]
+            free_at, courier_id = idle.pop()
+        else:
+            free_at, courier_id = heapq.heappop(self.busy_couriers)
+        return courier_id, free_at
+
+    def release_courier(self, courier_id, free_at):
+        heapq.heappush(self.busy_couriers, (free_at, courier_id))
+
+    def plan_order(self, created_at):
+        user_index = self.rng.randrange(self.users)
+        restaurant_index = self.rng.choice(self.favourites[user_index])
+        menu = self.menus[self.restaurant_ids[restaurant_index]]
+        dishes = [
+            (dish_id, price, self.rng.choices((1, 2, 3), (0.75, 0.2, 0.05))[0])
+            for dish_id, price in self.rng.sample(menu, self.rng.randint(1, min(4, len(menu))))
+        ]
+
+        statuses = [(OrderStatus.OPEN, created_at)]
+        preparing_at = created_at + timedelta(minutes=self.rng.uniform(2, 8))
+        statuses.append((OrderStatus.PREPARING, preparing_at))
+        courier_id = None
+        if self.rng.random() < CANCEL_RATE:
+            statuses.append((OrderStatus.CANCELLED, preparing_at + timedelta(minutes=self.rng.uniform(1, 20))))
+        else:
+            ready_at = preparing_at + timedelta(minutes=self.rng.uniform(10, 25))
+            courier_id, free_at = self.take_courier(ready_at)
+            # the order waits for a courier when all of them are delivering
+            delivering_at = max(ready_at, free_at)
+            delivered_at = delivering_at + timedelta(minutes=self.rng.uniform(10, 35))
+            statuses.append((OrderStatus.DELIVERING, delivering_at))
+            statuses.append((OrderStatus.DELIVERED, delivered_at))
+        # orders placed just before `until` are still in progress
+        statuses = [(status, at) for status, at in statuses if at <= self.until]
+        reached = {status for status, _ in statuses}
+        if courier_id is not None:
+            if OrderStatus.DELIVERED in reached:
+                self.release_courier(courier_id, delivered_at)
+            elif OrderStatus.DELIVERING in reached:
+                # still delivering at `until`, busy for the rest of the history
+                self.release_courier(courier_id, self.until + timedelta(days=1))
+            else:
+                self.release_courier(courier_id, free_at)
+                courier_id = None
+
+        home = self.homes[user_index]
+        order = Order(
+            user_id=self.user_account_ids[user_index],
+            courier_id=courier_id,
+            summary=sum(price * quantity for _, price, quantity in dishes)
+            if OrderStatus.PREPARING in reached else 0,
+            delivery_address=f"{self.rng.randint(1, 200)} Home street, Kyiv",
+            delivery_location=Point(*home, srid=4326),
+            created_at=created_at,
+        )
+        track = []
+        if courier_id is not None:
+            delivering_at = dict(statuses)[OrderStatus.DELIVERING]
+            arrived_at = dict(statuses).get(OrderStatus.DELIVERED, self.until)
+            start = self.restaurant_locations[restaurant_index]
+            for step in range(self.track_points):
+                share = (step + 1) / (self.track_points + 1)
+                track.append((
+                    delivering_at + (arrived_at - delivering_at) * share,
+                    self.random_location(30, (
+                        start[0] + (home[0] - start[0]) * share,
+                        start[1] + (home[1] - start[1]) * share,
+                    )),
+                ))
+        return order, dishes, statuses, track
+
+    def order_times(self):
+        start = self.until - timedelta(days=self.days)
+        hours = range(24)
+        for day in range(self.days):
+            day_start = start + timedelta(days=day)
+            # the business grows from half of today's volume
+            growth = 0.5 + 0.5 * (day + 1) / self.days
+            expected = self.orders_per_day * growth * DAILY_DEMAND[day_start.weekday()]
+            count = int(self.np_rng.poisson(expected))
+            for hour in sorted(self.rng.choices(hours, HOURLY_DEMAND, k=count)):
+                yield day_start + timedelta(hours=hour, seconds=self.rng.uniform(0, 3600))
+
+    def flush_orders(self, planned):
+        orders = self.bulk_create(Order, [order for order, _, _, _ in planned])
+        order_dishes, statuses, locations = [], [], []
+        for order, (_, dishes, order_statuses, track) in zip(orders, planned):
+            order_dishes.extend(
+                OrderDish(order_id=order.id, dish_id=dish_id, quantity=quantity)
+                for dish_id, _, quantity in dishes
+            )
+            statuses.extend(
+                OrderStatus(order_id=order.id, status=status, created_at=at)
+                for status, at in order_statuses
+            )
+            locations.extend(
+                CourierLocation(
+                    courier_id=order.courier_id,
+                    created_at=at,
+                    location=Point(*location, srid=4326),
+                )
+                for at, location in track
+            )
+        self.bulk_create(OrderDish, order_dishes)
+        self.bulk_create(OrderStatus, statuses)
+        self.bulk_create(CourierLocation, locations)
+
+    def create_orders(self):
+        planned = []
+        for created_at in self.order_times():
+            planned.append(self.plan_order(created_at))
+            if len(planned) >= self.batch_size:
+                self.flush_orders(planned)
+                planned = []
+                self.log(f"  {self.counts['Order']} orders")
+        if planned:
+            self.flush_orders(planned)
+
+    def analyze(self):
+        with connection.cursor() as cursor:
+            for model in (Restaurant, Dish, UserAccount, CourierAccount, Order,
+                          OrderDish, OrderStatus, CourierLocation):
+                cursor.execute(f"ANALYZE {model._meta.db_table}")
+
+    def generate(self):
+        phases = (
+            ("restaurants", self.create_restaurants),
+            ("menus", self.create_menus),
+            ("users and couriers", self.create_people_and_homes),
+            ("orders", self.create_orders),
+            ("statistics", self.analyze),
+        )
+        for name, phase in phases:
+            started = time.perf_counter()
+            phase()
+            self.log(f"{name}: {time.perf_counter() - started:.1f} s")
+        return self.counts
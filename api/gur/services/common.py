@@ -1,12 +1,8 @@
-from ..models import RestaurantAdmin, UserAccount
+from .principal import get_principal
 
 
 def pass_test(request):
-    try:
-        if not RestaurantAdmin.objects.filter(
-                user_id=UserAccount.objects.get(user_id=request.user.id)).exists() \
-                and not request.user.is_superuser:
-            return False
-        return True
-    except UserAccount.DoesNotExist:
+    principal = get_principal(request.user)
+    if principal is None or principal.user_account_id is None:
         return False
+    return principal.is_superuser or principal.is_partial_admin
@@ -0,0 +1,42 @@
+from django.conf import settings
+from django.core.cache import cache
+
+from ..models import Order
+from ..serializers.fast import CourierOrderValuesSerializer
+from ..serializers.order import CourierOrderDetailSerializer
+
+
+def courier_order_cache_key(order_id, version):
+    return f"courier-order:{order_id}:{version}"
+
+
+def cache_courier_order(order):
+    data = CourierOrderDetailSerializer(order).data
+    cache.set(
+        courier_order_cache_key(order.id, order.version),
+        data,
+        settings.COURIER_ORDER_CACHE_TIMEOUT
+    )
+    return data
+
+
+def get_courier_order_payloads(orders):
+    """
+    Returns courier representations of the given orders, serializing only
+    the ones missing in the cache for their current version.
+    """
+    keys = {order.id: courier_order_cache_key(order.id, order.version) for order in orders}
+    payloads = cache.get_many(keys.values())
+
+    missing_ids = [order_id for order_id, key in keys.items() if key not in payloads]
+    if missing_ids:
+        built = {
+            keys[payload["id"]]: payload
+            for payload in CourierOrderValuesSerializer().serialize_queryset(
+                Order.objects.filter(id__in=missing_ids)
+            )
+        }
+        cache.set_many(built, settings.COURIER_ORDER_CACHE_TIMEOUT)
+        payloads.update(built)
+
+    return [payloads[key] for key in keys.values() if key in payloads]
@@ -0,0 +1,234 @@
+import asyncio
+import logging
+import time
+import weakref
+from datetime import timedelta
+
+import numpy as np
+from channels.db import database_sync_to_async
+from django.conf import settings
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+from scipy.optimize import linear_sum_assignment
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
+from scipy.spatial import cKDTree
+
+from ..models import CourierLocation, Order, OrderStatus
+from .board import free_order_board
+from .courier import get_courier_order_payloads
+from .events import group_send
+from .geo import EARTH_RADIUS
+
+logger = logging.getLogger(__name__)
+
+# cost assigned to pairs that must never be matched
+UNREACHABLE = 1e12
+
+
+def unit_vectors(points):
+    """
+    Points on the unit sphere for (n, 2) arrays of [latitude, longitude]
+    degrees; their chord lengths grow with the great-circle distances.
+    """
+    points = np.radians(np.asarray(points, dtype=np.float64)).reshape(-1, 2)
+    latitudes, longitudes = points[:, 0], points[:, 1]
+    return np.column_stack([
+        np.cos(latitudes) * np.cos(longitudes),
+        np.cos(latitudes) * np.sin(longitudes),
+        np.sin(latitudes),
+    ])
+
+
+def candidate_pairs(courier_points, order_points, max_distance):
+    """
+    Couriers and orders within `max_distance` meters of each other, both given
+    as (n, 2) arrays of [latitude, longitude] degrees. Only these pairs are
+    measured, through k-d trees, instead of every courier with every order.
+    Returns courier indexes, order indexes and haversine distances in meters.
+    """
+    couriers = cKDTree(unit_vectors(courier_points))
+    orders = cKDTree(unit_vectors(order_points))
+    max_chord = 2 * np.sin(max_distance / (2 * EARTH_RADIUS))
+    pairs = couriers.sparse_distance_matrix(orders, max_chord, output_type="ndarray")
+    distances = 2 * EARTH_RADIUS * np.arcsin(np.clip(pairs["v"] / 2, 0, 1))
+    return pairs["i"], pairs["j"], distances
+
+
+def solve_assignment(shape, rows, columns, cost):
+    """
+    Globally optimal matching of the most couriers with orders, given the
+    cost of the pairs that may be matched; other pairs are never matched.
+    Couriers and orders that can't reach each other, even through others,
+    are solved apart, which keeps the dense matrices small.
+    Returns (courier index, order index, cost) triples.
+    """
+    if len(cost) == 0:
+        return []
+    couriers, orders = shape
+    graph = coo_matrix(
+        (np.ones(len(rows)), (rows, couriers + columns)),
+        shape=(couriers + orders, couriers + orders)
+    )
+    _, labels = connected_components(graph, directed=False)
+    by_component = np.argsort(labels[rows], kind="stable")
+    rows, columns, cost = rows[by_component], columns[by_component], cost[by_component]
+    bounds = np.flatnonzero(np.diff(labels[rows])) + 1
+
+    pairs = []
+    for component_rows, component_columns, component_cost in zip(
+            np.split(rows, bounds), np.split(columns, bounds), np.split(cost, bounds)
+    ):
+        row_ids, row_index = np.unique(component_rows, return_inverse=True)
+        column_ids, column_index = np.unique(component_columns, return_inverse=True)
+        bounded = np.full((len(row_ids), len(column_ids)), UNREACHABLE)
+        bounded[row_index, column_index] = component_cost
+        matched_rows, matched_columns = linear_sum_assignment(bounded)
+        matched = bounded[matched_rows, matched_columns] < UNREACHABLE
+        matched_rows, matched_columns = matched_rows[matched], matched_columns[matched]
+        pairs.extend(zip(
+            row_ids[matched_rows].tolist(),
+            column_ids[matched_columns].tolist(),
+            bounded[matched_rows, matched_columns].tolist()
+        ))
+    return pairs
+
+
+def match(courier_points, order_points):
+    """
+    ETA matching of couriers and orders, both given as [latitude, longitude]
+    points. Returns (courier index, order index, ETA in seconds) triples.
+    """
+    rows, columns, distances = candidate_pairs(
+        courier_points, order_points, settings.POSSIBLE_COURIER_DISTANCE
+    )
+    return solve_assignment(
+        (len(courier_points), len(order_points)),
+        rows, columns, distances / settings.DISPATCH_COURIER_SPEED
+    )
+
+
+def get_idle_couriers():
+    """
+    Latest known location of every courier without an active order who has
+    reported a location recently.
+    """
+    active_orders = Order.objects.filter(
+        courier=OuterRef("courier"),
+        statuses__status=OrderStatus.DELIVERING
+    ).exclude(
+        statuses__status__in=OrderStatus.FINISHED_STATUSES
+    )
+    return CourierLocation.objects.filter(
+        created_at__gte=timezone.now() - timedelta(seconds=settings.DISPATCH_LOCATION_MAX_AGE)
+    ).exclude(
+        Exists(active_orders)
+    ).order_by(
+        "courier_id", "-created_at"
+    ).distinct(
+        "courier_id"
+    ).values_list("courier_id", "location")
+
+
+class Dispatcher:
+    """
+    Periodically matches free orders with idle couriers and offers each
+    order to the courier with the lowest ETA in the global matching.
+    """
+
+    def __init__(self, board=free_order_board):
+        self.board = board
+        self.offers = {}
+
+    def plan(self, couriers, orders):
+        if not couriers or not orders:
+            return []
+        return [
+            (couriers[courier_index][0], orders[order_index], eta)
+            for courier_index, order_index, eta in match(
+                [(location.y, location.x) for _, location in couriers],
+                [(order.latitude, order.longitude) for order in orders]
+            )
+        ]
+
+    def tick(self):
+        started = time.perf_counter()
+        self.board.rebuild()
+        orders = self.board.all()
+        couriers = list(get_idle_couriers())
+        assignments = self.plan(couriers, orders)
+
+        now = time.monotonic()
+        self.offers = {
+            order_id: offer for order_id, offer in self.offers.items() if offer[1] > now
+        }
+        new_assignments = [
+            (courier_id, order, eta) for courier_id, order, eta in assignments
+            if self.offers.get(order.id, (None,))[0] != courier_id
+        ]
+        if new_assignments:
+            self.send_offers(new_assignments)
+            for courier_id, order, _ in new_assignments:
+                self.offers[order.id] = (courier_id, now + settings.DISPATCH_OFFER_TTL)
+
+        return {
+            "couriers": len(couriers),
+            "orders": len(orders),
+            "assigned": len(assignments),
+            "offered": len(new_assignments),
+            "duration": time.perf_counter() - started,
+        }
+
+    async def run(self, interval):
+        """
+        Ticks every `interval` seconds on the running event loop.
+        """
+        while True:
+            started = time.monotonic()
+            try:
+                await database_sync_to_async(self.tick)()
+            except Exception:
+                logger.exception("Dispatch tick failed")
+            await asyncio.sleep(max(interval - (time.monotonic() - started), 0))
+
+    def send_offers(self, assignments):
+        payloads = {
+            payload["id"]: payload
+            for payload in get_courier_order_payloads([order for _, order, _ in assignments])
+        }
+        for courier_id, order, eta in assignments:
+            if order.id not in payloads:
+                continue
+            group_send(
+                f"courier_{courier_id}",
+                {
+                    'type': 'event.orderoffer',
+                    'content': {
+                        "order": payloads[order.id],
+                        "eta": round(eta),
+                    }
+                }
+            )
+
+
+_dispatch_tasks = weakref.WeakKeyDictionary()
+
+
+class InProcessDispatchMiddleware:
+    """
+    ASGI middleware running a Dispatcher in the server process, where the
+    in-memory channel layer reaches the courier sockets. Starts it on the
+    first connection, as Daphne sends no lifespan events.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        loop = asyncio.get_running_loop()
+        task = _dispatch_tasks.get(loop)
+        if task is None or task.done():
+            _dispatch_tasks[loop] = loop.create_task(
+                Dispatcher().run(settings.DISPATCH_INTERVAL)
+            )
+        return await self.app(scope, receive, send)
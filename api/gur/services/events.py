@@ -0,0 +1,17 @@
+import time
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+
+from ..perf.stats import record_channel_send
+
+
+def group_send(group, message):
+    """
+    Sends a message to a channel layer group from sync code.
+    """
+    started = time.perf_counter()
+    try:
+        async_to_sync(get_channel_layer().group_send)(group, message)
+    finally:
+        record_channel_send(time.perf_counter() - started)
@@ -0,0 +1,37 @@
+from math import radians, sin, cos, asin, sqrt
+
+from django.conf import settings
+
+EARTH_RADIUS = 6371008.8
+METERS_PER_DEGREE = 111320
+
+
+def haversine_distance(latitude1, longitude1, latitude2, longitude2):
+    """
+    Great-circle distance in meters between two WGS84 points.
+    """
+    latitude1, longitude1, latitude2, longitude2 = map(
+        radians, (latitude1, longitude1, latitude2, longitude2)
+    )
+    a = sin((latitude2 - latitude1) / 2) ** 2 + \
+        cos(latitude1) * cos(latitude2) * sin((longitude2 - longitude1) / 2) ** 2
+    return 2 * EARTH_RADIUS * asin(sqrt(a))
+
+
+def offset_point(longitude, latitude, dx, dy):
+    """
+    (longitude, latitude) of the point dx meters east and dy meters north of
+    the given one. Good enough for the few kilometers of a city.
+    """
+    return (
+        longitude + dx / (METERS_PER_DEGREE * cos(radians(latitude))),
+        latitude + dy / METERS_PER_DEGREE,
+    )
+
+
+def project_point(point):
+    """
+    Copy of a WGS84 point in the local metric CRS used by the projected
+    shadow columns, so distances can be given in meters.
+    """
+    return point.transform(settings.LOCAL_METRIC_SRID, clone=True)
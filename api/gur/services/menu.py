@@ -0,0 +1,60 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F
+
+from ..models import Restaurant, Dish
+from ..routers import use_primary
+from ..serializers.fast import DishValuesSerializer
+
+
+def menu_cache_key(restaurant_id, version):
+    return f"menu:{restaurant_id}:{version}"
+
+
+def menu_etag(restaurant_id, version, fields=None):
+    etag = f"menu-{restaurant_id}-{version}"
+    if fields is not None:
+        # every field selection is a different representation
+        etag += "-" + hashlib.md5(",".join(fields).encode()).hexdigest()[:12]
+    return f'"{etag}"'
+
+
+def get_menu_version(restaurant_id):
+    """
+    Current menu version of a restaurant, or None if it does not exist.
+    A primary key lookup on every request, so a change is seen by every
+    worker as soon as it reaches the database the view reads from.
+    """
+    return Restaurant.objects.filter(
+        id=restaurant_id
+    ).values_list("menu_version", flat=True).first()
+
+
+def get_menu(restaurant_id, version):
+    """
+    The menu at `version`, which may come from a lagging replica. Misses
+    load from the primary and are cached under the primary's version, so
+    no key ever holds dishes older than it.
+    """
+    key = menu_cache_key(restaurant_id, version)
+    data = cache.get(key)
+    if data is None:
+        with use_primary():
+            # the version first, the dishes can only be newer than it
+            current_version = get_menu_version(restaurant_id)
+            data = DishValuesSerializer().serialize_queryset(
+                Dish.objects.filter(restaurant_id=restaurant_id)
+            )
+        if current_version is not None:
+            cache.set(
+                menu_cache_key(restaurant_id, current_version), data, settings.MENU_CACHE_TIMEOUT
+            )
+    return data
+
+
+def bump_menu_version(restaurant_id):
+    Restaurant.objects.filter(
+        id=restaurant_id
+    ).update(menu_version=F("menu_version") + 1)
@@ -7,19 +7,17 @@ from django.http import Http404
 from rest_framework.exceptions import ValidationError
 
 from ..models import Order, OrderStatus, UserAccount, OrderDish, Dish
-from asgiref.sync import async_to_sync
-from channels.layers import get_channel_layer
+from .events import group_send
 
 
 def send_order_status_update(order_status):
-    channel_layer = get_channel_layer()
-    async_to_sync(channel_layer.group_send)(
-        f"order_{order_status.order_id.order_id}",
+    group_send(
+        f"order_{order_status.order_id}",
         {
             'type': 'event.orderstatus',
             'content': json.dumps({
                 "status": order_status.status,
-                "timestamp": datetime.datetime.fromtimestamp(order_status.created_at.created_at()).strftime(
+                "timestamp": datetime.datetime.fromtimestamp(order_status.created_at.timestamp()).strftime(
                     '%Y-%m-%d %H:%M:%S')
             }, indent=4, sort_keys=True, default=str)
         })
@@ -45,15 +43,19 @@ def order_is_available_to_add(order_id, dish_id, user_id=None):
         raise ValidationError("You can't create order from different restaurants")
 
 
-def get_order_or_create(user_id: int):
+def get_open_orders(user_id: int):
     not_open_orders = OrderStatus.objects.filter(
         order__user__user__id=user_id
     ).exclude(status="O").values_list("order__id", flat=True)
 
-    open_orders = OrderStatus.objects.filter(
+    return OrderStatus.objects.filter(
         order__user__user__id=user_id, status="O"
     ).exclude(order__id__in=not_open_orders).values("order")
 
+
+def get_order_or_create(user_id: int):
+    open_orders = get_open_orders(user_id)
+
     # There is an open order by user
     if open_orders.exists():
         return Order.objects.prefetch_related(
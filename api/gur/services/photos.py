@@ -0,0 +1,274 @@
+import base64
+import binascii
+import hashlib
+import io
+import logging
+import multiprocessing
+import os
+import re
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from django.conf import settings
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+# photo columns hold a stored photo name or an external URL
+PHOTO_FIELD_LENGTH = 500
+
+# stored photos are "<sha256>.<extension>", their variants
+# "<sha256>-<variant>.<format>"
+PHOTO_NAME_RE = re.compile(
+    r"^(?P<hash>[0-9a-f]{64})(-(?P<variant>[a-z0-9]+))?\.(?P<extension>[a-z]+)$"
+)
+DATA_URI_RE = re.compile(r"^data:[\w/+.-]+;base64,", re.IGNORECASE)
+
+IMAGE_SIGNATURES = (
+    (b"\xff\xd8\xff", "jpg"),
+    (b"\x89PNG\r\n\x1a\n", "png"),
+    (b"GIF87a", "gif"),
+    (b"GIF89a", "gif"),
+)
+IMAGE_EXTENSIONS = ("jpg", "png", "gif", "webp")
+
+# Pillow encoder per variant format
+VARIANT_ENCODERS = {
+    "webp": "WEBP",
+    "jpg": "JPEG",
+}
+
+
+class PhotoError(ValueError):
+    pass
+
+
+def is_external_url(value):
+    return value.startswith(("http://", "https://"))
+
+
+def guess_extension(data):
+    for signature, extension in IMAGE_SIGNATURES:
+        if data.startswith(signature):
+            return extension
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "webp"
+    return None
+
+
+def decode_photo(value):
+    """
+    Image bytes of a base64 string, with or without a data URI prefix.
+    """
+    value = DATA_URI_RE.sub("", value.strip(), count=1)
+    try:
+        return base64.b64decode(value, validate=True)
+    except (binascii.Error, ValueError):
+        raise PhotoError("Photo must be an image URL or base64 encoded image")
+
+
+def write_atomically(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # concurrent writers of the same content race harmlessly
+    fd, temporary_path = tempfile.mkstemp(dir=os.path.dirname(path))
+    try:
+        with os.fdopen(fd, "wb") as file:
+            file.write(data)
+        os.chmod(temporary_path, 0o644)
+        os.replace(temporary_path, path)
+    except BaseException:
+        if os.path.exists(temporary_path):
+            os.unlink(temporary_path)
+        raise
+
+
+def render_variants(source_path, targets):
+    """
+    Writes every missing (path, size, format, quality) target derived from
+    the source image. Runs in worker processes, so it does not touch Django.
+    """
+    with Image.open(source_path) as source:
+        source.seek(0)
+        source.load()
+        for path, size, image_format, quality in targets:
+            if os.path.exists(path):
+                continue
+            image = source.copy()
+            image.thumbnail((size, size), Image.Resampling.LANCZOS)
+            if image_format == "JPEG" and image.mode != "RGB":
+                # flatten transparency onto white
+                image = image.convert("RGBA")
+                background = Image.new("RGB", image.size, (255, 255, 255))
+                background.paste(image, mask=image.getchannel("A"))
+                image = background
+            elif image.mode not in ("RGB", "RGBA"):
+                image = image.convert("RGBA")
+            buffer = io.BytesIO()
+            image.save(buffer, image_format, quality=quality)
+            write_atomically(path, buffer.getvalue())
+
+
+class PhotoStore:
+    """
+    Content-addressed photo files under PHOTO_ROOT. A photo is stored once
+    per distinct content, so its name never changes meaning and it can be
+    cached by clients forever. Resized variants live next to the original
+    and are derived from it at most once.
+    """
+
+    @property
+    def location(self):
+        return settings.PHOTO_ROOT
+
+    def path(self, name):
+        match = PHOTO_NAME_RE.match(name)
+        if match is None:
+            raise PhotoError(f"Invalid photo name {name}")
+        digest = match.group("hash")
+        return os.path.join(self.location, digest[:2], digest[2:4], name)
+
+    def url(self, name):
+        return f"{settings.PHOTO_URL}{name}"
+
+    def exists(self, name):
+        return PHOTO_NAME_RE.match(name) is not None and os.path.exists(self.path(name))
+
+    def is_original(self, name):
+        match = PHOTO_NAME_RE.match(name)
+        return match is not None and match.group("variant") is None
+
+    def check(self, data):
+        """
+        Name the image bytes would be stored under, without storing them.
+        """
+        if len(data) > settings.PHOTO_MAX_SIZE:
+            raise PhotoError("Photo is too large")
+        extension = guess_extension(data)
+        if extension is None:
+            raise PhotoError("Unsupported image format")
+        return f"{hashlib.sha256(data).hexdigest()}.{extension}"
+
+    def save(self, data):
+        name = self.check(data)
+        path = self.path(name)
+        if not os.path.exists(path):
+            write_atomically(path, data)
+        return name
+
+    def save_encoded(self, value):
+        return self.save(decode_photo(value))
+
+    def name_from_url(self, value):
+        """
+        Stored name for a URL previously returned by `url`, if any.
+        """
+        if value.startswith(settings.PHOTO_URL):
+            name = value[len(settings.PHOTO_URL):]
+            if self.is_original(name) and self.exists(name):
+                return name
+        return None
+
+    def variant_name(self, name, variant, image_format):
+        digest = PHOTO_NAME_RE.match(name).group("hash")
+        return f"{digest}-{variant}.{image_format}"
+
+    def variant_urls(self, name):
+        return {
+            variant: {
+                image_format: self.url(self.variant_name(name, variant, image_format))
+                for image_format in settings.PHOTO_VARIANT_FORMATS
+            }
+            for variant in settings.PHOTO_VARIANTS
+        }
+
+    def source_path(self, name):
+        """
+        Path of the original a photo or variant name derives from.
+        """
+        digest = PHOTO_NAME_RE.match(name).group("hash")
+        for extension in IMAGE_EXTENSIONS:
+            path = self.path(f"{digest}.{extension}")
+            if os.path.exists(path):
+                return path
+        return None
+
+    def variant_targets(self, name, variants=None):
+        targets = []
+        for variant, size in settings.PHOTO_VARIANTS.items():
+            for image_format in settings.PHOTO_VARIANT_FORMATS:
+                if variants is not None and (variant, image_format) not in variants:
+                    continue
+                targets.append((
+                    self.path(self.variant_name(name, variant, image_format)),
+                    size,
+                    VARIANT_ENCODERS[image_format],
+                    settings.PHOTO_VARIANT_QUALITY,
+                ))
+        return targets
+
+    def render_variant(self, name):
+        """
+        Derives a single variant in-process, for variants requested before
+        the background pipeline got to them.
+        """
+        match = PHOTO_NAME_RE.match(name)
+        variant, image_format = match.group("variant"), match.group("extension")
+        source_path = self.source_path(name)
+        if variant not in settings.PHOTO_VARIANTS or \
+                image_format not in settings.PHOTO_VARIANT_FORMATS or source_path is None:
+            return False
+        render_variants(
+            source_path, self.variant_targets(name, variants={(variant, image_format)})
+        )
+        return True
+
+    def schedule_variants(self, name):
+        """
+        Derives every variant of a stored photo in the worker pool, off the
+        request path.
+        """
+        executor = get_variant_executor()
+        if executor is None:
+            return None
+        future = executor.submit(render_variants, self.path(name), self.variant_targets(name))
+        future.add_done_callback(partial(log_variant_failure, name))
+        return future
+
+
+def log_variant_failure(name, future):
+    if future.cancelled():
+        return
+    exception = future.exception()
+    if exception is not None:
+        # missing variants are still rendered on request
+        logger.error("Rendering the variants of %s failed", name, exc_info=exception)
+
+
+_variant_executor = None
+
+
+def get_variant_executor():
+    global _variant_executor
+    if _variant_executor is None and settings.PHOTO_VARIANT_WORKERS:
+        # forking a threaded server process can copy held locks into the workers
+        _variant_executor = ProcessPoolExecutor(
+            max_workers=settings.PHOTO_VARIANT_WORKERS,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+    return _variant_executor
+
+
+photo_store = PhotoStore()
+
+
+def photo_url(value):
+    if not value or is_external_url(value):
+        return value
+    return photo_store.url(value)
+
+
+def photo_variant_urls(value):
+    if not value or is_external_url(value):
+        return None
+    return photo_store.variant_urls(value)
@@ -0,0 +1,120 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from ..models import User, UserAccount, CourierAccount, RestaurantAdmin
+from ..routers import use_primary
+
+
+class Principal:
+    """
+    Everything authorization needs to know about a user, loaded once and
+    cached per request (on the user object) and across requests.
+    """
+
+    def __init__(self, user_id, is_superuser=False, user_account_id=None,
+                 courier_account_id=None, admin_restaurant_ids=(), permissions=()):
+        self.user_id = user_id
+        self.is_superuser = is_superuser
+        self.user_account_id = user_account_id
+        self.courier_account_id = courier_account_id
+        self.admin_restaurant_ids = frozenset(admin_restaurant_ids)
+        self.permissions = frozenset(permissions)
+
+    @property
+    def is_courier(self):
+        return self.courier_account_id is not None
+
+    @property
+    def is_partial_admin(self):
+        return bool(self.admin_restaurant_ids)
+
+    def is_restaurant_admin(self, restaurant_id):
+        return self.is_superuser or int(restaurant_id) in self.admin_restaurant_ids
+
+    def has_perms(self, permissions):
+        return self.is_superuser or self.permissions.issuperset(permissions)
+
+
+def to_claims_epoch(claims_changed_at):
+    return int(claims_changed_at.timestamp() * 1_000_000)
+
+
+def principal_cache_key(user_id, epoch):
+    # a new epoch leaves the principals cached by every worker behind
+    return f"principal:{user_id}:{epoch}"
+
+
+def load_principal(user):
+    user_account_id = UserAccount.objects.filter(
+        user_id=user.id
+    ).order_by("id").values_list("id", flat=True).first()
+    return Principal(
+        user_id=user.id,
+        is_superuser=user.is_superuser,
+        user_account_id=user_account_id,
+        courier_account_id=CourierAccount.objects.filter(
+            user_id=user.id
+        ).order_by("id").values_list("id", flat=True).first(),
+        admin_restaurant_ids=RestaurantAdmin.objects.filter(
+            user_account__user_id=user.id
+        ).values_list("rest_id", flat=True),
+        permissions=() if user.is_superuser else user.get_all_permissions()
+    )
+
+
+def get_principal(user):
+    if user is None or not user.is_authenticated:
+        return None
+    principal = getattr(user, "_principal", None)
+    if principal is None:
+        key = principal_cache_key(user.id, to_claims_epoch(user.claims_changed_at))
+        principal = cache.get(key)
+        if principal is None:
+            with use_primary():
+                principal = load_principal(user)
+            cache.set(key, principal, settings.PRINCIPAL_CACHE_TIMEOUT)
+        user._principal = principal
+    return principal
+
+
+def claims_epoch_cache_key(user_id):
+    return f"principal-epoch:{user_id}"
+
+
+def get_claims_epoch(user_id):
+    """
+    Changes on every principal change, so claims issued at another epoch are
+    known to be outdated. Read from the user row and cached for
+    CLAIMS_EPOCH_CACHE_TIMEOUT seconds, the longest other workers take to
+    notice a change. None for users that don't exist.
+    """
+    key = claims_epoch_cache_key(user_id)
+    epoch = cache.get(key)
+    if epoch is None:
+        with use_primary():
+            claims_changed_at = User.objects.filter(
+                id=user_id
+            ).values_list("claims_changed_at", flat=True).first()
+        if claims_changed_at is None:
+            return None
+        epoch = to_claims_epoch(claims_changed_at)
+        cache.set(key, epoch, settings.CLAIMS_EPOCH_CACHE_TIMEOUT)
+    return epoch
+
+
+def forget_claims_epochs(user_ids):
+    cache.delete_many([claims_epoch_cache_key(user_id) for user_id in user_ids])
+
+
+def invalidate_principals(user_ids):
+    """
+    Moves the users to a new claims epoch. Runs in the transaction of the
+    change, so tokens issued after the commit carry the new epoch.
+    Returns the new claims_changed_at.
+    """
+    user_ids = list(user_ids)
+    claims_changed_at = timezone.now()
+    User.objects.filter(id__in=user_ids).update(claims_changed_at=claims_changed_at)
+    forget_claims_epochs(user_ids)
+    return claims_changed_at
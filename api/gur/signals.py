@@ -0,0 +1,152 @@
+from django.contrib.auth.models import Group
+from django.db import transaction
+from django.db.models.signals import pre_save, post_save, post_delete, m2m_changed
+from django.dispatch import receiver
+
+from .models import (
+    User, Order, OrderStatus, Restaurant,
+    UserAccount, CourierAccount, RestaurantAdmin, Dish
+)
+from .routers import use_primary
+from .services.account import invalidate_profiles
+from .services.board import free_order_board
+from .services.menu import bump_menu_version
+from .services.principal import forget_claims_epochs, invalidate_principals
+
+
+def principals_changed(user_ids):
+    user_ids = list(user_ids)
+    claims_changed_at = invalidate_principals(user_ids)
+    # a concurrent request may have cached the epoch from before the commit
+    transaction.on_commit(lambda: forget_claims_epochs(user_ids))
+    return claims_changed_at
+
+
+def profiles_changed(user_ids):
+    user_ids = list(user_ids)
+    invalidate_profiles(user_ids)
+    # a concurrent request may have cached the profile from before the commit
+    transaction.on_commit(lambda: invalidate_profiles(user_ids))
+
+
+def update_free_order_board(order_id, status):
+    if status != OrderStatus.PREPARING:
+        free_order_board.remove(order_id)
+        return
+    order = Order.objects.filter(
+        id=order_id,
+        courier__isnull=True,
+        delivery_location__isnull=False
+    ).values_list("version", "delivery_location").first()
+    if order is not None:
+        version, location = order
+        free_order_board.place(order_id, version, location.y, location.x)
+
+
+@receiver(post_save, sender=OrderStatus)
+def order_status_saved(sender, instance, created, raw, **kwargs):
+    if raw or instance.status == OrderStatus.OPEN:
+        return
+    transaction.on_commit(
+        lambda: update_free_order_board(instance.order_id, instance.status)
+    )
+
+
+@receiver(post_save, sender=Restaurant)
+def restaurant_saved(sender, instance, **kwargs):
+    if instance.delivery_zone is None:
+        Restaurant.objects.fill_default_delivery_zones(id=instance.id)
+
+
+@receiver(post_save, sender=Dish)
+@receiver(post_delete, sender=Dish)
+def dish_changed(sender, instance, raw=False, **kwargs):
+    if not raw:
+        bump_menu_version(instance.restaurant_id)
+
+
+# the user fields a principal or the token checks depend on
+USER_CLAIM_FIELDS = ("is_superuser", "is_staff", "is_active")
+
+
+@receiver(pre_save, sender=User)
+def user_saving(sender, instance, raw, update_fields, **kwargs):
+    instance._claims_changed = False
+    if raw or instance._state.adding:
+        return
+    if update_fields is not None and not set(update_fields) & {*USER_CLAIM_FIELDS, "claims_changed_at"}:
+        return
+    with use_primary():
+        row = User.objects.filter(id=instance.id).values_list(
+            "claims_changed_at", *USER_CLAIM_FIELDS
+        ).first()
+    if row is None:
+        return
+    # the epoch may have moved behind the instance's back, don't write it back
+    instance.claims_changed_at = row[0]
+    instance._claims_changed = row[1:] != tuple(
+        getattr(instance, field) for field in USER_CLAIM_FIELDS
+    )
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, **kwargs):
+    if instance.__dict__.pop("_claims_changed", False):
+        instance.claims_changed_at = principals_changed([instance.id])
+    profiles_changed([instance.id])
+
+
+@receiver(post_delete, sender=User)
+def user_deleted(sender, instance, **kwargs):
+    principals_changed([instance.id])
+    profiles_changed([instance.id])
+
+
+@receiver(post_save, sender=UserAccount)
+@receiver(post_delete, sender=UserAccount)
+@receiver(post_save, sender=CourierAccount)
+@receiver(post_delete, sender=CourierAccount)
+def account_changed(sender, instance, **kwargs):
+    principals_changed([instance.user_id])
+    profiles_changed([instance.user_id])
+
+
+@receiver(post_save, sender=RestaurantAdmin)
+@receiver(post_delete, sender=RestaurantAdmin)
+def restaurant_admin_changed(sender, instance, **kwargs):
+    user_ids = list(
+        UserAccount.objects.filter(
+            id=instance.user_account_id
+        ).values_list("user_id", flat=True)
+    )
+    principals_changed(user_ids)
+    profiles_changed(user_ids)
+
+
+PERMISSION_CHANGE_ACTIONS = ("post_add", "post_remove", "pre_clear")
+
+
+@receiver(m2m_changed, sender=User.user_permissions.through)
+@receiver(m2m_changed, sender=User.groups.through)
+def user_permissions_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in PERMISSION_CHANGE_ACTIONS:
+        return
+    if not reverse:
+        principals_changed([instance.id])
+    elif pk_set is not None:
+        principals_changed(pk_set)
+    else:
+        principals_changed(instance.user_set.values_list("id", flat=True))
+
+
+@receiver(m2m_changed, sender=Group.permissions.through)
+def group_permissions_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in PERMISSION_CHANGE_ACTIONS:
+        return
+    if not reverse:
+        users = User.objects.filter(groups=instance)
+    elif pk_set is not None:
+        users = User.objects.filter(groups__in=pk_set)
+    else:
+        users = User.objects.filter(groups__permissions=instance)
+    principals_changed(users.values_list("id", flat=True).distinct())
@@ -1,18 +1,22 @@
+from django.core.cache import cache
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APITestCase
 from ..models import CustomUser, UserAccount, CourierAccount
+from ..services.account import USER_PROFILE, profile_cache_key
 from rest_framework_simplejwt.tokens import AccessToken
 
 
 class AccountViewTests(APITestCase):
 
     def setUp(self):
+        cache.clear()
         self.email = 'test_user@gmail.com'
         self.password = 'password'
         user = CustomUser.objects.create_user(email='bla@gmail.com', password=self.password)
         UserAccount.objects.create(user=user)
         CourierAccount.objects.create(user=user)
+        self.user = user
         self.token = AccessToken.for_user(user)
         self.header = {'HTTP_AUTHORIZATION': f'Bearer {self.token}'}
 
@@ -102,3 +106,65 @@ class AccountViewTests(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data['first_name'], 'Igor', response.data['first_name'])
         self.assertEqual(response.data['tel_num'], None, response.data['tel_num'])
+
+    def test_retrieve_missing_courier_account(self):
+        user = CustomUser.objects.create_user(email='customer@gmail.com', password=self.password)
+        header = {'HTTP_AUTHORIZATION': f'Bearer {AccessToken.for_user(user)}'}
+        url = reverse('courier-profile')
+
+        response = self.client.get(url, {}, **header, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND, response.content)
+        self.assertFalse(CourierAccount.objects.filter(user=user).exists())
+
+    def test_update_creates_courier_account(self):
+        user = CustomUser.objects.create_user(email='customer@gmail.com', password=self.password)
+        header = {'HTTP_AUTHORIZATION': f'Bearer {AccessToken.for_user(user)}'}
+        url = reverse('courier-profile')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.patch(url, {'first_name': 'Igor'}, **header, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.content)
+        self.assertEqual(CourierAccount.objects.get(user=user).first_name, 'Igor')
+
+        response = self.client.get(url, {}, **header, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.content)
+        self.assertEqual(response.data['first_name'], 'Igor', response.data)
+
+    def test_register_user_creates_account(self):
+        url = reverse('register')
+
+        response = self.client.post(url, {
+            'password': self.password,
+            'email': self.email
+        }, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.content)
+        self.assertTrue(UserAccount.objects.filter(user_id=response.data['id']).exists())
+
+    def test_retrieve_user_account_is_cached(self):
+        url = reverse('user-profile')
+        self.client.get(url, {}, **self.header, format='json')
+
+        # only the user lookup for the claim-less token
+        with self.assertNumQueries(1):
+            response = self.client.get(url, {}, **self.header, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.content)
+
+        self.client.put(url, {'first_name': 'Igor'}, **self.header, format='json')
+
+        response = self.client.get(url, {}, **self.header, format='json')
+        self.assertEqual(response.data['first_name'], 'Igor', response.data)
+
+    def test_profile_cached_before_commit_is_forgotten(self):
+        url = reverse('user-profile')
+        stale = self.client.get(url, {}, **self.header, format='json').data
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.put(url, {'first_name': 'Igor'}, **self.header, format='json')
+            # cached by a concurrent request before the commit
+            cache.set(profile_cache_key(USER_PROFILE, self.user.id), stale)
+
+        response = self.client.get(url, {}, **self.header, format='json')
+        self.assertEqual(response.data['first_name'], 'Igor', response.data)
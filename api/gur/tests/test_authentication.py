@@ -0,0 +1,72 @@
+from django.core.cache import cache
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
+
+from ..models import CustomUser, UserAccount, CourierAccount
+
+
+class ClaimsAuthenticationTests(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.password = 'password'
+        self.user = CustomUser.objects.create_user(email='bla@gmail.com', password=self.password)
+        UserAccount.objects.create(user=self.user)
+        self.courier_account = CourierAccount.objects.create(user=self.user)
+
+    def obtain_tokens(self):
+        response = self.client.post(reverse('token_obtain_pair'), {
+            'email': self.user.email,
+            'password': self.password
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.content)
+        return response.data
+
+    def test_token_contains_claims(self):
+        claims = AccessToken(self.obtain_tokens()['access'])['gur']
+
+        self.assertEqual(claims['ca'], self.courier_account.id)
+        self.assertEqual(claims['ra'], [])
+
+    def test_claims_authenticate_without_user_query(self):
+        header = {'HTTP_AUTHORIZATION': f"Bearer {self.obtain_tokens()['access']}"}
+        # looks the claims epoch up once
+        self.client.get(reverse('courier-orders'), **header, format='json')
+
+        # only the orders list itself is selected
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('courier-orders'), **header, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.content)
+
+    def test_outdated_claims_fall_back_to_database(self):
+        header = {'HTTP_AUTHORIZATION': f"Bearer {self.obtain_tokens()['access']}"}
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.courier_account.delete()
+        response = self.client.get(reverse('courier-orders'), **header, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN, response.content)
+
+    def test_outdated_claims_detected_without_cache(self):
+        header = {'HTTP_AUTHORIZATION': f"Bearer {self.obtain_tokens()['access']}"}
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.courier_account.delete()
+        # a restarted worker
+        cache.clear()
+        response = self.client.get(reverse('courier-orders'), **header, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN, response.content)
+
+    def test_refresh_updates_outdated_claims(self):
+        refresh = self.obtain_tokens()['refresh']
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.courier_account.delete()
+        response = self.client.post(reverse('token_refresh'), {'refresh': refresh}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.content)
+        self.assertIsNone(AccessToken(response.data['access'])['gur']['ca'])
@@ -0,0 +1,32 @@
+from django.test import SimpleTestCase
+
+from ..services.board import FreeOrderBoard
+
+
+class FreeOrderBoardTests(SimpleTestCase):
+
+    def setUp(self):
+        self.board = FreeOrderBoard(cell_size=500, refresh_interval=3600)
+        # mark as loaded so lookups don't go to the database
+        self.board.loaded_at = float('inf')
+
+    def test_nearest_first(self):
+        self.board.place(1, 0, 50.4595, 30.5967)
+        self.board.place(2, 0, 50.4505, 30.5967)
+        self.board.place(3, 0, 50.4700, 30.5967)
+
+        orders = self.board.nearest(50.4500, 30.5967, 2000)
+
+        self.assertEqual([order.id for order in orders], [2, 1])
+        self.assertLess(orders[0].distance, orders[1].distance)
+
+    def test_removed_and_replaced_orders(self):
+        self.board.place(1, 0, 50.4595, 30.5967)
+        self.board.place(2, 0, 50.4595, 30.5967)
+        self.board.remove(1)
+        self.board.place(2, 1, 50.4600, 30.5967)
+
+        orders = self.board.nearest(50.4595, 30.5967, 1000)
+
+        self.assertEqual([(order.id, order.version) for order in orders], [(2, 1)])
+        self.assertEqual(len(self.board.cells), 1)
@@ -0,0 +1,69 @@
+from datetime import datetime, timezone
+
+from django.test import TestCase
+
+from ..models import Order, OrderStatus
+from ..services.city import CityGenerator
+
+UNTIL = datetime(2021, 6, 1, tzinfo=timezone.utc)
+
+
+class CityGeneratorTests(TestCase):
+
+    def generate(self, domain, seed=1):
+        return CityGenerator(
+            seed=seed, restaurants=4, districts=2, users=10, couriers=3,
+            days=3, orders_per_day=20, until=UNTIL, domain=domain
+        ).generate()
+
+    def orders(self, domain):
+        return Order.objects.filter(
+            user__user__email__endswith=f"@{domain}"
+        ).order_by('id')
+
+    def test_counts(self):
+        counts = self.generate("city.test")
+
+        self.assertEqual(counts['UserAccount'], 10)
+        self.assertEqual(counts['CourierAccount'], 3)
+        self.assertEqual(counts['Order'], self.orders("city.test").count())
+        self.assertGreater(counts['OrderStatus'], counts['Order'])
+
+    def test_orders_are_consistent(self):
+        self.generate("city.test")
+
+        for order in self.orders("city.test").prefetch_related('statuses', 'order_dishes__dish'):
+            statuses = [order_status.status for order_status in order.statuses.all()]
+            self.assertEqual(statuses[:2], [OrderStatus.OPEN, OrderStatus.PREPARING][:len(statuses)])
+            self.assertEqual(
+                len({order_dish.dish.restaurant_id for order_dish in order.order_dishes.all()}), 1
+            )
+            self.assertEqual(order.courier_id is not None, OrderStatus.DELIVERING in statuses)
+            self.assertLessEqual(order.created_at, UNTIL)
+
+    def test_couriers_deliver_one_order_at_a_time(self):
+        self.generate("city.test")
+        deliveries = {}
+
+        for order in self.orders("city.test").filter(courier__isnull=False).prefetch_related('statuses'):
+            at = {order_status.status: order_status.created_at for order_status in order.statuses.all()}
+            deliveries.setdefault(order.courier_id, []).append(
+                (at[OrderStatus.DELIVERING], at.get(OrderStatus.DELIVERED))
+            )
+
+        for courier_id, intervals in deliveries.items():
+            intervals.sort()
+            # at most one active order, and it is the latest
+            self.assertNotIn(None, [delivered_at for _, delivered_at in intervals[:-1]])
+            for (_, delivered_at), (next_delivering_at, _) in zip(intervals, intervals[1:]):
+                self.assertLessEqual(delivered_at, next_delivering_at, courier_id)
+
+    def test_same_seed_same_city(self):
+        self.generate("a.test")
+        self.generate("b.test")
+        fields = ('created_at', 'summary', 'delivery_address', 'delivery_location')
+
+        self.assertEqual(
+            list(self.orders("a.test").values_list(*fields)),
+            list(self.orders("b.test").values_list(*fields)),
+        )
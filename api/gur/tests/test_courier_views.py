@@ -1,7 +1,10 @@
+from django.core.cache import cache
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APITestCase
-from ..models import CustomUser, UserAccount, CourierAccount
+from ..models import CustomUser, UserAccount, CourierAccount, Order, OrderStatus
+from ..services.board import free_order_board
+from ..services.courier import courier_order_cache_key
 from rest_framework_simplejwt.tokens import AccessToken
 
 
@@ -9,6 +12,8 @@ class CourierViewTests(APITestCase):
     fixtures = ['orders_with_users.json']
 
     def setUp(self):
+        cache.clear()
+        free_order_board.reset()
         self.user = CustomUser.objects.create_user(email='bla@gmail.com', password='password')
         CourierAccount.objects.create(user=self.user)
         self.header = self.get_header_for_user(self.user)
@@ -28,6 +33,60 @@ class CourierViewTests(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK, response.content)
         self.assertEqual(len(response.data), 2, response.data)
 
+    def test_get_free_orders_without_location(self):
+        url = reverse('courier-free-orders')
+        Order.objects.filter(id=3).update(delivery_location=None)
+
+        response = self.client.get(url, {}, **self.header, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.content)
+        self.assertEqual([order['id'] for order in response.data], [2], response.data)
+
+    def test_get_free_orders_from_cache(self):
+        url = reverse('courier-free-orders')
+
+        first_response = self.client.get(url, {}, **self.header, format='json')
+        self.assertIsNotNone(cache.get(courier_order_cache_key(2, 0)))
+        second_response = self.client.get(url, {}, **self.header, format='json')
+
+        self.assertEqual(second_response.status_code, status.HTTP_200_OK, second_response.content)
+        self.assertEqual(first_response.data, second_response.data)
+
+    def test_get_free_orders_near(self):
+        url = reverse('courier-free-orders')
+
+        response = self.client.get(url, {
+            'longitude': '30.5967171',
+            'latitude': '50.4625135'
+        }, **self.header, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.content)
+        self.assertEqual([order['id'] for order in response.data], [2, 3], response.data)
+
+    def test_claim_of_order_taken_elsewhere_drops_it_from_board(self):
+        location = {'longitude': '30.5967171', 'latitude': '50.4625135'}
+        self.client.get(reverse('courier-free-orders'), location, **self.header, format='json')
+        # claimed through another worker, this board did not see it
+        Order.objects.filter(id=2).update(courier_id=1)
+
+        response = self.client.put(reverse('courier-free-order-update', kwargs={'pk': 2}), {
+            'courier_location': location
+        }, **self.header, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, response.content)
+        self.assertNotIn(2, free_order_board.orders)
+
+    def test_get_free_orders_far(self):
+        url = reverse('courier-free-orders')
+
+        response = self.client.get(url, {
+            'longitude': '13.25',
+            'latitude': '5.38'
+        }, **self.header, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.content)
+        self.assertEqual(len(response.data), 0, response.data)
+
     def test_get_current_courier_order(self):
         url = reverse('courier-current-order')
 
@@ -52,6 +111,20 @@ class CourierViewTests(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, response.content)
         self.assertIn("courier_location", response.data)
 
+    def test_take_free_order_successfully(self):
+        url = reverse('courier-free-order-update', kwargs={'pk': 3})
+
+        response = self.client.put(url, {
+            'courier_location': {
+                'longitude': '30.5967171',
+                'latitude': "50.4625135"
+            }
+        }, **self.header, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.content)
+        self.assertEqual(Order.objects.get(id=3).courier.user, self.user)
+        self.assertTrue(OrderStatus.objects.filter(order_id=3, status=OrderStatus.DELIVERING).exists())
+
     def test_take_order_which_is_taken(self):
         url = reverse('courier-free-order-update', kwargs={'pk': 1})
 
@@ -77,6 +150,7 @@ class CourierViewTests(APITestCase):
 
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, response.content)
         self.assertEqual(len(response.data), 1)
+        self.assertIsNone(Order.objects.get(id=3).courier_id)
 
     def test_post_new_courier_location_to_wrong_order(self):
         url = reverse('courier-location', kwargs={'order_id': 3})
@@ -1,7 +1,10 @@
+from django.core.cache import cache
+from django.db.models import F
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APITestCase
-from ..models import CustomUser, UserAccount, Dish, RestaurantAdmin
+from ..models import CustomUser, UserAccount, Dish, Restaurant, RestaurantAdmin
+from ..services.menu import get_menu, menu_cache_key
 from rest_framework_simplejwt.tokens import AccessToken
 
 
@@ -9,6 +12,7 @@ class DishesViewTests(APITestCase):
     fixtures = ['restaurant_dishes.json']
 
     def setUp(self):
+        cache.clear()
         user = CustomUser.objects.create_user(email='bla@gmail.com', password='password')
         UserAccount.objects.create(user=user)
         self.header = self.get_header_for_user(user)
@@ -36,6 +40,56 @@ class DishesViewTests(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK, response.content)
         self.assertEqual(len(response.data), 2)
 
+    def test_get_dishes_sparse_fields(self):
+        url = reverse('restaurant-dishes', kwargs={'pk': 1})
+
+        response = self.client.get(url, {}, **self.header, format='json')
+        self.assertNotIn('dish_photo', response.data[0], response.data)
+
+        response = self.client.get(url, {'fields': 'id,price', 'exclude': 'price'}, **self.header, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.content)
+        self.assertEqual(response.data[0], {'id': response.data[0]['id']}, response.data)
+
+    def test_get_dishes_not_modified(self):
+        url = reverse('restaurant-dishes', kwargs={'pk': 1})
+        etag = self.client.get(url, {}, **self.header, format='json')['ETag']
+
+        response = self.client.get(url, {}, **self.header, HTTP_IF_NONE_MATCH=etag, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED, response.content)
+        self.assertEqual(response['ETag'], etag)
+
+    def test_get_dishes_after_menu_change(self):
+        url = reverse('restaurant-dishes', kwargs={'pk': 1})
+        etag = self.client.get(url, {}, **self.header, format='json')['ETag']
+
+        Dish.objects.filter(restaurant_id=1).first().delete()
+        response = self.client.get(url, {}, **self.header, HTTP_IF_NONE_MATCH=etag, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.content)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(len(response.data), 1)
+
+    def test_get_dishes_after_menu_change_in_another_worker(self):
+        url = reverse('restaurant-dishes', kwargs={'pk': 1})
+        etag = self.client.get(url, {}, **self.header, format='json')['ETag']
+
+        # nothing in this process's cache was invalidated
+        Restaurant.objects.filter(id=1).update(menu_version=F('menu_version') + 1)
+        response = self.client.get(url, {}, **self.header, HTTP_IF_NONE_MATCH=etag, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.content)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_menu_of_lagging_version_is_cached_under_primary_version(self):
+        version = Restaurant.objects.get(id=1).menu_version
+
+        # a version read from a replica that missed the last change
+        data = get_menu(1, version - 1)
+
+        self.assertIsNone(cache.get(menu_cache_key(1, version - 1)))
+        self.assertEqual(cache.get(menu_cache_key(1, version)), data)
+
     def test_get_all_dishes_from_non_existing_restaurant(self):
         url = reverse('restaurant-dishes', kwargs={'pk': 31})
 
@@ -0,0 +1,78 @@
+import numpy as np
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import SimpleTestCase
+from scipy.optimize import linear_sum_assignment
+
+from ..services.dispatch import UNREACHABLE, candidate_pairs, solve_assignment
+from ..services.geo import haversine_distance
+
+
+class DispatchTests(SimpleTestCase):
+
+    def test_candidate_pairs_match_haversine(self):
+        couriers = [(50.4595, 30.5967), (50.4450, 30.5912), (49.8397, 24.0297)]
+        orders = [(50.4501, 30.5233), (50.4700, 30.6000), (50.4595, 30.5967)]
+
+        rows, columns, distances = candidate_pairs(couriers, orders, 2000)
+
+        expected = {
+            (i, j): haversine_distance(*courier, *order)
+            for i, courier in enumerate(couriers)
+            for j, order in enumerate(orders)
+            if haversine_distance(*courier, *order) <= 2000
+        }
+        found = dict(zip(zip(rows.tolist(), columns.tolist()), distances.tolist()))
+        self.assertEqual(found.keys(), expected.keys())
+        for pair, distance in found.items():
+            self.assertAlmostEqual(distance, expected[pair], places=3)
+
+    def test_assignment_is_globally_optimal(self):
+        # greedy would give order 0 to courier 0 and leave courier 1 with 100
+        pairs = solve_assignment(
+            (2, 2), np.array([0, 0, 1, 1]), np.array([0, 1, 0, 1]),
+            np.array([1.0, 2.0, 2.0, 100.0])
+        )
+
+        self.assertEqual(sorted(pairs), [(0, 1, 2.0), (1, 0, 2.0)])
+
+    def test_most_couriers_are_matched(self):
+        pairs = solve_assignment(
+            (2, 2), np.array([0, 0, 1]), np.array([0, 1, 0]), np.array([1.0, 2.0, 300.0])
+        )
+
+        self.assertEqual(sorted(pairs), [(0, 1, 2.0), (1, 0, 300.0)])
+
+    def test_unreachable_pairs_are_not_matched(self):
+        pairs = solve_assignment((2, 2), np.array([0]), np.array([0]), np.array([5.0]))
+
+        self.assertEqual(pairs, [(0, 0, 5.0)])
+
+    def test_matches_dense_assignment(self):
+        rng = np.random.default_rng(1)
+        couriers = (50.45, 30.52) + rng.uniform(-0.05, 0.05, size=(60, 2))
+        orders = (50.45, 30.52) + rng.uniform(-0.05, 0.05, size=(40, 2))
+        rows, columns, distances = candidate_pairs(couriers, orders, 2000)
+        dense = np.full((60, 40), UNREACHABLE)
+        dense[rows, columns] = distances
+        dense_rows, dense_columns = linear_sum_assignment(dense)
+        reachable = dense[dense_rows, dense_columns] < UNREACHABLE
+
+        pairs = solve_assignment((60, 40), rows, columns, distances)
+
+        self.assertEqual(len(pairs), reachable.sum())
+        self.assertAlmostEqual(
+            sum(cost for _, _, cost in pairs),
+            dense[dense_rows, dense_columns][reachable].sum()
+        )
+
+    def test_empty(self):
+        self.assertEqual(solve_assignment((0, 3), np.array([]), np.array([]), np.array([])), [])
+
+
+class DispatchCommandTests(SimpleTestCase):
+
+    def test_refuses_in_memory_layer(self):
+        # its offers would never reach the sockets of the ASGI server
+        with self.assertRaises(CommandError):
+            call_command('dispatch_orders', '--once')
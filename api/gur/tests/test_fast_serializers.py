@@ -0,0 +1,69 @@
+from django.db.models import Prefetch
+from django.test import TestCase
+
+from ..models import Dish, Order, OrderDish, OrderStatus, Restaurant
+from ..serializers.dishes import DishSerializer
+from ..serializers.fast import (
+    DishValuesSerializer, RestaurantValuesSerializer,
+    OrderHistoryValuesSerializer, CourierOrderValuesSerializer
+)
+from ..serializers.order import OrderWithFirstStatusSerializer, CourierOrderDetailSerializer
+from ..serializers.restaurant import RestaurantSerializer
+
+
+class ValuesSerializerTests(TestCase):
+    fixtures = ['restaurant_dishes.json', 'orders_with_users.json']
+
+    def setUp(self):
+        dish = Dish.objects.filter(restaurant_id=1).first()
+        OrderDish.objects.create(order_id=1, dish=dish, quantity=2)
+        OrderDish.objects.create(order_id=2, dish=dish, quantity=1)
+
+    def assertSameOutput(self, drf_data, fast_data):
+        # compared through plain types, as the renderer sees them
+        self.assertEqual([dict(row) for row in drf_data], fast_data)
+        for drf_row, fast_row in zip(drf_data, fast_data):
+            self.assertEqual(list(drf_row), list(fast_row))
+
+    def test_dishes(self):
+        queryset = Dish.objects.order_by('id')
+
+        self.assertSameOutput(
+            DishSerializer(queryset, many=True).data,
+            DishValuesSerializer().serialize_queryset(queryset)
+        )
+
+    def test_restaurants(self):
+        queryset = Restaurant.objects.order_by('id')
+
+        self.assertSameOutput(
+            RestaurantSerializer(queryset, many=True).data,
+            RestaurantValuesSerializer().serialize_queryset(queryset)
+        )
+
+    def test_restaurants_sparse(self):
+        queryset = Restaurant.objects.order_by('id')
+        fields = ['id', 'is_open', 'location']
+
+        self.assertSameOutput(
+            RestaurantSerializer(queryset, many=True, fields=fields).data,
+            RestaurantValuesSerializer(fields=fields).serialize_queryset(queryset)
+        )
+
+    def test_order_history(self):
+        queryset = Order.objects.order_by('-created_at').prefetch_related(
+            Prefetch("statuses", OrderStatus.objects.order_by("-created_at"), to_attr="last_status")
+        )
+
+        self.assertSameOutput(
+            OrderWithFirstStatusSerializer(queryset, many=True).data,
+            OrderHistoryValuesSerializer().serialize_queryset(queryset)
+        )
+
+    def test_courier_orders(self):
+        queryset = Order.objects.order_by('id')
+
+        self.assertSameOutput(
+            CourierOrderDetailSerializer(queryset, many=True).data,
+            CourierOrderValuesSerializer().serialize_queryset(queryset)
+        )
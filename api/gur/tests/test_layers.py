@@ -0,0 +1,62 @@
+from asgiref.sync import async_to_sync
+from channels.exceptions import ChannelFull
+from django.test import SimpleTestCase
+
+from ..layers import PolicyInMemoryChannelLayer
+
+
+class PolicyChannelLayerTests(SimpleTestCase):
+
+    def setUp(self):
+        self.layer = PolicyInMemoryChannelLayer(capacity=3)
+        self.channel = "specific.test!client"
+
+    def send(self, message):
+        async_to_sync(self.layer.send)(self.channel, message)
+
+    def receive(self):
+        return async_to_sync(self.layer.receive)(self.channel)
+
+    def test_location_keeps_only_latest(self):
+        for i in range(10):
+            self.send({'type': 'event.location', 'content': i})
+
+        self.assertEqual(self.receive()['content'], 9)
+        self.assertNotIn(self.channel, self.layer.mailboxes)
+
+    def test_location_burst_does_not_drop_statuses(self):
+        self.send({'type': 'event.orderstatus', 'content': 'D'})
+        for i in range(50):
+            self.send({'type': 'event.location', 'content': i})
+        self.send({'type': 'event.orderstatus', 'content': 'F'})
+
+        self.assertEqual(self.receive()['content'], 'D')
+        self.assertEqual(self.receive()['content'], 'F')
+        self.assertEqual(self.receive()['content'], 49)
+
+    def test_reliable_messages_are_bounded(self):
+        for i in range(3):
+            self.send({'type': 'event.neworder', 'content': i})
+
+        with self.assertRaises(ChannelFull):
+            self.send({'type': 'event.neworder', 'content': 3})
+
+        self.assertEqual(
+            [self.receive()['content'] for _ in range(3)],
+            [0, 1, 2]
+        )
+
+    def test_group_send_skips_full_channels(self):
+        async_to_sync(self.layer.group_add)("order_1", self.channel)
+        for i in range(5):
+            async_to_sync(self.layer.group_send)(
+                "order_1", {'type': 'event.orderstatus', 'content': i}
+            )
+        async_to_sync(self.layer.group_send)(
+            "order_1", {'type': 'event.location', 'content': 'last'}
+        )
+
+        self.assertEqual(
+            [self.receive()['content'] for _ in range(4)],
+            [0, 1, 2, 'last']
+        )
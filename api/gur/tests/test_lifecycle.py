@@ -0,0 +1,64 @@
+from django.contrib.gis.geos import Point
+from django.core.cache import cache
+from django.test import SimpleTestCase, TransactionTestCase
+
+from ..models import CustomUser, Dish, Order, Restaurant
+from ..perf.lifecycle import STEPS, LifecycleBenchmark, compare, summarize
+from ..services.board import free_order_board
+
+
+class LifecycleBenchmarkTests(TransactionTestCase):
+    # consumers close the connection between database calls, which a
+    # TestCase transaction does not survive
+
+    def setUp(self):
+        cache.clear()
+        free_order_board.reset()
+        restaurant = Restaurant.objects.create(
+            name="Bench restaurant",
+            rest_address="1 Bench street",
+            location=Point(30.5234, 50.4501, srid=4326),
+        )
+        for i in range(4):
+            Dish.objects.create(
+                restaurant=restaurant, name=f"Dish {i}", description="", price=1000, gramme=300
+            )
+
+    def tearDown(self):
+        free_order_board.reset()
+
+    def test_every_step_is_measured(self):
+        steps = LifecycleBenchmark(iterations=2, warmup=1, dishes=2, locations=3).run()
+
+        self.assertEqual(list(steps), list(STEPS))
+        self.assertEqual(steps['discovery']['count'], 2)
+        self.assertEqual(steps['cart_add']['count'], 4)
+        self.assertEqual(steps['location_push']['count'], 6)
+        self.assertGreater(steps['checkout']['queries'], 0)
+        self.assertIsNone(steps['claim_push']['queries'])
+
+    def test_actors_are_removed(self):
+        LifecycleBenchmark(iterations=1, warmup=0).run()
+
+        self.assertFalse(CustomUser.objects.exists())
+        self.assertFalse(Order.objects.exists())
+
+
+class CompareTests(SimpleTestCase):
+
+    def results(self, durations, queries):
+        return {'steps': {'menu': summarize([(duration, queries) for duration in durations])}}
+
+    def test_slower_steps_are_regressions(self):
+        previous = self.results([0.010] * 10, 2)
+
+        self.assertEqual(compare(previous, self.results([0.011] * 10, 2)), [])
+        self.assertEqual(
+            [metric for _, metric, _, _ in compare(previous, self.results([0.015] * 10, 2))],
+            ['p50', 'p90'],
+        )
+
+    def test_more_queries_are_regressions(self):
+        regressions = compare(self.results([0.010] * 10, 2), self.results([0.010] * 10, 3))
+
+        self.assertEqual(regressions, [('menu', 'queries', 2, 3)])
@@ -1,3 +1,4 @@
+from django.core.cache import cache
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APITestCase
@@ -388,6 +389,7 @@ class OrderStatusViewTests(APITestCase):
     fixtures = ['restaurant_dishes.json', 'orders.json']
 
     def setUp(self):
+        cache.clear()
         user1 = CustomUser.objects.get(id=1)
         self.second_header = self.get_header_for_user(user1)
 
@@ -434,6 +436,15 @@ class OrderStatusViewTests(APITestCase):
         }, **self.header, format='json')
         self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
 
+    def test_courier_delivers_order(self):
+        url = reverse('order-statuses', kwargs={'order_id': 2})
+
+        response = self.client.post(url, {
+            'status': 'F'
+        }, **self.header, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.content)
+        self.assertTrue(OrderStatus.objects.filter(order_id=2, status='F').exists())
+
     def test_create_non_possible_order_status(self):
         url = reverse('order-statuses', kwargs={'order_id': 2})
 
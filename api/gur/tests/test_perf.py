@@ -0,0 +1,211 @@
+import contextvars
+import json
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from ..models import Dish
+from ..perf.metrics import Histogram
+from ..perf.profiling import (
+    WAITING, Profiler, current_profiler, is_profile_token_valid, make_profile_token, sampled_in_thread
+)
+from ..perf.queries import NPlusOneError, check_repeated_queries, sql_shape
+from ..perf.stats import RequestStats, collect
+from ..serializers.dishes import DishSerializer
+from ..services.events import group_send
+
+
+class HistogramTests(SimpleTestCase):
+
+    def test_render_is_cumulative(self):
+        histogram = Histogram("test_seconds", "Test.", (0.1, 1))
+        for value in (0.05, 0.5, 0.5, 3):
+            histogram.observe('restaurant-dishes', value)
+
+        lines = histogram.render().splitlines()
+
+        self.assertEqual(lines[1], "# TYPE test_seconds histogram")
+        self.assertEqual(lines[2:], [
+            'test_seconds_bucket{view="restaurant-dishes",le="0.1"} 1',
+            'test_seconds_bucket{view="restaurant-dishes",le="1"} 3',
+            'test_seconds_bucket{view="restaurant-dishes",le="+Inf"} 4',
+            'test_seconds_sum{view="restaurant-dishes"} 4.05',
+            'test_seconds_count{view="restaurant-dishes"} 4',
+        ])
+
+    def test_labels_are_escaped(self):
+        histogram = Histogram("test_seconds", "Test.", (1,))
+        histogram.observe('a"b\\c', 1)
+
+        self.assertIn('view="a\\"b\\\\c"', histogram.render())
+
+
+class RepeatedQueryTests(SimpleTestCase):
+
+    def test_shape_leaves_out_values(self):
+        self.assertEqual(
+            sql_shape('SELECT "name" FROM "gur_dish" WHERE "id" = 1 AND "name" = \'a\''),
+            sql_shape('SELECT "name" FROM "gur_dish" WHERE "id" = 25 AND "name" = \'b\''),
+        )
+        self.assertEqual(
+            sql_shape('SELECT "name" FROM "gur_dish" WHERE "id" IN (%s, %s)'),
+            sql_shape('SELECT "name" FROM "gur_dish" WHERE "id" IN (%s)'),
+        )
+
+    @override_settings(NPLUSONE_ACTION='raise', NPLUSONE_THRESHOLD=2)
+    def test_repeated_shape_raises(self):
+        stats = RequestStats(shapes=True)
+        stats.shapes[sql_shape('SELECT "name" FROM "gur_dish" WHERE "id" = %s')] = 3
+
+        with self.assertRaises(NPlusOneError):
+            check_repeated_queries('restaurant-dishes', stats)
+
+    @override_settings(NPLUSONE_ACTION='raise', NPLUSONE_THRESHOLD=2)
+    def test_savepoints_are_not_reported(self):
+        stats = RequestStats(shapes=True)
+        stats.shapes[sql_shape('SAVEPOINT "s1_x1"')] = 3
+
+        check_repeated_queries('orders-recreate', stats)
+
+
+def busy(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+class ProfilerTests(SimpleTestCase):
+
+    def test_profile_tokens_are_signed(self):
+        token = make_profile_token()
+
+        self.assertTrue(is_profile_token_valid(token))
+        self.assertFalse(is_profile_token_valid(token + "0"))
+        self.assertFalse(is_profile_token_valid("profile"))
+
+    def test_samples_the_stack(self):
+        profiler = Profiler(interval=0.001).start()
+        busy(0.1)
+        profiler.stop()
+
+        self.assertTrue(any(stack.endswith(".busy") for stack in profiler.stacks), profiler.stacks)
+
+    def test_samples_without_marker_are_waiting(self):
+        def handler():
+            yield
+        # the frame of a suspended generator is on no stack
+        suspended = handler()
+        next(suspended)
+        profiler = Profiler(interval=0.001, marker=suspended.gi_frame).start()
+        busy(0.05)
+        profiler.stop()
+
+        self.assertEqual(set(profiler.stacks), {WAITING})
+
+    def test_samples_sync_threads_of_the_handler(self):
+        def handler():
+            yield
+        suspended = handler()
+        next(suspended)
+        profiler = Profiler(interval=0.001, marker=suspended.gi_frame).start()
+        token = current_profiler.set(profiler)
+        try:
+            # as sync_to_async, runs in another thread with a copy of the context
+            thread = threading.Thread(target=contextvars.copy_context().run, args=(
+                sampled_in_thread(busy), 0.1
+            ))
+            thread.start()
+            thread.join()
+        finally:
+            current_profiler.reset(token)
+        profiler.stop()
+
+        self.assertTrue(any(stack.endswith(".busy") for stack in profiler.stacks), profiler.stacks)
+
+
+class PerformanceMiddlewareTests(APITestCase):
+    fixtures = ['restaurant_dishes.json']
+
+    def setUp(self):
+        cache.clear()
+        profile_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(profile_dir.cleanup)
+        self.profile_dir = Path(profile_dir.name)
+
+    @override_settings(PERF_SERVER_TIMING=True)
+    def test_server_timing_header(self):
+        response = self.client.get(reverse('restaurant-dishes', kwargs={'pk': 1}), format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.content)
+        timing = response['Server-Timing']
+        for metric in ('db;dur=', 'serialize;dur=', 'channels;dur=', 'total;dur='):
+            self.assertIn(metric, timing)
+
+    @override_settings(PERF_SERVER_TIMING=False)
+    def test_server_timing_header_only_for_profiled_requests(self):
+        url = reverse('restaurant-dishes', kwargs={'pk': 1})
+
+        self.assertNotIn('Server-Timing', self.client.get(url, format='json'))
+        with self.settings(PROFILE_DIR=self.profile_dir):
+            response = self.client.get(
+                url, format='json', HTTP_X_PROFILE_TOKEN=make_profile_token()
+            )
+        self.assertIn('Server-Timing', response)
+
+    def test_metrics_endpoint(self):
+        self.client.get(reverse('restaurant-dishes', kwargs={'pk': 1}), format='json')
+
+        response = self.client.get(reverse('metrics'))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('gur_sql_queries_count{view="restaurant-dishes"}', response.content.decode())
+
+    @override_settings(METRICS_ALLOWED_IPS=())
+    def test_metrics_endpoint_is_restricted(self):
+        response = self.client.get(reverse('metrics'))
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_collects_queries_and_serialization(self):
+        with collect() as stats:
+            DishSerializer(Dish.objects.all(), many=True).data
+
+        self.assertEqual(stats.queries, 1)
+        self.assertGreater(stats.serializer_time, 0)
+        self.assertFalse(stats.serializing)
+
+    def test_collects_channel_sends(self):
+        with collect() as stats:
+            group_send("courier_queue", {'type': 'event.ordertaken', 'content': 1})
+
+        self.assertEqual(stats.channel_sends, 1)
+
+    def test_profile_requested_by_token(self):
+        with self.settings(PROFILE_DIR=self.profile_dir, PROFILE_INTERVAL=0.001):
+            response = self.client.get(
+                reverse('restaurant-dishes', kwargs={'pk': 1}), format='json',
+                HTTP_X_PROFILE_TOKEN=make_profile_token()
+            )
+
+        profile_id = response['X-Profile-Id']
+        self.assertTrue((self.profile_dir / f"{profile_id}.folded").exists())
+        profile = json.loads((self.profile_dir / f"{profile_id}.json").read_text())
+        self.assertEqual(profile['view'], 'restaurant-dishes')
+        self.assertGreater(len(profile['queries']), 0)
+
+    def test_requests_are_not_profiled_by_default(self):
+        with self.settings(PROFILE_DIR=self.profile_dir):
+            response = self.client.get(
+                reverse('restaurant-dishes', kwargs={'pk': 1}), format='json',
+                HTTP_X_PROFILE_TOKEN="forged"
+            )
+
+        self.assertNotIn('X-Profile-Id', response)
+        self.assertEqual(list(self.profile_dir.iterdir()), [])
@@ -0,0 +1,144 @@
+import base64
+import io
+import os
+import shutil
+import tempfile
+from concurrent.futures import Future
+
+from django.http import Http404
+from PIL import Image
+from django.test import SimpleTestCase, RequestFactory, override_settings
+from rest_framework import serializers
+
+from ..serializers.photo import PhotoField, PhotoSerializerMixin
+from ..services.photos import (
+    PhotoError, log_variant_failure, photo_store, photo_url, photo_variant_urls
+)
+from ..views.photos import photo_view
+
+PNG = base64.b64decode(
+    "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mNk+M9QDwADhgGAWjR9awAAAABJRU5ErkJggg=="
+)
+
+
+class PhotoSerializer(PhotoSerializerMixin, serializers.Serializer):
+    photo = PhotoField()
+
+    def create(self, validated_data):
+        return validated_data
+
+
+class PhotoStoreTests(SimpleTestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.settings = override_settings(
+            PHOTO_ROOT=self.root,
+            PHOTO_URL='/media/photos/',
+            PHOTO_VARIANTS={'thumb': 8},
+            PHOTO_VARIANT_FORMATS=('webp', 'jpg'),
+            PHOTO_VARIANT_WORKERS=0
+        )
+        self.settings.enable()
+
+    def tearDown(self):
+        self.settings.disable()
+        shutil.rmtree(self.root)
+
+    def test_save_is_content_addressed(self):
+        name = photo_store.save_encoded("data:image/png;base64," + base64.b64encode(PNG).decode())
+
+        self.assertRegex(name, r"^[0-9a-f]{64}\.png$")
+        self.assertEqual(photo_store.save(PNG), name)
+        with open(photo_store.path(name), "rb") as file:
+            self.assertEqual(file.read(), PNG)
+
+    def test_save_rejects_non_images(self):
+        with self.assertRaises(PhotoError):
+            photo_store.save_encoded(base64.b64encode(b"not an image").decode())
+        with self.assertRaises(PhotoError):
+            photo_store.save_encoded("not base64 !")
+
+    def test_photo_stored_on_save_only(self):
+        serializer = PhotoSerializer(data={'photo': base64.b64encode(PNG).decode()})
+
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        self.assertEqual(os.listdir(self.root), [])
+
+        name = serializer.save()['photo']
+        self.assertTrue(photo_store.exists(name))
+
+    def test_photo_url(self):
+        name = photo_store.save(PNG)
+
+        self.assertEqual(photo_url(name), f"/media/photos/{name}")
+        self.assertEqual(photo_url("https://example.com/a.jpg"), "https://example.com/a.jpg")
+        self.assertEqual(photo_store.name_from_url(photo_url(name)), name)
+        self.assertIsNone(photo_url(None))
+
+    def test_photo_view_caching_headers(self):
+        name = photo_store.save(PNG)
+        factory = RequestFactory()
+
+        response = photo_view(factory.get(f"/media/photos/{name}"), name)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("immutable", response["Cache-Control"])
+        self.assertEqual(b"".join(response.streaming_content), PNG)
+        response.close()
+
+        response = photo_view(
+            factory.get(f"/media/photos/{name}", HTTP_IF_NONE_MATCH=response["ETag"]), name
+        )
+        self.assertEqual(response.status_code, 304)
+
+    def test_photo_view_missing(self):
+        name = photo_store.save(PNG)
+        os.remove(photo_store.path(name))
+
+        with self.assertRaises(Http404):
+            photo_view(RequestFactory().get(f"/media/photos/{name}"), name)
+
+    def test_variant_urls(self):
+        name = photo_store.save(PNG)
+        digest = name.split(".")[0]
+
+        self.assertEqual(photo_variant_urls(name), {
+            'thumb': {
+                'webp': f"/media/photos/{digest}-thumb.webp",
+                'jpg': f"/media/photos/{digest}-thumb.jpg",
+            }
+        })
+        self.assertIsNone(photo_variant_urls("https://example.com/a.jpg"))
+
+    def test_variants_rendered_once(self):
+        buffer = io.BytesIO()
+        Image.new("RGBA", (32, 16), (255, 0, 0, 128)).save(buffer, "PNG")
+        name = photo_store.save(buffer.getvalue())
+        variant = photo_store.variant_name(name, 'thumb', 'jpg')
+
+        response = photo_view(RequestFactory().get(photo_url(variant)), variant)
+        response.close()
+        self.assertEqual(response.status_code, 200)
+        with Image.open(photo_store.path(variant)) as image:
+            self.assertEqual(image.format, "JPEG")
+            self.assertEqual(image.size, (8, 4))
+
+        modified = os.path.getmtime(photo_store.path(variant))
+        self.assertTrue(photo_store.render_variant(variant))
+        self.assertEqual(os.path.getmtime(photo_store.path(variant)), modified)
+
+    def test_unknown_variant(self):
+        name = photo_store.save(PNG)
+        variant = photo_store.variant_name(name, 'huge', 'webp')
+
+        with self.assertRaises(Http404):
+            photo_view(RequestFactory().get(photo_url(variant)), variant)
+
+    def test_variant_failure_logged(self):
+        future = Future()
+        future.set_exception(OSError("disk full"))
+
+        with self.assertLogs('gur.services.photos', 'ERROR') as logs:
+            log_variant_failure('photo.png', future)
+
+        self.assertIn('photo.png', logs.output[0])
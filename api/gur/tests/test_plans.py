@@ -0,0 +1,74 @@
+from unittest import skipUnless
+
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+
+from ..perf.plans import (
+    HOT_QUERIES, SNAPSHOT_CITY, SNAPSHOT_DIR, Sample, check_plan, explain, render_plan
+)
+from ..services.city import CityGenerator
+
+
+def scan(node_type, relation, **fields):
+    return {"Node Type": node_type, "Relation Name": relation, **fields}
+
+
+class PlanCheckTests(SimpleTestCase):
+
+    def test_seq_scan_of_history_tables(self):
+        plan = {
+            "Node Type": "Hash Join",
+            "Join Type": "Inner",
+            "Plans": [
+                scan("Seq Scan", "gur_order"),
+                scan("Seq Scan", "gur_orderstatus"),
+            ],
+        }
+
+        self.assertEqual(check_plan(plan), ["Seq Scan on gur_orderstatus"])
+
+    def test_spatial_filter_needs_an_index(self):
+        bitmap = scan("Bitmap Heap Scan", "gur_restaurant", Plans=[
+            {"Node Type": "Bitmap Index Scan", "Index Name": "gur_restaurant_delivery_zone_id"},
+        ])
+
+        self.assertEqual(check_plan(bitmap, spatial="gur_restaurant"), [])
+        self.assertEqual(
+            check_plan(scan("Seq Scan", "gur_restaurant"), spatial="gur_restaurant"),
+            ["No index used for the spatial filter on gur_restaurant"],
+        )
+
+    def test_render_leaves_out_estimates(self):
+        plan = scan("Index Scan", "gur_order", **{
+            "Index Name": "gur_order_pkey", "Total Cost": 8.3, "Plan Rows": 1,
+        })
+
+        self.assertEqual(render_plan(plan), ["Index Scan using gur_order_pkey on gur_order"])
+
+
+@skipUnless(connection.vendor == 'postgresql' and 'postgis' in connection.settings_dict['ENGINE'],
+            'the plans are PostGIS plans')
+class HotQueryPlanTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        CityGenerator(**SNAPSHOT_CITY).generate()
+
+    def test_hot_queries_use_indexes(self):
+        sample = Sample()
+        for name, (build, spatial) in HOT_QUERIES.items():
+            with self.subTest(name):
+                # the city is small enough for sequential scans to be
+                # cheapest, so only index availability is checked
+                plan = explain(build(sample), seqscan=False)
+                self.assertEqual(check_plan(plan, spatial), [], "\n".join(render_plan(plan)))
+
+    def test_hot_queries_match_snapshots(self):
+        sample = Sample()
+        for name, (build, _) in HOT_QUERIES.items():
+            with self.subTest(name):
+                path = SNAPSHOT_DIR / f"{name}.txt"
+                if not path.exists():
+                    self.skipTest(f"No snapshot of {name}, take it with explain_hot_queries --no-seqscan --update")
+                plan = explain(build(sample), seqscan=False)
+                self.assertEqual(render_plan(plan), path.read_text().splitlines())
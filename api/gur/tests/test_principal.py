@@ -0,0 +1,109 @@
+from django.contrib.auth.models import Permission
+from django.core.cache import cache
+from django.utils import timezone
+from django.test import TestCase
+
+from ..models import CustomUser, UserAccount, CourierAccount, RestaurantAdmin
+from ..services.principal import claims_epoch_cache_key, get_claims_epoch, get_principal
+
+
+class PrincipalTests(TestCase):
+    fixtures = ['restaurant_dishes.json']
+
+    def setUp(self):
+        cache.clear()
+        self.user = CustomUser.objects.create_user(email='bla@gmail.com', password='password')
+        self.user_account = UserAccount.objects.create(user=self.user)
+
+    def get_principal(self):
+        # a fresh user object, as every request gets
+        return get_principal(CustomUser.objects.get(id=self.user.id))
+
+    def test_principal_roles(self):
+        RestaurantAdmin.objects.create(rest_id=2, user_account=self.user_account)
+        courier_account = CourierAccount.objects.create(user=self.user)
+
+        principal = self.get_principal()
+
+        self.assertEqual(principal.user_account_id, self.user_account.id)
+        self.assertEqual(principal.courier_account_id, courier_account.id)
+        self.assertTrue(principal.is_restaurant_admin(2))
+        self.assertFalse(principal.is_restaurant_admin(1))
+
+    def test_principal_is_cached(self):
+        self.get_principal()
+        user = CustomUser.objects.get(id=self.user.id)
+
+        with self.assertNumQueries(0):
+            principal = get_principal(user)
+            self.assertIs(get_principal(user), principal)
+
+    def test_principal_invalidated_on_role_change(self):
+        self.assertFalse(self.get_principal().is_courier)
+        self.assertFalse(self.get_principal().is_partial_admin)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            CourierAccount.objects.create(user=self.user)
+            RestaurantAdmin.objects.create(rest_id=1, user_account=self.user_account)
+
+        self.assertTrue(self.get_principal().is_courier)
+        self.assertTrue(self.get_principal().is_restaurant_admin(1))
+
+    def test_principal_invalidated_on_permission_change(self):
+        self.assertFalse(self.get_principal().has_perms(['gur.add_dish']))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.user_permissions.add(Permission.objects.get(codename='add_dish'))
+
+        self.assertTrue(self.get_principal().has_perms(['gur.add_dish']))
+
+    def test_claims_epoch_changes_on_role_change(self):
+        epoch = get_claims_epoch(self.user.id)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            CourierAccount.objects.create(user=self.user)
+
+        self.assertNotEqual(get_claims_epoch(self.user.id), epoch)
+
+    def test_claims_epoch_is_read_from_database(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            CourierAccount.objects.create(user=self.user)
+        epoch = get_claims_epoch(self.user.id)
+        # a restarted worker
+        cache.clear()
+
+        self.assertEqual(get_claims_epoch(self.user.id), epoch)
+        self.assertIsNone(get_claims_epoch(self.user.id + 1))
+
+    def test_claims_epoch_forgotten_after_commit(self):
+        key = claims_epoch_cache_key(self.user.id)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            CourierAccount.objects.create(user=self.user)
+            # cached by a concurrent request before the commit
+            cache.set(key, 0)
+
+        self.assertIsNone(cache.get(key))
+
+    def test_claims_epoch_changes_on_claim_field_change(self):
+        epoch = get_claims_epoch(self.user.id)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.is_staff = True
+            self.user.save()
+
+        self.assertNotEqual(get_claims_epoch(self.user.id), epoch)
+
+    def test_claims_epoch_kept_on_other_user_changes(self):
+        claims_changed_at = CustomUser.objects.get(id=self.user.id).claims_changed_at
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.last_login = timezone.now()
+            self.user.save(update_fields=["last_login"])
+            # the instance predates the epoch of the account created in setUp
+            self.user.email = "bla2@gmail.com"
+            self.user.save()
+
+        self.assertEqual(
+            CustomUser.objects.get(id=self.user.id).claims_changed_at, claims_changed_at
+        )
@@ -0,0 +1,246 @@
+from django.contrib.gis.geos import Point
+from django.core.cache import cache
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+
+from ..models import (
+    CustomUser, UserAccount, CourierAccount, CourierLocation, Restaurant,
+    RestaurantAdmin, Dish, Order, OrderDish, OrderStatus
+)
+from ..perf.testing import QueryBudgetMixin
+
+LONGITUDE, LATITUDE = 30.591165, 50.444627
+LOCATION = {'longitude': str(LONGITUDE), 'latitude': str(LATITUDE)}
+
+
+def point():
+    return Point(LONGITUDE, LATITUDE, srid=4326)
+
+
+class QueryBudgetTests(QueryBudgetMixin, APITestCase):
+    budgets = {
+        'restaurants': 6,
+        'restaurants-admin': 10,
+        'restaurant-dishes': 8,
+        'restaurant-dishes-exact': 6,
+        'orders-retrieve': 8,
+        'orders-create': 18,
+        'orders-recreate': 18,
+        'user-orders': 4,
+        'user-orders-key': 7,
+        'order-dish-create': 12,
+        'order-dish-detail': 12,
+        'order-dish-clear': 6,
+        'order-statuses': 5,
+        'register': 8,
+        'user-profile': 8,
+        'courier-profile': 8,
+        'courier-current-order': 10,
+        'courier-free-order-update': 16,
+        'courier-free-orders': 10,
+        'courier-location': 10,
+        'courier-orders': 8,
+        'courier-orders-key': 10,
+        'token_obtain_pair': 8,
+        'token_refresh': 8,
+    }
+
+    def setUp(self):
+        cache.clear()
+        self.password = 'password'
+
+        admin = CustomUser.objects.create_superuser(email='admin@gmail.com', password=self.password)
+        admin_account = UserAccount.objects.create(user=admin)
+        self.admin_header = self.get_header_for_user(admin)
+
+        self.user = CustomUser.objects.create_user(email='user@gmail.com', password=self.password)
+        self.user_account = UserAccount.objects.create(user=self.user)
+        self.header = self.get_header_for_user(self.user)
+
+        courier = CustomUser.objects.create_user(email='courier@gmail.com', password=self.password)
+        self.courier_account = CourierAccount.objects.create(user=courier)
+        self.courier_header = self.get_header_for_user(courier)
+
+        idle_courier = CustomUser.objects.create_user(email='idle@gmail.com', password=self.password)
+        CourierAccount.objects.create(user=idle_courier)
+        self.idle_courier_header = self.get_header_for_user(idle_courier)
+
+        self.restaurant = Restaurant.objects.create(
+            name="Budget", rest_address="Budget address", location=point()
+        )
+        RestaurantAdmin.objects.create(rest=self.restaurant, user_account=admin_account)
+        self.spare_dish = Dish.objects.create(
+            restaurant=self.restaurant, name="Spare", price=100, gramme=100
+        )
+
+        self.open_order = self.create_order([OrderStatus.OPEN])
+        self.previous_order = self.create_order(
+            [OrderStatus.OPEN, OrderStatus.PREPARING, OrderStatus.DELIVERED]
+        )
+        self.delivering_order = self.create_order(
+            [OrderStatus.OPEN, OrderStatus.PREPARING, OrderStatus.DELIVERING],
+            courier=self.courier_account
+        )
+        self.free_order = self.create_order([OrderStatus.OPEN, OrderStatus.PREPARING])
+        self.dishes = []
+        self.size = 0
+
+    def get_header_for_user(self, user):
+        token = AccessToken.for_user(user)
+        return {'HTTP_AUTHORIZATION': f'Bearer {token}'}
+
+    def create_order(self, statuses, **fields):
+        order = Order.objects.create(user=self.user_account, delivery_location=point(), **fields)
+        for order_status in statuses:
+            OrderStatus.objects.create(order=order, status=order_status)
+        return order
+
+    def bulk_create_orders(self, count, statuses, **fields):
+        orders = Order.objects.bulk_create([
+            Order(user=self.user_account, delivery_location=point(), **fields)
+            for _ in range(count)
+        ])
+        OrderStatus.objects.bulk_create([
+            OrderStatus(order=order, status=order_status)
+            for order in orders for order_status in statuses
+        ])
+
+    def grow_to(self, size):
+        count = size - self.size
+        self.size = size
+
+        Restaurant.objects.bulk_create([
+            Restaurant(name=f"Restaurant {i}", rest_address="Address", location=point())
+            for i in range(count)
+        ])
+        Restaurant.objects.fill_default_delivery_zones()
+
+        dishes = Dish.objects.bulk_create([
+            Dish(restaurant=self.restaurant, name=f"Dish {i}", price=100, gramme=100)
+            for i in range(count)
+        ])
+        self.dishes.extend(dishes)
+        OrderDish.objects.bulk_create([
+            OrderDish(order=order, dish=dish, quantity=2)
+            for order in (self.open_order, self.previous_order, self.delivering_order)
+            for dish in dishes
+        ])
+
+        self.bulk_create_orders(count, [OrderStatus.OPEN, OrderStatus.DELIVERED])
+        self.bulk_create_orders(
+            count,
+            [OrderStatus.OPEN, OrderStatus.PREPARING, OrderStatus.DELIVERING, OrderStatus.DELIVERED],
+            courier=self.courier_account
+        )
+        self.bulk_create_orders(count, [OrderStatus.OPEN, OrderStatus.PREPARING])
+        CourierLocation.objects.bulk_create([
+            CourierLocation(courier=self.courier_account, location=point())
+            for _ in range(count)
+        ])
+
+    def request_restaurants(self):
+        return self.client.get(reverse('restaurants'), **self.admin_header, format='json')
+
+    def request_restaurants_admin(self):
+        url = reverse('restaurants-admin', kwargs={'pk': self.restaurant.id})
+        return self.client.patch(url, {'name': "Renamed"}, **self.admin_header, format='json')
+
+    def request_restaurant_dishes(self):
+        url = reverse('restaurant-dishes', kwargs={'pk': self.restaurant.id})
+        return self.client.get(url, **self.header, format='json')
+
+    def request_restaurant_dishes_exact(self):
+        url = reverse('restaurant-dishes-exact', kwargs={
+            'restaurant_id': self.restaurant.id, 'pk': self.spare_dish.id
+        })
+        return self.client.get(url, **self.admin_header, format='json')
+
+    def request_orders_retrieve(self):
+        return self.client.get(reverse('orders-retrieve'), **self.header, format='json')
+
+    def request_orders_create(self):
+        url = reverse('orders-create', kwargs={'pk': self.open_order.id})
+        return self.client.patch(url, {
+            'delivery_address': "Budget street",
+            'delivery_location': LOCATION,
+        }, **self.header, format='json')
+
+    def request_orders_recreate(self):
+        url = reverse('orders-recreate', kwargs={'pk': self.previous_order.id})
+        return self.client.post(url, **self.header, format='json')
+
+    def request_user_orders(self):
+        return self.client.get(reverse('user-orders'), **self.header, format='json')
+
+    def request_user_orders_key(self):
+        url = reverse('user-orders-key', kwargs={'pk': self.delivering_order.id})
+        return self.client.get(url, **self.header, format='json')
+
+    def request_order_dish_create(self):
+        return self.client.post(reverse('order-dish-create'), {
+            'order': self.open_order.id,
+            'dish': self.spare_dish.id,
+            'quantity': 1,
+        }, **self.header, format='json')
+
+    def request_order_dish_detail(self):
+        url = reverse('order-dish-detail', kwargs={'pk': self.open_order.id})
+        return self.client.patch(url, {
+            'dish': self.dishes[0].id,
+            'quantity': 3,
+        }, **self.header, format='json')
+
+    def request_order_dish_clear(self):
+        url = reverse('order-dish-clear', kwargs={'pk': self.open_order.id})
+        return self.client.delete(url, **self.header, format='json')
+
+    def request_order_statuses(self):
+        url = reverse('order-statuses', kwargs={'order_id': self.delivering_order.id})
+        return self.client.get(url, **self.header, format='json')
+
+    def request_register(self):
+        return self.client.post(reverse('register'), {
+            'email': 'new@gmail.com',
+            'password': self.password,
+        }, format='json')
+
+    def request_user_profile(self):
+        return self.client.get(reverse('user-profile'), **self.header, format='json')
+
+    def request_courier_profile(self):
+        return self.client.get(reverse('courier-profile'), **self.courier_header, format='json')
+
+    def request_courier_current_order(self):
+        return self.client.get(reverse('courier-current-order'), **self.courier_header, format='json')
+
+    def request_courier_free_order_update(self):
+        url = reverse('courier-free-order-update', kwargs={'pk': self.free_order.id})
+        return self.client.put(url, {
+            'courier_location': LOCATION,
+        }, **self.idle_courier_header, format='json')
+
+    def request_courier_free_orders(self):
+        return self.client.get(reverse('courier-free-orders'), **self.courier_header, format='json')
+
+    def request_courier_location(self):
+        url = reverse('courier-location', kwargs={'order_id': self.delivering_order.id})
+        return self.client.post(url, {'location': LOCATION}, **self.courier_header, format='json')
+
+    def request_courier_orders(self):
+        return self.client.get(reverse('courier-orders'), **self.courier_header, format='json')
+
+    def request_courier_orders_key(self):
+        url = reverse('courier-orders-key', kwargs={'pk': self.delivering_order.id})
+        return self.client.get(url, **self.courier_header, format='json')
+
+    def request_token_obtain_pair(self):
+        return self.client.post(reverse('token_obtain_pair'), {
+            'email': self.user.email,
+            'password': self.password,
+        }, format='json')
+
+    def request_token_refresh(self):
+        return self.client.post(reverse('token_refresh'), {
+            'refresh': str(RefreshToken.for_user(self.user)),
+        }, format='json')
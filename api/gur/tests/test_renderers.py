@@ -0,0 +1,107 @@
+import datetime
+import io
+import uuid
+from collections import OrderedDict
+from decimal import Decimal
+
+from django.contrib.gis.geos import Point
+from django.test import SimpleTestCase
+from django.utils import timezone
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.serializer_helpers import ReturnDict, ReturnList
+
+from ..parsers import ORJSONParser
+from ..renderers import ORJSONRenderer
+
+PAYLOADS = [
+    None,
+    {},
+    [],
+    "Наливка \"Груша\"",
+    {"id": 1, "name": "Борщ", "price": 3200, "gramme": 130, "dish_photo": None},
+    [{"latitude": 50.4625135, "longitude": 30.5967171}, {"latitude": -0.5, "longitude": 179.999999}],
+    {"created_at": datetime.datetime(2021, 5, 29, 20, 51, 56, tzinfo=datetime.timezone.utc)},
+    {"created_at": datetime.datetime(2021, 5, 29, 20, 51, 56, 455123, tzinfo=datetime.timezone.utc)},
+    {"created_at": timezone.localtime(datetime.datetime(2021, 5, 29, 20, 51, tzinfo=datetime.timezone.utc))},
+    {"naive": datetime.datetime(2021, 5, 29, 20, 51, 56, 1000)},
+    {"date": datetime.date(2021, 5, 29), "open_from": datetime.time(9, 30), "at": datetime.time(9, 30, 0, 5)},
+    {"duration": datetime.timedelta(minutes=5, microseconds=3)},
+    {"summary": Decimal("56.10"), "id": uuid.UUID("12345678-1234-5678-1234-567812345678")},
+    {"message": gettext_lazy("Not found.")},
+    {"separators": "a b c", "escapes": "\"\\/\n\t\x00\x1f"},
+    {1: "int key", "nested": {"list": [1, 2.5, True, False, None, (3, 4)]}},
+    ReturnDict(OrderedDict([("b", 1), ("a", 2)]), serializer=None),
+    ReturnList([OrderedDict([("quantity", 2), ("id", 3)])], serializer=None),
+    {"big": 2 ** 63 - 1, "negative": -2 ** 63, "float": 0.1 + 0.2, "small": 0.001},
+]
+
+
+class ORJSONRendererTests(SimpleTestCase):
+
+    def test_same_bytes_as_json_renderer(self):
+        for payload in PAYLOADS:
+            with self.subTest(payload=payload):
+                self.assertEqual(
+                    ORJSONRenderer().render(payload),
+                    JSONRenderer().render(payload)
+                )
+
+    def test_huge_integers_fall_back(self):
+        payload = {"huge": 2 ** 70}
+
+        self.assertEqual(ORJSONRenderer().render(payload), JSONRenderer().render(payload))
+
+    def test_non_finite_floats_raise(self):
+        for value in (float("nan"), float("inf"), -float("inf")):
+            with self.subTest(value=value):
+                with self.assertRaises(ValueError):
+                    ORJSONRenderer().render({"nested": [{"price": value}]})
+
+    def test_indent_falls_back(self):
+        payload = {"id": 1, "dishes": [1, 2]}
+
+        self.assertEqual(
+            ORJSONRenderer().render(payload, 'application/json; indent=4'),
+            JSONRenderer().render(payload, 'application/json; indent=4')
+        )
+
+    def test_point(self):
+        self.assertEqual(
+            ORJSONRenderer().render({"location": Point(30.5, 50.4, srid=4326)}),
+            b'{"location":{"latitude":50.4,"longitude":30.5}}'
+        )
+
+
+class ORJSONParserTests(SimpleTestCase):
+
+    def parse(self, parser, content):
+        return parser.parse(io.BytesIO(content), parser_context={})
+
+    def test_same_data_as_json_parser(self):
+        for payload in PAYLOADS:
+            content = JSONRenderer().render(payload)
+            if not content:
+                continue
+            with self.subTest(content=content):
+                self.assertEqual(
+                    self.parse(ORJSONParser(), content),
+                    self.parse(JSONParser(), content)
+                )
+
+    def test_huge_integers_stay_exact(self):
+        content = b'{"id": 18446744073709551616, "ids": [-9223372036854775809, 1.5e300]}'
+
+        data = self.parse(ORJSONParser(), content)
+
+        self.assertEqual(data, self.parse(JSONParser(), content))
+        self.assertIsInstance(data["id"], int)
+        self.assertIsInstance(data["ids"][0], int)
+
+    def test_invalid(self):
+        for content in (b'{"id": 1', b'{"price": NaN}', b'\xff'):
+            with self.subTest(content=content):
+                with self.assertRaises(ParseError):
+                    self.parse(ORJSONParser(), content)
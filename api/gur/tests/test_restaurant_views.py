@@ -54,6 +54,26 @@ class RestaurantViewTests(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK, response.content)
         self.assertEqual(len(response.data), 1, response.data)
 
+    def test_get_restaurants_without_photos_by_default(self):
+        url = reverse('restaurants')
+
+        response = self.client.get(url, **self.admin_header, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.content)
+        self.assertNotIn('rest_photo', response.data[0], response.data)
+        self.assertIn('is_open', response.data[0], response.data)
+
+    def test_get_restaurants_sparse_fields(self):
+        url = reverse('restaurants')
+
+        response = self.client.get(f"{url}?fields=id,name,rest_photo", **self.admin_header, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.content)
+        self.assertEqual(list(response.data[0]), ['id', 'name', 'rest_photo'], response.data)
+
+        response = self.client.get(f"{url}?fields=id,secret", **self.admin_header, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, response.content)
+
     def test_create_restaurants_non_admin(self):
         url = reverse('restaurants')
 
@@ -90,6 +110,37 @@ class RestaurantViewTests(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK, response.content)
         self.assertEqual(response.data['id'], 1, response.content)
 
+    def test_update_restaurant_delivery_zone(self):
+        url = reverse('restaurants-admin', kwargs={"pk": 2})
+
+        response = self.client.patch(url, {
+            "delivery_zone": {
+                "type": "Polygon",
+                "coordinates": [[
+                    [29.20, 50.40], [29.30, 50.40], [29.30, 50.50],
+                    [29.20, 50.50], [29.20, 50.40]
+                ]]
+            }
+        }, **self.admin_header, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.content)
+
+        near_url = reverse('restaurants')
+        response = self.client.get(f"{near_url}?longitude=29.2967171&latitude=50.4595135",
+                                   **self.header, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.content)
+        self.assertEqual([restaurant['id'] for restaurant in response.data], [2], response.data)
+
+    def test_update_restaurant_invalid_delivery_zone(self):
+        url = reverse('restaurants-admin', kwargs={"pk": 2})
+
+        response = self.client.patch(url, {
+            "delivery_zone": {"type": "Point", "coordinates": [29.20, 50.40]}
+        }, **self.admin_header, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, response.content)
+        self.assertIn("delivery_zone", response.data)
+
     def test_update_restaurants_non_admin(self):
         url = reverse('restaurants-admin', kwargs={"pk": 1})
 
@@ -0,0 +1,153 @@
+from unittest import skipUnless
+
+import jwt
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.tokens import AccessToken
+
+from ..models import CustomUser, Order, OrderStatus
+from ..routers import ReplicaRouter, ReplicaRoutingMiddleware, check_shared_cache, use_primary
+
+
+def replica_view(request):
+    return HttpResponse()
+
+
+replica_view.replica_reads = True
+
+
+def primary_view(request):
+    return HttpResponse()
+
+
+@override_settings(REPLICA_DATABASES=['replica'])
+class ReplicaRouterTests(SimpleTestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.router = ReplicaRouter()
+
+    def route(self, method, view, write=False, token=None):
+        """
+        Databases the router picks for a read, and for a read after a write,
+        within a request to the view, sent with the token if given.
+        """
+        headers = {} if token is None else {'HTTP_AUTHORIZATION': f'Bearer {token}'}
+        request = getattr(RequestFactory(), method)('/', **headers)
+        databases = []
+
+        def get_response(request):
+            middleware.process_view(request, view, (), {})
+            if write and token is not None:
+                # as the view's authentication does
+                request.user = TokenUser(token)
+            databases.append(self.router.db_for_read(Order))
+            if write:
+                self.router.db_for_write(Order)
+                databases.append(self.router.db_for_read(Order))
+            return view(request)
+
+        middleware = ReplicaRoutingMiddleware(get_response)
+        middleware(request)
+        return databases
+
+    def token(self, user_id):
+        return AccessToken.for_user(CustomUser(id=user_id))
+
+    def test_safe_request_reads_from_replica(self):
+        self.assertEqual(self.route('get', replica_view), ['replica'])
+
+    def test_unsafe_request_reads_from_primary(self):
+        self.assertEqual(self.route('post', replica_view), [None])
+
+    def test_view_without_replica_reads_reads_from_primary(self):
+        self.assertEqual(self.route('get', primary_view), [None])
+
+    def test_reads_after_write_go_to_primary(self):
+        self.assertEqual(self.route('get', replica_view, write=True), ['replica', None])
+
+    def test_user_reads_own_writes(self):
+        self.route('post', primary_view, write=True, token=self.token(1))
+
+        self.assertEqual(self.route('get', replica_view, token=self.token(1)), [None])
+        self.assertEqual(self.route('get', replica_view, token=self.token(2)), ['replica'])
+        self.assertEqual(self.route('get', replica_view), ['replica'])
+
+    def test_forged_token_is_not_pinned(self):
+        self.route('post', primary_view, write=True, token=self.token(1))
+        forged = jwt.encode(self.token(1).payload, 'forged' * 8, algorithm='HS256')
+
+        self.assertEqual(self.route('get', replica_view, token=forged), ['replica'])
+
+    def test_no_pin_without_replicas(self):
+        with self.settings(REPLICA_DATABASES=[]):
+            self.route('post', primary_view, write=True, token=self.token(1))
+
+        self.assertEqual(self.route('get', replica_view, token=self.token(1)), ['replica'])
+
+    def test_replicas_need_shared_cache(self):
+        self.assertEqual([error.id for error in check_shared_cache(None)], ['gur.E001'])
+
+        redis = {'default': {'BACKEND': 'django.core.cache.backends.redis.RedisCache'}}
+        with self.settings(CACHES=redis):
+            self.assertEqual(check_shared_cache(None), [])
+        with self.settings(REPLICA_DATABASES=[]):
+            self.assertEqual(check_shared_cache(None), [])
+
+    def test_use_primary(self):
+        request = RequestFactory().get('/')
+        databases = []
+
+        def get_response(request):
+            middleware.process_view(request, replica_view, (), {})
+            with use_primary():
+                databases.append(self.router.db_for_read(Order))
+            databases.append(self.router.db_for_read(Order))
+            return HttpResponse()
+
+        middleware = ReplicaRoutingMiddleware(get_response)
+        middleware(request)
+
+        self.assertEqual(databases, [None, 'replica'])
+
+    def test_writes_go_to_primary(self):
+        self.assertEqual(self.router.db_for_write(Order), 'default')
+
+
+@skipUnless('replica' in settings.DATABASES, 'GUR_REPLICA_NAME is not set')
+@override_settings(REPLICA_DATABASES=['replica'])
+class ReplicaDatabaseTests(APITestCase):
+    """
+    Runs against two local databases, the replica never receiving the rows
+    written by the test, like a replica lagging behind.
+    """
+    databases = {'default', 'replica'}
+    fixtures = ['restaurant_dishes.json', 'orders.json']
+
+    def setUp(self):
+        cache.clear()
+        user = CustomUser.objects.get(id=2)
+        self.header = {'HTTP_AUTHORIZATION': f'Bearer {AccessToken.for_user(user)}'}
+        # on the primary only
+        OrderStatus.objects.create(order_id=3, status=OrderStatus.PREPARING)
+
+    def test_user_reads_own_writes_from_primary(self):
+        url = reverse('user-orders')
+
+        response = self.client.get(url, **self.header, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.content)
+        self.assertEqual(response.data, [])
+
+        # creates a new open order
+        self.client.get(reverse('orders-retrieve'), **self.header, format='json')
+        response = self.client.get(url, **self.header, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.content)
+        self.assertEqual([order['id'] for order in response.data], [3])
@@ -0,0 +1,47 @@
+from django.test import SimpleTestCase
+
+from ..consumers.wire import encode_compact, decode_compact
+
+
+class CompactWireFormatTests(SimpleTestCase):
+
+    def test_location_is_fixed_point(self):
+        frame = decode_compact(encode_compact('event.location', {
+            'latitude': 50.4595135,
+            'longitude': 30.5967171
+        }))
+
+        self.assertEqual(frame, {'t': 'l', 'c': [50459514, 30596717]})
+
+    def test_new_order_drops_photos(self):
+        content = {
+            'id': 3,
+            'user': {'first_name': 'Максим', 'tel_num': '380957744711'},
+            'created_at': '2021-06-05 13:27:24',
+            'summary': 5600,
+            'order_details': '',
+            'delivery_address': 'вулиця Челябінська, Київ',
+            'delivery_location': {'latitude': 50.4595135, 'longitude': 30.5967171},
+            'restaurant': {
+                'name': 'Banka',
+                'rest_address': 'Київ',
+                'location': {'latitude': 50.45, 'longitude': 30.52}
+            },
+            'dishes': [{
+                'quantity': 2, 'id': 1, 'restaurant': 1, 'name': 'Наливка',
+                'description': '', 'price': 2800, 'gramme': 130,
+                'dish_photo': 'data:image/jpeg;base64,' + 'A' * 4096
+            }],
+        }
+        encoded = encode_compact('event.neworder', content)
+        frame = decode_compact(encoded)
+
+        self.assertEqual(frame['t'], 'n')
+        self.assertEqual(frame['c']['i'], 3)
+        self.assertEqual(frame['c']['x'], [[1, 2, 'Наливка', 2800, 130]])
+        self.assertLess(len(encoded), 300)
+
+    def test_other_events_pass_through(self):
+        frame = decode_compact(encode_compact('event.ordertaken', 3))
+
+        self.assertEqual(frame, {'t': 't', 'c': 3})
@@ -1,9 +1,9 @@
 from django.urls import re_path
-from rest_framework_simplejwt import views as jwt_views
 
 from .views.account import (
     UserRegistrationApiView, UserAccountApiView,
-    CourierAccountApiView
+    CourierAccountApiView, TokenObtainPairApiView,
+    TokenRefreshApiView
 )
 from .views.courier import (
     CourierCurrentOrderApiView, CourierFreeOrderListApiView,
@@ -131,6 +131,6 @@ urlpatterns = [
     ),
 
     # Token
-    re_path(r'token$', jwt_views.TokenObtainPairView.as_view(), name='token_obtain_pair'),
-    re_path(r'token/refresh$', jwt_views.TokenRefreshView.as_view(), name='token_refresh'),
+    re_path(r'token$', TokenObtainPairApiView.as_view(), name='token_obtain_pair'),
+    re_path(r'token/refresh$', TokenRefreshApiView.as_view(), name='token_refresh'),
 ]
@@ -1,17 +1,21 @@
 from django.contrib.auth import get_user_model
 
+from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
+
 from ..serializers.user import (
     UserAccountSerializer,
-    CourierAccountSerializer, UserSerializer
+    CourierAccountSerializer, UserSerializer,
+    ClaimsTokenObtainPairSerializer, ClaimsTokenRefreshSerializer
 )
-from ..models import (
-    UserAccount,
-    CourierAccount
+from ..services.account import (
+    USER_PROFILE, COURIER_PROFILE, get_profile_payload,
+    get_user_account, get_or_create_courier_account
 )
 from rest_framework.generics import (
     RetrieveUpdateAPIView, CreateAPIView
 )
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
 
 User = get_user_model()
 
@@ -21,12 +25,10 @@ class UserAccountApiView(RetrieveUpdateAPIView):
     permission_classes = [IsAuthenticated]
 
     def get_object(self):
-        instance, _ = UserAccount.objects.select_related(
-            "user"
-        ).prefetch_related("restaurant_admins").get_or_create(
-            user=self.request.user
-        )
-        return instance
+        return get_user_account(self.request.user)
+
+    def retrieve(self, request, *args, **kwargs):
+        return Response(get_profile_payload(USER_PROFILE, request.user))
 
 
 class CourierAccountApiView(RetrieveUpdateAPIView):
@@ -34,12 +36,21 @@ class CourierAccountApiView(RetrieveUpdateAPIView):
     permission_classes = [IsAuthenticated]
 
     def get_object(self):
-        instance, _ = CourierAccount.objects.get_or_create(
-            user=self.request.user
-        )
-        return instance
+        # only updates reach here, they make the user a courier
+        return get_or_create_courier_account(self.request.user)
+
+    def retrieve(self, request, *args, **kwargs):
+        return Response(get_profile_payload(COURIER_PROFILE, request.user))
 
 
 class UserRegistrationApiView(CreateAPIView):
     queryset = User.objects.all()
     serializer_class = UserSerializer
+
+
+class TokenObtainPairApiView(TokenObtainPairView):
+    serializer_class = ClaimsTokenObtainPairSerializer
+
+
+class TokenRefreshApiView(TokenRefreshView):
+    serializer_class = ClaimsTokenRefreshSerializer
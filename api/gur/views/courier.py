@@ -1,14 +1,24 @@
-import json
-from datetime import datetime
-from asgiref.sync import async_to_sync
-from channels.layers import get_channel_layer
-from django.db.models import F, Prefetch
+from django.conf import settings
+from django.contrib.gis.measure import D
+from django.db.models import Q, Prefetch, Exists, OuterRef, ExpressionWrapper, BooleanField
 from django.db.transaction import atomic
+from django.http import Http404
+from django.utils.functional import cached_property
 from rest_framework.generics import RetrieveAPIView, ListAPIView, UpdateAPIView, CreateAPIView, get_object_or_404
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
 
-from ..models import Order, Dish, OrderStatus, CourierAccount
+from ..models import Order, OrderDish, OrderStatus, CourierAccount
 from ..permissions import IsCourier
 from ..serializers.courier import CourierLocationSerializer, CourierFreeOrderUpdateSerializer
+from ..services.board import free_order_board
+from ..services.courier import get_courier_order_payloads
+from ..services.events import group_send
+from ..services.geo import project_point
+from ..services.order import send_order_status_update
+from ..services.principal import get_principal
+from .fieldsets import SparseFieldsetMixin
+from ..serializers.fast import OrderHistoryValuesSerializer
 from ..serializers.order import (
     CourierOrderDetailSerializer,
     OrderWithFirstStatusSerializer,
@@ -21,76 +31,143 @@ class CourierCurrentOrderApiView(RetrieveAPIView):
 
     def get_object(self):
         queryset = Order.objects.filter(
-            courier__user=self.request.user,
+            courier__user_id=self.request.user.id,
             statuses__status="D"
         ).exclude(
             statuses__status__in=OrderStatus.FINISHED_STATUSES
         ).prefetch_related(
             Prefetch(
-                "order_dishes__dish",
-                queryset=Dish.objects.annotate(
-                    quantity=F('order_dishes__quantity')
-                ),
-                to_attr="order_dishes"
+                "order_dishes",
+                queryset=OrderDish.objects.select_related(
+                    "dish"
+                )
             ),
         )
         return get_object_or_404(queryset)
 
 
-class CourierFreeOrderListApiView(ListAPIView):
+class CourierFreeOrderListApiView(SparseFieldsetMixin, ListAPIView):
     serializer_class = CourierOrderDetailSerializer
     permission_classes = [IsCourier]
 
     def get_queryset(self):
+        # orders without a location can't be claimed, and the predicate
+        # matches gur_order_awaiting_courier_idx
         return Order.objects.filter(
             courier__isnull=True,
+            delivery_location__isnull=False,
             statuses__status="P"
         ).exclude(
             statuses__status__in=OrderStatus.FINISHED_STATUSES
         )
 
+    def list(self, request, *args, **kwargs):
+        longitude = request.query_params.get('longitude', None)
+        latitude = request.query_params.get('latitude', None)
+        if longitude is not None and latitude is not None:
+            try:
+                longitude, latitude = float(longitude), float(latitude)
+                distance = float(request.query_params.get(
+                    'distance', settings.POSSIBLE_COURIER_DISTANCE
+                ))
+            except ValueError:
+                raise ValidationError("Invalid location")
+            orders = free_order_board.nearest(
+                latitude=latitude,
+                longitude=longitude,
+                distance=min(distance, settings.POSSIBLE_COURIER_DISTANCE)
+            )
+        else:
+            orders = self.get_queryset().only("id", "version")
+        return Response(self.select_fields(get_courier_order_payloads(orders)))
+
 
 class CourierUpdateFreeOrderApiView(UpdateAPIView):
     permission_classes = [IsCourier]
     serializer_class = CourierFreeOrderUpdateSerializer
 
+    @cached_property
+    def courier_id(self):
+        return get_principal(self.request.user).courier_account_id
+
     def get_queryset(self):
+        # orders waiting for a courier
         return Order.objects.filter(
-            statuses__status=OrderStatus.PREPARING
-        ).exclude(
-            statuses__status__in=OrderStatus.FINISHED_STATUSES
-        ).prefetch_related("statuses")
-
-    def get_serializer_context(self):
-        context = super().get_serializer_context()
-        context["courier"] = CourierAccount.objects.prefetch_related(
-            "orders"
-        ).get(user=self.request.user)
-        return context
+            Exists(OrderStatus.objects.filter(
+                order=OuterRef("pk"),
+                status=OrderStatus.PREPARING
+            )),
+            ~Exists(OrderStatus.objects.filter(
+                order=OuterRef("pk"),
+                status__in=OrderStatus.FINISHED_STATUSES
+            ))
+        )
 
-    @atomic
-    def perform_update(self, serializer):
-        instance = serializer.save()
-        order_status = OrderStatus.objects.create(order=instance, status="D")
-        channel_layer = get_channel_layer()
-        async_to_sync(channel_layer.group_send)(
-            f"order_{instance.order_id}",
-            {
-                'type': 'event.orderstatus',
-                'content': json.dumps({
-                    "status": order_status.status,
-                    "timestamp": datetime.fromtimestamp(
-                        order_status.created_at.created_at()
-                    ).strftime('%Y-%m-%d %H:%M:%S')
-                }, indent=4, default=str)
-            }
+    def get_claim_conditions(self, courier_location):
+        active_orders = Order.objects.filter(courier_id=self.courier_id).filter(
+            ~Exists(OrderStatus.objects.filter(
+                order=OuterRef("pk"),
+                status__in=OrderStatus.FINISHED_STATUSES
+            ))
         )
+        return {
+            "is_free": Q(courier__isnull=True),
+            # planar distance on the projected copy, served by its GiST index
+            "is_near_courier": Q(delivery_location_projected__dwithin=(
+                project_point(courier_location), D(m=settings.POSSIBLE_COURIER_DISTANCE)
+            )),
+            "courier_is_idle": ~Exists(active_orders),
+        }
+
+    def get_claim_queryset(self, courier_location):
+        return self.get_queryset().filter(
+            *self.get_claim_conditions(courier_location).values(),
+            pk=self.kwargs["pk"]
+        )
+
+    def get_claim_error(self, courier_location):
+        # only runs for failed claims, to tell the courier why
+        order = self.get_queryset().filter(pk=self.kwargs["pk"]).values(**{
+            name: ExpressionWrapper(condition, output_field=BooleanField())
+            for name, condition in self.get_claim_conditions(courier_location).items()
+        }).first()
+        if order is None or not order["is_free"]:
+            # taken through another worker whose event this board missed
+            free_order_board.remove(int(self.kwargs["pk"]))
+        if order is None:
+            return Http404()
+        if not order["is_near_courier"]:
+            return ValidationError({"courier_location": "You are too far from order"})
+        if not order["courier_is_idle"]:
+            return ValidationError("You have an active order")
+        return ValidationError("Order is not available for delivering")
+
+    def update(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        self.perform_claim(serializer.validated_data["courier_location"])
+        return Response(serializer.data)
 
-        async_to_sync(channel_layer.group_send)(
+    @atomic
+    def perform_claim(self, courier_location):
+        # claims of one courier wait for each other, so the idle check of the
+        # later one sees the order taken by the earlier one
+        CourierAccount.objects.select_for_update().filter(
+            id=self.courier_id
+        ).values_list("id").first()
+        # only one courier can take the order
+        if not self.get_claim_queryset(courier_location).update(courier_id=self.courier_id):
+            raise self.get_claim_error(courier_location)
+
+        order_id = int(self.kwargs["pk"])
+        order_status = OrderStatus.objects.create(order_id=order_id, status=OrderStatus.DELIVERING)
+        send_order_status_update(order_status)
+
+        group_send(
             "courier_queue",
             {
                 'type': 'event.ordertaken',
-                'content': instance.order_id
+                'content': order_id
             }
         )
 
@@ -100,19 +177,15 @@ class CourierLocationUpdateApiView(CreateAPIView):
     permission_classes = [IsCourier]
 
     def perform_create(self, serializer):
-        courier_account = get_object_or_404(
-            CourierAccount.objects.all(),
-            **{"user": self.request.user}
-        )
-        order = get_object_or_404(
-            Order.objects.filter(
-                courier=courier_account
-            ),
-            **{"id": self.kwargs["order_id"]}
-        )
-        channel_layer = get_channel_layer()
-        async_to_sync(channel_layer.group_send)(
-            f"order_{order.id}",
+        courier_account_id = get_principal(self.request.user).courier_account_id
+        order_id = self.kwargs["order_id"]
+        if not Order.objects.filter(
+                id=order_id,
+                courier_id=courier_account_id
+        ).exists():
+            raise Http404
+        group_send(
+            f"order_{order_id}",
             {
                 'type': 'event.location',
                 'content': {
@@ -120,38 +193,38 @@ class CourierLocationUpdateApiView(CreateAPIView):
                     "longitude": serializer.validated_data['location'][0]
                 }
             })
-        serializer.save(courier=courier_account)
+        serializer.save(courier_id=courier_account_id)
 
 
-class CourierOrderListApiView(ListAPIView):
+class CourierOrderListApiView(SparseFieldsetMixin, ListAPIView):
     serializer_class = OrderWithFirstStatusSerializer
     permission_classes = [IsCourier]
+    replica_reads = True
 
     def get_queryset(self):
         return Order.objects.filter(
-            courier_id__user=self.request.user
-        ).order_by('-created_at').prefetch_related(
-            Prefetch(
-                "statuses",
-                OrderStatus.objects.order_by("-created_at"),
-                to_attr="last_status"
-            )
-        )
+            courier__user_id=self.request.user.id
+        ).order_by('-created_at')
+
+    def list(self, request, *args, **kwargs):
+        # same rows as UserOrderListApiView.list
+        serializer = OrderHistoryValuesSerializer(fields=self.get_sparse_fields())
+        return Response(serializer.serialize_queryset(self.get_queryset()))
 
 
 class CourierRetrieveOrderApiView(RetrieveAPIView):
     serializer_class = CourierOrderDetailSerializer
     permission_classes = [IsCourier]
+    replica_reads = True
 
     def get_queryset(self):
         return Order.objects.filter(
-            courier__user=self.request.user,
+            courier__user_id=self.request.user.id,
         ).prefetch_related(
             Prefetch(
-                "order_dishes__dish",
-                queryset=Dish.objects.annotate(
-                    quantity=F('order_dishes__quantity')
-                ),
-                to_attr="order_dishes"
+                "order_dishes",
+                queryset=OrderDish.objects.select_related(
+                    "dish"
+                )
             ),
         )
@@ -1,34 +1,52 @@
+from django.utils.cache import get_conditional_response
 from rest_framework.exceptions import PermissionDenied
+from rest_framework.response import Response
 
 from rest_framework.generics import (
     ListAPIView, CreateAPIView, DestroyAPIView,
     UpdateAPIView, RetrieveAPIView
 )
-from ..models import (
-    Dish, RestaurantAdmin
-)
+from ..models import Dish
 from ..permissions import PermissionsRequired
+from ..services.menu import get_menu_version, get_menu, menu_etag, bump_menu_version
+from ..services.principal import get_principal
 from ..serializers.dishes import (
     DishSerializer
 )
+from .fieldsets import SparseFieldsetMixin
 
 
-class DishApiView(ListAPIView, CreateAPIView):
+class DishApiView(SparseFieldsetMixin, ListAPIView, CreateAPIView):
     queryset = Dish.objects.all()
     serializer_class = DishSerializer
     permission_classes = [PermissionsRequired]
     permissions_post = ["gur.add_dish"]
+    replica_reads = True
+    default_exclude = ('dish_photo', 'dish_photo_variants')
 
     def get_queryset(self):
         return Dish.objects.filter(
             restaurant__id=self.kwargs.get('pk')
         )
 
+    def list(self, request, *args, **kwargs):
+        restaurant_id = self.kwargs.get('pk')
+        version = get_menu_version(restaurant_id)
+        if version is None:
+            return Response([])
+
+        fields = self.get_sparse_fields()
+        etag = menu_etag(restaurant_id, version, fields)
+        not_modified = get_conditional_response(request, etag=etag)
+        if not_modified is not None:
+            not_modified["ETag"] = etag
+            return not_modified
+        return Response(
+            self.select_fields(get_menu(restaurant_id, version)), headers={"ETag": etag}
+        )
+
     def perform_create(self, serializer):
-        if not self.request.user.is_superuser and not RestaurantAdmin.objects.filter(
-                rest__id=self.kwargs.get('pk'),
-                user_account__user=self.request.user
-        ).exists():
+        if not get_principal(self.request.user).is_restaurant_admin(self.kwargs.get('pk')):
             raise PermissionDenied("You cannot create dishes of this restaurant")
         serializer.save()
 
@@ -40,17 +58,14 @@ class DishExactApiView(RetrieveAPIView, DestroyAPIView, UpdateAPIView):
     permissions_get = ["gur.get_dish"]
 
     def perform_destroy(self, instance):
-        if not self.request.user.is_superuser and not RestaurantAdmin.objects.filter(
-                rest__dishes=instance,
-                user_account__user=self.request.user
-        ).exists():
+        if not get_principal(self.request.user).is_restaurant_admin(instance.restaurant_id):
             raise PermissionDenied("You cannot delete dishes of this restaurant")
         instance.delete()
 
     def perform_update(self, serializer):
-        if not self.request.user.is_superuser and not RestaurantAdmin.objects.filter(
-                rest__dishes=serializer.instance,
-                user_account__user=self.request.user
-        ).exists():
+        if not get_principal(self.request.user).is_restaurant_admin(serializer.instance.restaurant_id):
             raise PermissionDenied("You cannot change dishes of this restaurant")
-        serializer.save()
+        previous_restaurant_id = serializer.instance.restaurant_id
+        dish = serializer.save()
+        if dish.restaurant_id != previous_restaurant_id:
+            bump_menu_version(previous_restaurant_id)
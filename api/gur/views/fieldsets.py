@@ -0,0 +1,82 @@
+from rest_framework.exceptions import ValidationError
+
+
+class SparseFieldsetMixin:
+    """
+    `?fields=` and `?exclude=` for list endpoints. The serializer only
+    renders the selected fields and model columns read solely by the other
+    fields are deferred in the query.
+    """
+    # left out unless explicitly requested with ?fields=
+    default_exclude = ()
+    # model columns read by serializer fields that are not plain model fields
+    field_columns = {}
+
+    def get_query_field_list(self, param):
+        value = self.request.query_params.get(param)
+        if value is None:
+            return None
+        return [name.strip() for name in value.split(',') if name.strip()]
+
+    def get_sparse_fields(self):
+        """
+        Selected serializer field names in declaration order, or None when
+        the request does not render a list.
+        """
+        if self.request.method != 'GET':
+            return None
+        if not hasattr(self, '_sparse_fields'):
+            available = list(self.get_serializer_class()().fields)
+            requested = self.get_query_field_list('fields')
+            excluded = set(self.get_query_field_list('exclude') or ())
+            if requested is None:
+                excluded.update(self.default_exclude)
+            else:
+                unknown = set(requested) - set(available)
+                if unknown:
+                    raise ValidationError({
+                        'fields': [f"Unknown fields: {', '.join(sorted(unknown))}"]
+                    })
+                excluded.update(set(available) - set(requested))
+            self._sparse_fields = [name for name in available if name not in excluded]
+        return self._sparse_fields
+
+    def get_deferred_columns(self, fields):
+        serializer_class = self.get_serializer_class()
+        serializer_fields = serializer_class().fields
+        columns = {
+            field.name for field in serializer_class.Meta.model._meta.concrete_fields
+            if not field.primary_key
+        }
+        needed = set()
+        for name in fields:
+            needed.update(self.field_columns.get(name, (serializer_fields[name].source,)))
+        return {
+            field.source for name, field in serializer_fields.items()
+            if name not in fields and field.source in columns and field.source not in needed
+        }
+
+    def select_fields(self, rows):
+        """
+        Applies the selection to already serialized rows, e.g. cached ones.
+        """
+        fields = self.get_sparse_fields()
+        if fields is None:
+            return rows
+        fields = set(fields)
+        return [{name: value for name, value in row.items() if name in fields} for row in rows]
+
+    def get_serializer(self, *args, **kwargs):
+        fields = self.get_sparse_fields()
+        if fields is not None:
+            kwargs.setdefault('fields', fields)
+        return super().get_serializer(*args, **kwargs)
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        fields = self.get_sparse_fields()
+        if fields is not None:
+            deferred = self.get_deferred_columns(fields)
+            if deferred:
+                queryset = queryset.defer(*deferred)
+        return queryset
@@ -1,5 +1,3 @@
-from asgiref.sync import async_to_sync
-from channels.layers import get_channel_layer
 from django.db.transaction import atomic
 from django.utils.functional import cached_property
 from rest_framework import status
@@ -13,9 +11,9 @@ from rest_framework.generics import (
     RetrieveUpdateDestroyAPIView, RetrieveAPIView, UpdateAPIView, get_object_or_404
 )
 
+from ..serializers.fast import OrderHistoryValuesSerializer
 from ..serializers.order import (
     OrderSerializer, OrderRetrieveSerializer,
-    CourierOrderDetailSerializer,
     OrderDishSerializer, OrderStatusSerializer, OrderWithFirstStatusSerializer,
     OrderWithStatusSerializer,
     OrderDishWithOrderIdSerializer, OrderRecreationDetailSerializer
@@ -26,6 +24,9 @@ from ..models import (
     Order, Dish, OrderStatus,
     OrderDish, CourierAccount
 )
+from ..services.courier import cache_courier_order
+from ..services.events import group_send
+from .fieldsets import SparseFieldsetMixin
 from ..services.order import (
     send_order_status_update, get_order_or_create
 )
@@ -47,7 +48,7 @@ class OrderCreationApiView(UpdateAPIView):
 
     def get_queryset(self):
         return Order.objects.filter(
-            user__user=self.request.user
+            user__user_id=self.request.user.id
         ).exclude(
             Exists(
                 OrderStatus.objects.filter(
@@ -67,14 +68,11 @@ class OrderCreationApiView(UpdateAPIView):
     def perform_update(self, serializer):
         instance = serializer.save()
         # send this order to all connected couriers
-        channel_layer = get_channel_layer()
-        async_to_sync(channel_layer.group_send)(
+        group_send(
             f"courier_queue",
             {
                 'type': 'event.neworder',
-                'content': CourierOrderDetailSerializer(
-                    instance
-                ).data
+                'content': cache_courier_order(instance)
             })
 
 
@@ -84,7 +82,7 @@ class OrderRecreationApiView(CreateAPIView):
 
     def get_queryset(self):
         return Order.objects.filter(
-            user__user=self.request.user
+            user__user_id=self.request.user.id
         )
 
     @atomic
@@ -109,10 +107,18 @@ class OrderRecreationApiView(CreateAPIView):
                 OrderDish(
                     order=order,
                     quantity=ordered_dish.quantity,
-                    dish=ordered_dish.dish
+                    dish_id=ordered_dish.dish_id
                 )
             )
         OrderDish.objects.bulk_create(order_dishes_to_create)
+        order = Order.objects.prefetch_related(
+            Prefetch(
+                "order_dishes",
+                queryset=OrderDish.objects.select_related(
+                    "dish"
+                )
+            ),
+        ).get(id=order.id)
         serializer = self.get_serializer(order)
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
@@ -132,7 +138,7 @@ class OrderDishApiView(RetrieveUpdateDestroyAPIView):
         instance = self.get_object()
         order_is_not_open = OrderStatus.objects.filter(
             order__order_dishes=instance,
-            order__user__user=request.user
+            order__user__user_id=request.user.id
         ).exclude(status=OrderStatus.OPEN).exists()
         if order_is_not_open:
             raise ValidationError("This order cannot be changed")
@@ -150,7 +156,7 @@ class OrderDishClearApiView(DestroyAPIView):
 
     def get_queryset(self):
         return Order.objects.filter(
-            user__user=self.request.user
+            user__user_id=self.request.user.id
         ).annotate(
             is_not_updatable=Exists(
                 OrderStatus.objects.filter(
@@ -189,10 +195,16 @@ class OrderStatusApiView(CreateAPIView, ListAPIView):
         context["order"] = self.order
         return context
 
+    @atomic
+    def perform_create(self, serializer):
+        order_status = serializer.save(order=self.order)
+        send_order_status_update(order_status)
+
 
-class UserOrderListApiView(ListAPIView):
+class UserOrderListApiView(SparseFieldsetMixin, ListAPIView):
     serializer_class = OrderWithFirstStatusSerializer
     permission_classes = [IsAuthenticated]
+    replica_reads = True
 
     def get_queryset(self):
         return Order.objects.filter(
@@ -201,9 +213,15 @@ class UserOrderListApiView(ListAPIView):
                     order=OuterRef("pk")
                 ).exclude(status=OrderStatus.OPEN)
             ),
-            user_id__user=self.request.user
+            user__user_id=self.request.user.id
         ).distinct().order_by('-created_at')
 
+    def list(self, request, *args, **kwargs):
+        # selects only the columns of the requested fields and fetches the
+        # latest statuses in one query, so nothing is prefetched or deferred
+        serializer = OrderHistoryValuesSerializer(fields=self.get_sparse_fields())
+        return Response(serializer.serialize_queryset(self.get_queryset()))
+
 
 class UserOrderApiView(RetrieveAPIView):
     serializer_class = OrderWithStatusSerializer
@@ -211,7 +229,7 @@ class UserOrderApiView(RetrieveAPIView):
 
     def get_queryset(self):
         return Order.objects.filter(
-            user__user=self.request.user
+            user__user_id=self.request.user.id
         ).prefetch_related(
             Prefetch(
                 "order_dishes",
@@ -0,0 +1,31 @@
+import os
+
+from django.http import FileResponse, Http404
+from django.utils.cache import get_conditional_response
+from django.views.decorators.http import require_safe
+
+from ..services.photos import PhotoError, photo_store
+
+# content-addressed names never change meaning
+PHOTO_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+@require_safe
+def photo_view(request, name):
+    try:
+        path = photo_store.path(name)
+    except PhotoError:
+        raise Http404
+    etag = f'"{name}"'
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        if not os.path.exists(path) and not photo_store.is_original(name):
+            # not derived by the background pipeline yet
+            photo_store.render_variant(name)
+        try:
+            response = FileResponse(open(path, "rb"))
+        except FileNotFoundError:
+            raise Http404
+    response["ETag"] = etag
+    response["Cache-Control"] = PHOTO_CACHE_CONTROL
+    return response
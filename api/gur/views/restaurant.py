@@ -2,10 +2,13 @@ from rest_framework.response import Response
 from rest_framework import status
 
 from ..permissions import IsAdmin, PermissionsRequired, IsRestaurantAdmin
+from ..services.principal import get_principal
+from ..serializers.fast import RestaurantValuesSerializer
 from ..serializers.restaurant import (
-    RestaurantSerializer
+    RestaurantSerializer, RestaurantAdminSerializer
 )
 from ..models import *
+from .fieldsets import SparseFieldsetMixin
 from rest_framework.generics import (
     ListAPIView, CreateAPIView,
     UpdateAPIView, DestroyAPIView
@@ -15,11 +18,14 @@ from rest_framework.permissions import (
 )
 
 
-class RestaurantApiView(ListAPIView, CreateAPIView):
+class RestaurantApiView(SparseFieldsetMixin, ListAPIView, CreateAPIView):
     queryset = Restaurant.objects.all()
     serializer_class = RestaurantSerializer
     permission_classes = [IsAuthenticated & PermissionsRequired]
     permissions_post = ["gur.add_restaurant"]
+    replica_reads = True
+    default_exclude = ('rest_photo', 'rest_photo_variants')
+    field_columns = {'is_open': ('open_from', 'open_to')}
 
     def get_queryset(self):
         longitude = self.request.query_params.get('longitude', None)
@@ -33,11 +39,15 @@ class RestaurantApiView(ListAPIView, CreateAPIView):
             return Restaurant.objects.all()
 
         return Restaurant.objects.filter(
-            restaurant_admins__user_account__user=self.request.user
+            id__in=get_principal(self.request.user).admin_restaurant_ids
         )
 
+    def list(self, request, *args, **kwargs):
+        serializer = RestaurantValuesSerializer(fields=self.get_sparse_fields())
+        return Response(serializer.serialize_queryset(self.get_queryset()))
+
 
 class RestaurantAdminApiView(UpdateAPIView, DestroyAPIView):
     queryset = Restaurant.objects.all()
-    serializer_class = RestaurantSerializer
+    serializer_class = RestaurantAdminSerializer
     permission_classes = [IsRestaurantAdmin]